@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# Regression check of the earth mover's distance of the rank engine on quantized data (the resolution of the motor
+# current sensors), where the distances often equal round thresholds exactly. The distances of the vectorized
+# window scan are compared with scipy.stats.wasserstein_distance and with the exact distance computed in integers,
+# and an overlapping scan must detect the same drifts as a scan with the scipy distance.
+# Run with: python check_emd_ties.py
+# library: numpy / scipy
+# -----------------------------------------------------------------------------------------------------------
+import contextlib
+import io
+import os
+import sys
+
+import numpy as np
+from scipy.stats import wasserstein_distance
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'concept_drift_detection'))
+
+from emd_concept_drift_detection import EmdConceptDriftDetector
+from rank_two_sample_engine import RankTwoSampleEngine
+
+RESOLUTION = 0.25
+
+
+class ScipyEmdConceptDriftDetector(EmdConceptDriftDetector):
+    """
+    EMD detector computing every distance with scipy.stats.wasserstein_distance, batch by batch.
+    """
+
+    batched_statistics = False
+
+    def statistic(self, new_data):
+        self.distance = wasserstein_distance(self.reference_data, new_data)
+
+        return self.distance
+
+
+def quantized_stream(rng, length, resolution=RESOLUTION):
+    """
+    Returns a stream with a stable period and a gradual drift, rounded to the resolution.
+
+    Args:
+        rng (numpy.random.Generator): The random generator.
+        length (int): Length of the stream, half of it is stable.
+        resolution (float, optional): Resolution of the values. Default is RESOLUTION.
+
+    Returns:
+        numpy.ndarray: The stream.
+    """
+    half = length // 2
+    drift = np.linspace(0, 1.5, length - half) + rng.normal(0, 1, length - half)
+    stream = np.concatenate([rng.normal(0, 1, half), drift])
+
+    return np.round(stream / resolution) * resolution
+
+
+def check_distances(rng):
+    engine = RankTwoSampleEngine()
+    for n_ref, batch_size in [(1000, 1000), (250, 1000), (1000, 40), (37, 100)]:
+        reference = quantized_stream(rng, n_ref)
+        stream = quantized_stream(rng, 4 * batch_size)
+        starts = np.arange(0, len(stream) - batch_size + 1, 7)
+        distances = engine.emd_windows(reference, stream, starts, batch_size)
+        expected = np.array([wasserstein_distance(reference, stream[i:i + batch_size]) for i in starts])
+        assert np.allclose(distances, expected, rtol=1e-12, atol=0), (n_ref, batch_size)
+        if n_ref == batch_size:
+            # Exact distance in units of the resolution: the mean absolute difference of the sorted samples
+            ref_units = np.round(np.sort(reference) / RESOLUTION).astype(np.int64)
+            for i, distance in zip(starts, distances):
+                new_units = np.round(np.sort(stream[i:i + batch_size]) / RESOLUTION).astype(np.int64)
+                exact = np.abs(ref_units - new_units).sum() * RESOLUTION / batch_size
+                assert distance == exact, (i, distance, exact)
+
+
+def check_drifts(rng):
+    stream = quantized_stream(rng, 80000)
+    for dtype in (np.float64, np.float32):
+        for stride in (1, 7, 300):
+            drifts = []
+            for cls in (EmdConceptDriftDetector, ScipyEmdConceptDriftDetector):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results = cls(1000, 0.25).detect_drift_window(stream.astype(dtype), overlapping=True,
+                                                                  stride=stride)
+                drifts.append(results['drift_ind'])
+            assert drifts[0] == drifts[1], (dtype.__name__, stride, drifts)
+            print(f'{dtype.__name__} stride {stride}: {len(drifts[0])} drifts, same as scipy')
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    check_distances(rng)
+    print('Distances match scipy and the exact distances')
+    check_drifts(rng)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# Accuracy check of the float32 mode of the windowed detectors. Every detector scans a synthetic motor current
+# stream with a level and a variance drift once as float64 and once as float32: the statistics of all batches must
+# agree to MAX_RELATIVE_ERROR, and the non-overlapping and overlapping scans must detect the same drifts.
+# Run with: python check_float32.py
+# library: numpy / scipy / alibi_detect (MMD)
+# -----------------------------------------------------------------------------------------------------------
+import contextlib
+import io
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'concept_drift_detection'))
+
+from ks_concept_drift_detection import KS_Concept_Drift_Detector
+from cvm_test_concept_drift_detection import CvmConceptDriftDetector
+from js_concept_drift_detection import JsConceptDriftDetector
+from hellinger_concept_drift_detection import HellingerDistanceDriftDetector
+from emd_concept_drift_detection import EmdConceptDriftDetector
+from mmd_concept_drift_detection import MmdConceptDriftDetector
+from psi_concept_drift_detection import PsiConceptDriftDetector
+
+# Relative error of the float32 statistics, relative to max(|statistic|, STATISTIC_FLOOR) for p-values near zero
+MAX_RELATIVE_ERROR = 1e-3
+STATISTIC_FLOOR = 1e-3
+
+DETECTORS = [(KS_Concept_Drift_Detector, {'batch_size': 500, 'significance_level': 0.01}),
+             (CvmConceptDriftDetector, {'batch_size': 500, 'significance_level': 0.01}),
+             (JsConceptDriftDetector, {'batch_size': 500, 'threshold': 0.2}),
+             (HellingerDistanceDriftDetector, {'batch_size': 500, 'threshold': 0.2}),
+             (EmdConceptDriftDetector, {'batch_size': 500, 'threshold': 0.3}),
+             (MmdConceptDriftDetector, {'batch_size': 200, 'threshold': 0.05}),
+             (PsiConceptDriftDetector, {'batch_size': 500, 'threshold': 0.1, 'num_bins': 10})]
+
+
+def motor_current_stream(rng):
+    """
+    Returns a stream at the level of a motor current (about 40 A) with a level drift, a variance drift and a level
+    drift back below the initial level.
+
+    Args:
+        rng (numpy.random.Generator): The random generator.
+
+    Returns:
+        numpy.ndarray: The float64 stream.
+    """
+    return 40 + np.concatenate([rng.normal(0, 1, 3000), rng.normal(0.6, 1, 3000), rng.normal(0.6, 2, 3000),
+                                rng.normal(-1, 1, 2500)])
+
+
+def batch_statistics(cls, params, stream):
+    """
+    Returns the statistics of all non-overlapping batches against the first batch as reference.
+    """
+    batch_size = params['batch_size']
+    detector = cls(**params)
+    detector.set_reference(stream[:batch_size])
+
+    return np.array([detector.statistic(stream[i:i + batch_size])
+                     for i in range(batch_size, len(stream) - batch_size + 1, batch_size)], dtype=np.float64)
+
+
+def drift_indices(cls, params, stream, overlapping):
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = cls(**params).detect_drift_window(stream, overlapping=overlapping, stride=params['batch_size'] // 4)
+
+    return list(results['drift_ind'])
+
+
+def check_detector(cls, params, stream):
+    stream32 = stream.astype(np.float32)
+    expected = batch_statistics(cls, params, stream)
+    statistics = batch_statistics(cls, params, stream32)
+    error = np.max(np.abs(statistics - expected) / np.maximum(np.abs(expected), STATISTIC_FLOOR))
+    assert error <= MAX_RELATIVE_ERROR, (cls.__name__, error)
+    for overlapping in (False, True):
+        drifts = drift_indices(cls, params, stream, overlapping)
+        drifts32 = drift_indices(cls, params, stream32, overlapping)
+        assert drifts == drifts32, (cls.__name__, overlapping, drifts, drifts32)
+    print(f'{cls.__name__}: max relative error {error:.2e}, {len(drifts)} drifts (overlapping) in both dtypes')
+
+
+if __name__ == '__main__':
+    stream = motor_current_stream(np.random.default_rng(0))
+    for cls, params in DETECTORS:
+        check_detector(cls, params, stream)
+    print('float32 statistics and drifts match float64')
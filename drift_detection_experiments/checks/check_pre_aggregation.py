@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# Parity check of the pre-aggregation stage with pandas. A minute stream with gaps (missing rows) and sensor dropouts
+# (NaN values) is aggregated per bin with aggregate_stream and with df.resample(...), and every statistic (mean,
+# sample standard deviation, min, max, median and a quantile) must agree on all bins that contain rows.
+# Run with: python check_pre_aggregation.py
+# library: numpy / pandas
+# -----------------------------------------------------------------------------------------------------------
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'concept_drift_detection'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'run_experiment'))
+
+from pre_aggregation import aggregation_bins, aggregate_stream
+
+PANDAS_STATISTICS = {'mean': 'mean', 'std': 'std', 'min': 'min', 'max': 'max', 'median': 'median',
+                     'q0.95': lambda values: values.quantile(0.95)}
+
+
+def minute_frame(rng, length):
+    """
+    Returns a dataframe with a minute Timestamp column, gaps of missing rows and NaN dropouts of the values.
+
+    Args:
+        rng (numpy.random.Generator): The random generator.
+        length (int): Number of minutes before the gaps are removed.
+
+    Returns:
+        pandas.DataFrame: The dataframe with the columns 'Timestamp' and 'value'.
+    """
+    timestamps = pd.date_range('2021-01-01', periods=length, freq='min')
+    values = 40 + rng.normal(0, 1, length)
+    values[rng.random(length) < 0.2] = np.nan
+    # Dropouts of whole bins and bins with a single valid value
+    values[600:720] = np.nan
+    values[900:959] = np.nan
+    keep = rng.random(length) > 0.1
+    keep[2000:2500] = False
+
+    return pd.DataFrame({'Timestamp': timestamps[keep], 'value': values[keep]})
+
+
+def check_statistics(df, freq, chunk_size):
+    starts, ends = aggregation_bins(df['Timestamp'], freq)
+    # The bins of aggregation_bins start at multiples of freq from 1970-01-01, as pandas with origin='epoch'
+    resampled = df.set_index('Timestamp')['value'].resample(freq, origin='epoch')
+    # pandas also returns the empty bins of the gaps, which are skipped by aggregation_bins
+    occupied = resampled.size().to_numpy() > 0
+    for statistic, func in PANDAS_STATISTICS.items():
+        expected = resampled.agg(func).to_numpy()[occupied]
+        aggregated = aggregate_stream(df['value'].to_numpy(), starts, ends, statistic, chunk_size=chunk_size)
+        assert len(aggregated) == len(expected), (freq, statistic)
+        assert np.allclose(aggregated, expected, rtol=1e-10, atol=1e-10, equal_nan=True), (freq, statistic)
+    print(f'{freq} bins (chunk size {chunk_size}): {len(starts)} bins match pandas resample')
+
+
+if __name__ == '__main__':
+    df = minute_frame(np.random.default_rng(0), 20000)
+    for freq, chunk_size in [('1h', 2 ** 22), ('1h', 500), ('7min', 1000), ('1D', 2 ** 22)]:
+        check_statistics(df, freq, chunk_size)
+    print('Pre-aggregation matches pandas resample')
@@ -7,8 +7,10 @@
 # -------------------------------------------------------------------------------------------------------
 from river.drift import ADWIN
 
+from drift_events import DriftEventsMixin
 
-class AdwinConceptDriftDetector:
+
+class AdwinConceptDriftDetector(DriftEventsMixin):
     """
     Implementation of the Adaptive Windowing (ADWIN) concept drift detector.
 
@@ -17,9 +19,12 @@ class AdwinConceptDriftDetector:
         drift_ind (list): List to store indices where concept drift is detected.
         cnt_drift (int): Counter to keep track of the number of detected concept drifts.
         result_list (list): List to store ADWIN estimations at the time of drift detection.
+        events (callable): Event channel called with the index and ADWIN estimation of every drift, None if drifts
+            are only recorded.
 
     Methods:
         __init__: Initializes the AdwinConceptDriftDetector with specified parameters.
+        set_events: Passes every drift to an event channel as soon as it is detected.
         detect_drift_window: Detects concept drifts in the given data stream.
 
     Reference:
@@ -46,6 +51,7 @@ class AdwinConceptDriftDetector:
         self.drift_ind = []
         self.cnt_drift = 0
         self.result_list = []
+        self.events = None
 
     def detect_drift_window(self, data_stream):
         """
@@ -71,6 +77,8 @@ class AdwinConceptDriftDetector:
                 self.drift_ind.append(i)
 
                 self.result_list.append(self.adwin.estimation)
+                if self.events is not None:
+                    self.events(i, self.adwin.estimation)
                 self.adwin._reset()
 
         return {'drift_ind': self.drift_ind, 'result_list': self.result_list, 'cnt_drift': self.cnt_drift}
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# This file contains the base class of the control chart concept drift detectors (CUSUM, EWMA). After every restart the
+# in-control mean and standard deviation are estimated from a warm-up period using prefix sums of the stream, the
+# following values are standardized, and the chart statistic is computed for whole segments of the stream with numpy
+# kernels instead of a Python loop over the values. The chart restarts after each alarm, and the segments after a
+# restart grow geometrically, so frequent alarms do not compute the chart far beyond the next alarm.
+# library: numpy
+# reference: Montgomery, D. C. (2009). Introduction to Statistical Quality Control. 6th edition, Wiley.
+# -----------------------------------------------------------------------------------------------------------
+import numpy as np
+
+from drift_events import DriftEventsMixin
+
+
+class ControlChartConceptDriftDetector(DriftEventsMixin):
+    """
+    Base class for control chart concept drift detectors that monitor a data stream value by value.
+
+    The first min_instances values after the start and after every alarm are the warm-up period, their mean and
+    standard deviation are the in-control parameters of the chart. The chart is then computed segment by segment
+    until the first alarm. The first segment after a restart has 1024 values and every further segment doubles in
+    size up to segment_size, so at most twice the values up to the next alarm are computed.
+
+    Attributes:
+        min_instances (int): Number of values of the warm-up period.
+        segment_size (int): Maximum number of values for which the chart is computed at once.
+        drift_ind (list): List to store indices where concept drift is detected.
+        cnt_drift (int): Counter to keep track of the number of detected concept drifts.
+        result_list (list): List to store the chart statistic at the time of drift detection.
+        events (callable): Event channel called with the index and chart statistic of every drift, None if drifts
+            are only recorded.
+
+    Methods:
+        __init__: Initializes the ControlChartConceptDriftDetector with specified parameters.
+        start_chart: Returns the state of the chart after the warm-up period (implemented by subclasses).
+        chart: Computes the chart statistic for a segment of standardized values (implemented by subclasses).
+        set_events: Passes every drift to an event channel as soon as it is detected.
+        detect_drift_window: Monitors a data stream for concept drifts.
+    """
+
+    def __init__(self, min_instances=30, segment_size=65536):
+        """
+        Initializes the ControlChartConceptDriftDetector with specified parameters.
+
+        Args:
+            min_instances (int, optional): Number of values of the warm-up period. Default is 30.
+            segment_size (int, optional): Maximum number of values for which the chart is computed at once.
+                Default is 65536.
+
+        Returns:
+            None
+        """
+        if min_instances < 2:
+            raise ValueError('The warm-up period must contain at least two values')
+        self.min_instances = min_instances
+        self.segment_size = segment_size
+        self.drift_ind = []
+        self.cnt_drift = 0
+        self.result_list = []
+        self.events = None
+
+    def start_chart(self):
+        """
+        Returns the state of the chart after the warm-up period.
+
+        Returns:
+            tuple: The state of the chart.
+        """
+        raise NotImplementedError
+
+    def chart(self, z, state):
+        """
+        Computes the chart statistic for a segment of standardized values.
+
+        Args:
+            z (numpy.ndarray): The standardized values of the segment.
+            state (tuple): The state of the chart before the segment.
+
+        Returns:
+            tuple: The chart statistic of every value, a boolean array of the alarms and the state of the chart after
+                the segment.
+        """
+        raise NotImplementedError
+
+    def detect_drift_window(self, data_stream):
+        """
+        Monitors a data stream for concept drifts with the control chart.
+
+        Args:
+            data_stream (array-like): The data stream to monitor for concept drifts.
+
+        Returns:
+            dict: A dictionary containing the following information:
+                - 'drift_ind' (list): Indices where concept drift is detected.
+                - 'result_list' (list): The chart statistic at the time of drift detection.
+                - 'cnt_drift' (int): Number of detected concept drifts.
+        """
+        x = np.asarray(data_stream, dtype=np.float64).ravel()
+        n = len(x)
+        # Centering the prefix sums at the mean of the stream limits the cancellation in the variance
+        offset = x.mean() if n else 0.0
+        cs = np.concatenate([[0.0], np.cumsum(x - offset)])
+        cs2 = np.concatenate([[0.0], np.cumsum((x - offset) ** 2)])
+
+        start = 0
+        while start + self.min_instances < n:
+            pos = start + self.min_instances
+            mean = (cs[pos] - cs[start]) / self.min_instances
+            var = (cs2[pos] - cs2[start]) / self.min_instances - mean ** 2
+            std = np.sqrt(var * self.min_instances / (self.min_instances - 1)) if var > 0 else 0.0
+            # A constant warm-up period is monitored in the units of the data
+            std = std if std > 0 else 1.0
+            mean += offset
+
+            state = self.start_chart()
+            alarm = None
+            length = min(1024, self.segment_size)
+            while pos < n and alarm is None:
+                end = min(pos + length, n)
+                length = min(2 * length, self.segment_size)
+                values, alarms, state = self.chart((x[pos:end] - mean) / std, state)
+                k = np.argmax(alarms)
+                if alarms[k]:
+                    alarm, value = pos + k, values[k]
+                pos = end
+
+            if alarm is None:
+                break
+            print(f'Concept drift detected at index {alarm}')
+            self.cnt_drift += 1
+            self.drift_ind.append(int(alarm))
+            self.result_list.append(float(value))
+            if self.events is not None:
+                self.events(int(alarm), float(value))
+            start = alarm + 1
+
+        return {'drift_ind': self.drift_ind, 'result_list': self.result_list, 'cnt_drift': self.cnt_drift}
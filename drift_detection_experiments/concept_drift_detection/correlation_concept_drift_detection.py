@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# Multivariate concept drift detection based on the correlation matrix of several tags (e.g. the coupled motor currents
+# of a line). The correlation matrix of every batch is compared with the correlation matrix of the reference, and the
+# tag pairs whose correlation changed are reported with every drift. With overlapping batches, the centered moments of
+# the window are updated incrementally: the values entering and leaving the window are merged into and removed from
+# the moments of the previous window, so a step of the window costs O(stride) instead of O(batch_size) rows.
+# library: numpy
+# reference: Chan, T. F., Golub, G. H., LeVeque, R. J. (1979). Updating formulae and a pairwise algorithm for
+#            computing sample variances. Technical Report STAN-CS-79-773, Stanford University.
+# -----------------------------------------------------------------------------------------------------------
+from collections import deque
+
+import numpy as np
+
+from window_concept_drift_detection import WindowConceptDriftDetector
+
+
+def _moments(data):
+    """
+    Computes the number of rows, the mean and the centered co-moment matrix of a block of rows.
+
+    Args:
+        data (numpy.ndarray): The block, one row per time step and one column per tag.
+
+    Returns:
+        tuple: The number of rows, the mean of every column and the co-moment matrix sum((x - mean)(x - mean)^T).
+    """
+    mean = data.mean(axis=0)
+    centered = data - mean
+
+    return len(data), mean, centered.T @ centered
+
+
+def _merge_moments(a, b):
+    """
+    Merges the moments of two disjoint blocks of rows.
+
+    Args:
+        a (tuple): The moments of the first block.
+        b (tuple): The moments of the second block.
+
+    Returns:
+        tuple: The moments of the union of both blocks.
+    """
+    n_a, mean_a, m_a = a
+    n_b, mean_b, m_b = b
+    n = n_a + n_b
+    delta = mean_b - mean_a
+
+    return n, mean_a + delta * n_b / n, m_a + m_b + np.outer(delta, delta) * n_a * n_b / n
+
+
+def _remove_moments(a, b):
+    """
+    Removes the moments of a block of rows from the moments of a larger block containing it.
+
+    Args:
+        a (tuple): The moments of the larger block.
+        b (tuple): The moments of the removed block.
+
+    Returns:
+        tuple: The moments of the remaining rows.
+    """
+    n, mean, m = a
+    n_b, mean_b, m_b = b
+    n_a = n - n_b
+    mean_a = (n * mean - n_b * mean_b) / n_a
+    delta = mean_b - mean_a
+
+    return n_a, mean_a, m - m_b - np.outer(delta, delta) * n_a * n_b / n
+
+
+def _correlation(moments):
+    """
+    Computes the correlation matrix from the moments of a block. Tags that are constant in the block are uncorrelated
+    with all other tags. A tag counts as constant if its standard deviation is below 1e-7 times its mean, the size of
+    the rounding errors of incrementally updated moments.
+
+    Args:
+        moments (tuple): The moments of the block.
+
+    Returns:
+        numpy.ndarray: The correlation matrix.
+    """
+    n, mean, m = moments
+    var = np.diag(m)
+    std = np.sqrt(np.where(var > n * (1e-7 * mean) ** 2, var, 0.0))
+    scale = np.outer(std, std)
+    corr = np.divide(m, scale, out=np.zeros_like(m), where=scale > 0)
+    np.fill_diagonal(corr, 1.0)
+
+    return np.clip(corr, -1.0, 1.0)
+
+
+class CorrelationConceptDriftDetector(WindowConceptDriftDetector):
+    """
+    Concept Drift Detector based on the change of the correlation matrix of several tags.
+
+    The statistic of a batch is the largest absolute difference between a correlation coefficient of the batch and
+    the same coefficient of the reference. With every drift, the tag pairs whose correlation changed by more than the
+    threshold are stored in drift_pairs. The data stream is a two-dimensional array with one column per tag, so a
+    single pass replaces a univariate run per tag.
+
+    Attributes:
+        threshold (float): Largest change of a correlation coefficient without drift.
+        tags (list): Names of the tags (columns) used in drift_pairs.
+        refresh (int): Number of rows after which the incrementally updated moments are computed again.
+        reference_corr (numpy.ndarray): Correlation matrix of the reference.
+        drift_pairs (list): For every drift, the list of changed tag pairs (tag, tag, change), largest change first.
+            With a bounded history, a deque of the pairs of the drifts in the history.
+
+    Methods:
+        __init__: Initializes the CorrelationConceptDriftDetector with specified parameters.
+        set_reference: Replaces the reference data and computes its correlation matrix.
+        process_batch: Computes the statistic of a batch, recording where the batch starts.
+        statistic: Computes the largest change of a correlation coefficient for a given batch of new data.
+        is_drift: Decides whether a change of the correlation indicates a concept drift.
+        changed_pairs: Returns the tag pairs whose correlation changed by more than the threshold.
+        set_history: Keeps only the most recent drifts and their changed tag pairs.
+        results: Returns the detected drifts with the changed tag pairs.
+
+    Reference:
+        - Chan, T. F., Golub, G. H., LeVeque, R. J. (1979). Updating formulae and a pairwise algorithm for computing
+          sample variances. Technical Report STAN-CS-79-773, Stanford University.
+    """
+
+    def __init__(self, batch_size, threshold, tags=None, refresh=None, reference_size=None, reference_decay=0.0):
+        """
+        Initializes the CorrelationConceptDriftDetector with specified parameters.
+
+        Args:
+            batch_size (int): Size of the data batches used for drift detection.
+            threshold (float): Largest change of a correlation coefficient without drift, between 0 and 2.
+            tags (list, optional): Names of the tags (columns). Default is None (column numbers).
+            refresh (int, optional): Number of rows entering the window after which the moments are computed again
+                instead of updated, limiting the accumulation of rounding errors. Default is batch_size.
+            reference_size (int, optional): Maximum size of a reservoir sample of the stable period used as
+                reference. Default is None (the batch that triggered the last drift is the reference).
+            reference_decay (float, optional): Decay rate per batch of the weights of the reservoir sample.
+                Default is 0.
+
+        Returns:
+            None
+        """
+        super().__init__(batch_size, reference_size, reference_decay)
+        self.threshold = threshold
+        self.tags = tags
+        self.refresh = refresh if refresh is not None else batch_size
+        self.reference_corr = None
+        self.drift_pairs = []
+        self._start = None
+        self._window = None
+
+    def set_reference(self, reference_data):
+        """
+        Replaces the reference data and computes its correlation matrix.
+
+        Args:
+            reference_data (array-like): The new reference data, one column per tag.
+
+        Returns:
+            None
+        """
+        reference_data = np.asarray(reference_data, dtype=np.float64)
+        if reference_data.ndim != 2 or reference_data.shape[1] < 2:
+            raise ValueError('The correlation detector needs a two-dimensional data stream with at least two tags')
+        super().set_reference(reference_data)
+        self.reference_corr = _correlation(_moments(reference_data))
+
+    def process_batch(self, batch_data, start, overlapping=False):
+        """
+        Computes the statistic of a batch against the reference, records a drift and updates the reference. The start
+        of the batch is used to update the moments of the previous window instead of computing them again.
+
+        Args:
+            batch_data (array-like): The batch, data_stream[start:start + batch_size].
+            start (int): Index of the data stream where the batch starts.
+            overlapping (bool, optional): If True, the drift is recorded at the end of the batch. Default is False.
+
+        Returns:
+            bool: True if concept drift is detected, False otherwise.
+        """
+        self._start = start
+
+        return super().process_batch(batch_data, start, overlapping)
+
+    def _window_moments(self, new_data):
+        """
+        Returns the moments of a batch. If the batch overlaps the previous batch of process_batch, the moments of the
+        previous batch are updated with the rows that entered and left the window. The batches may differ in size,
+        e.g. time-based batches.
+
+        Args:
+            new_data (numpy.ndarray): The batch.
+
+        Returns:
+            tuple: The moments of the batch.
+        """
+        start, self._start = self._start, None
+        if start is not None and self._window is not None:
+            prev_start, prev_data, prev_moments, updated = self._window
+            removed = start - prev_start
+            added = start + len(new_data) - prev_start - len(prev_data)
+            if 0 <= removed < len(prev_data) and 0 <= added < len(new_data) and updated + added <= self.refresh:
+                moments = prev_moments
+                if added:
+                    moments = _merge_moments(moments, _moments(new_data[len(new_data) - added:]))
+                if removed:
+                    moments = _remove_moments(moments, _moments(prev_data[:removed]))
+                self._window = (start, new_data, moments, updated + added)
+                return moments
+
+        moments = _moments(new_data)
+        self._window = (start, new_data, moments, 0) if start is not None else None
+
+        return moments
+
+    def statistic(self, new_data):
+        """
+        Computes the largest absolute change of a correlation coefficient between the reference data and a given batch
+        of new data.
+
+        Args:
+            new_data (array-like): The new data batch, one column per tag.
+
+        Returns:
+            float: The largest change of a correlation coefficient.
+        """
+        new_data = np.asarray(new_data, dtype=np.float64)
+        change = np.abs(_correlation(self._window_moments(new_data)) - self.reference_corr)
+
+        return float(change.max())
+
+    def is_drift(self, value):
+        """
+        Decides whether a change of the correlation indicates a concept drift.
+
+        Args:
+            value (float): The largest change of a correlation coefficient.
+
+        Returns:
+            bool: True if concept drift is detected, False otherwise.
+        """
+        return value > self.threshold
+
+    def changed_pairs(self, new_data):
+        """
+        Returns the tag pairs whose correlation changed by more than the threshold between the reference data and a
+        given batch of new data.
+
+        Args:
+            new_data (array-like): The new data batch, one column per tag.
+
+        Returns:
+            list: The changed pairs (tag, tag, change), largest change first.
+        """
+        change = np.abs(_correlation(_moments(np.asarray(new_data, dtype=np.float64))) - self.reference_corr)
+        rows, cols = np.triu_indices(len(change), 1)
+        tags = self.tags if self.tags is not None else list(range(len(change)))
+        pairs = [(tags[i], tags[j], float(change[i, j])) for i, j in zip(rows, cols) if change[i, j] > self.threshold]
+
+        return sorted(pairs, key=lambda pair: -pair[2])
+
+    def _process_value(self, batch_data, start, value, overlapping):
+        # The pairs are computed before the batch of a drift becomes the reference
+        pairs = self.changed_pairs(batch_data) if self.is_drift(value) else None
+        drift = super()._process_value(batch_data, start, value, overlapping)
+        if drift:
+            self.drift_pairs.append(pairs)
+
+        return drift
+
+    def set_history(self, capacity, sink=None):
+        """
+        Keeps only the most recent drifts in a ring buffer, and the changed tag pairs of these drifts in a deque of the
+        same capacity, so the memory of long runs is bounded.
+
+        Args:
+            capacity (int): Number of drifts kept in the buffer.
+            sink (callable, optional): Function called with the index and statistic value of every drift that is
+                removed from the buffer. Default is None (removed drifts are discarded).
+
+        Returns:
+            CorrelationConceptDriftDetector: The detector.
+        """
+        super().set_history(capacity, sink)
+        self.drift_pairs = deque(self.drift_pairs, maxlen=capacity)
+
+        return self
+
+    def results(self):
+        """
+        Returns the detected drifts with the changed tag pairs.
+
+        Returns:
+            dict: A dictionary containing the following information:
+                - 'drift_ind' (list): Indices where concept drift is detected.
+                - 'result_list' (list): Largest change of a correlation coefficient of every drift.
+                - 'cnt_drift' (int): Number of detected concept drifts.
+                - 'drift_pairs' (list): Changed tag pairs of every drift in drift_ind.
+        """
+        results = super().results()
+        drift_pairs = list(self.drift_pairs)
+        results['drift_pairs'] = drift_pairs[len(drift_pairs) - len(results['drift_ind']):]
+
+        return results
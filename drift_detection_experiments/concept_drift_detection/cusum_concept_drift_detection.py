@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# Univariate concept drift detection with a two-sided tabular CUSUM control chart. The CUSUM recursion
+# S_t = max(0, S_{t-1} + x_t) is evaluated for whole segments with the closed form S_t = C_t - min(0, min_{j<=t} C_j),
+# where C is the prefix sum of the increments.
+# library: numpy
+# reference: Page, E. S. (1954). Continuous inspection schemes. Biometrika, 41(1/2), 100-115.
+# -----------------------------------------------------------------------------------------------------------
+import numpy as np
+
+from control_chart_concept_drift_detection import ControlChartConceptDriftDetector
+
+
+def _lindley(increments, initial):
+    """
+    Evaluates the recursion S_t = max(0, S_{t-1} + increments_t) with prefix sums.
+
+    Args:
+        increments (numpy.ndarray): The increments.
+        initial (float): The value S_0 before the first increment.
+
+    Returns:
+        numpy.ndarray: The values S_1, ..., S_n.
+    """
+    c = initial + np.cumsum(increments)
+
+    return c - np.minimum(np.minimum.accumulate(c), 0.0)
+
+
+class CusumConceptDriftDetector(ControlChartConceptDriftDetector):
+    """
+    Concept Drift Detector based on a two-sided tabular CUSUM control chart.
+
+    The values are standardized with the mean and standard deviation of the warm-up period. The upper and lower
+    cumulative sums accumulate the deviations that exceed the allowance drift, and a drift is detected when one of
+    them exceeds the threshold.
+
+    Attributes:
+        threshold (float): Decision interval h of the chart in standard deviations.
+        drift (float): Allowance k of the chart in standard deviations, usually half of the shift to detect.
+
+    Methods:
+        __init__: Initializes the CusumConceptDriftDetector with specified parameters.
+        start_chart: Returns the cumulative sums after the warm-up period.
+        chart: Computes the cumulative sums for a segment of standardized values.
+
+    Reference:
+        - Page, E. S. (1954). Continuous inspection schemes. Biometrika, 41(1/2), 100-115.
+    """
+
+    def __init__(self, threshold=5.0, drift=0.5, min_instances=30, segment_size=65536):
+        """
+        Initializes the CusumConceptDriftDetector with specified parameters.
+
+        Args:
+            threshold (float, optional): Decision interval h in standard deviations. Default is 5.
+            drift (float, optional): Allowance k in standard deviations. Default is 0.5.
+            min_instances (int, optional): Number of values of the warm-up period. Default is 30.
+            segment_size (int, optional): Maximum number of values for which the chart is computed at once.
+                Default is 65536.
+
+        Returns:
+            None
+        """
+        super().__init__(min_instances, segment_size)
+        self.threshold = threshold
+        self.drift = drift
+
+    def start_chart(self):
+        """
+        Returns the cumulative sums after the warm-up period.
+
+        Returns:
+            tuple: The upper and lower cumulative sum, both 0.
+        """
+        return 0.0, 0.0
+
+    def chart(self, z, state):
+        """
+        Computes the upper and lower cumulative sums for a segment of standardized values.
+
+        Args:
+            z (numpy.ndarray): The standardized values of the segment.
+            state (tuple): The upper and lower cumulative sum before the segment.
+
+        Returns:
+            tuple: The larger of both cumulative sums for every value, a boolean array of the alarms and the
+                cumulative sums after the segment.
+        """
+        upper = _lindley(z - self.drift, state[0])
+        lower = _lindley(-z - self.drift, state[1])
+        values = np.maximum(upper, lower)
+
+        return values, values > self.threshold, (upper[-1], lower[-1])
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# This file contains the delivery of drift events to downstream consumers while a stream is monitored. A detector
+# passes every drift to an event channel as soon as it is detected, the channel adds the tag, the timestamp and the
+# name of the detector and puts the event into a bounded queue, and a background thread drains the queue into the
+# sinks (a JSON lines file, a local socket, a SQLite table). The detection loop never waits for I/O: if the queue is
+# full, the event is dropped and counted.
+# -----------------------------------------------------------------------------------------------------------
+import json
+import queue
+import socket
+import sqlite3
+import threading
+
+import pandas as pd
+
+
+class DriftEventPublisher:
+    """
+    Bounded queue of drift events drained by a background thread into one or more sinks.
+
+    An event is a dictionary with the keys 'tag', 'index', 'timestamp' (ISO 8601 or None), 'value' (the statistic of
+    the drift) and 'detector'. The thread passes the queued events in batches to the write method of every sink. An
+    error of a sink is counted and the events are passed to the other sinks, so a failing consumer can not stop the
+    detection.
+
+    Attributes:
+        sinks (list): The sinks, objects with the methods write(events) and close().
+        max_pending (int): Maximum number of queued events.
+        cnt_published (int): Number of events put into the queue.
+        cnt_dropped (int): Number of events dropped because the queue was full.
+        cnt_errors (int): Number of failed writes of a sink.
+        last_error (Exception): The last error of a sink, None if no write failed.
+
+    Methods:
+        __init__: Initializes the DriftEventPublisher and starts the background thread.
+        channel: Returns the event channel of a detector on a tag.
+        publish: Puts an event into the queue without waiting.
+        close: Delivers the queued events, stops the background thread and closes the sinks.
+    """
+
+    def __init__(self, sinks, max_pending=1024, batch_size=256):
+        """
+        Initializes the DriftEventPublisher and starts the background thread.
+
+        Args:
+            sinks (list): The sinks.
+            max_pending (int, optional): Maximum number of queued events. Default is 1024.
+            batch_size (int, optional): Maximum number of events passed to a sink at once. Default is 256.
+
+        Returns:
+            None
+        """
+        self.sinks = list(sinks)
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.cnt_published = 0
+        self.cnt_dropped = 0
+        self.cnt_errors = 0
+        self.last_error = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._drain, name='drift-events', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def channel(self, tag, detector, timestamps=None, rows=None):
+        """
+        Returns the event channel of a detector on a tag, which is passed to set_events of the detector.
+
+        Args:
+            tag (str): The tag of the data stream.
+            detector (str): Name of the detector, e.g. the class from the config.
+            timestamps (array-like, optional): Timestamps of the rows of the dataframe. Default is None (events
+                without timestamp).
+            rows (array-like, optional): Row of the dataframe of every index of the data stream, if the detector runs
+                on masked or aggregated values. Default is None (the indices are rows).
+
+        Returns:
+            DriftEventChannel: The channel.
+        """
+        return DriftEventChannel(self, tag, detector, timestamps, rows)
+
+    def publish(self, event):
+        """
+        Puts an event into the queue without waiting. The event is dropped if the queue is full.
+
+        Args:
+            event (dict): The event.
+
+        Returns:
+            bool: True if the event was queued, False if it was dropped.
+        """
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.cnt_dropped += 1
+            return False
+        self.cnt_published += 1
+
+        return True
+
+    def _drain(self):
+        running = True
+        while running:
+            events = [self._queue.get()]
+            while len(events) < self.batch_size:
+                try:
+                    events.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if events[-1] is None:
+                # The end marker is the last item of the queue
+                events.pop()
+                running = False
+            if events:
+                self._write(events)
+
+    def _write(self, events):
+        for sink in self.sinks:
+            try:
+                sink.write(events)
+            except Exception as e:
+                self.cnt_errors += 1
+                self.last_error = e
+
+    def close(self):
+        """
+        Delivers the queued events, stops the background thread and closes the sinks.
+
+        Returns:
+            None
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        for sink in self.sinks:
+            sink.close()
+
+
+class DriftEventChannel:
+    """
+    Event channel of a detector on a tag, called by the detector with the index and the statistic value of every
+    drift.
+
+    Attributes:
+        publisher (DriftEventPublisher): The publisher of the events.
+        tag (str): The tag of the data stream.
+        detector (str): Name of the detector.
+
+    Methods:
+        __init__: Initializes the DriftEventChannel with specified parameters.
+        __call__: Publishes a drift.
+    """
+
+    def __init__(self, publisher, tag, detector, timestamps=None, rows=None):
+        """
+        Initializes the DriftEventChannel with specified parameters.
+
+        Args:
+            publisher (DriftEventPublisher): The publisher of the events.
+            tag (str): The tag of the data stream.
+            detector (str): Name of the detector.
+            timestamps (array-like, optional): Timestamps of the rows of the dataframe. Default is None.
+            rows (array-like, optional): Row of the dataframe of every index of the data stream. Default is None.
+
+        Returns:
+            None
+        """
+        self.publisher = publisher
+        self.tag = tag
+        self.detector = detector
+        self._timestamps = pd.DatetimeIndex(timestamps) if timestamps is not None else None
+        self._rows = rows
+
+    def __call__(self, index, value):
+        """
+        Publishes a drift.
+
+        Args:
+            index (int): Index of the data stream where the drift was detected.
+            value (float): The statistic value of the drift.
+
+        Returns:
+            bool: True if the event was queued, False if it was dropped.
+        """
+        row = int(self._rows[index]) if self._rows is not None else int(index)
+        timestamp = self._timestamps[row].isoformat() if self._timestamps is not None else None
+
+        return self.publisher.publish({'tag': self.tag, 'index': row, 'timestamp': timestamp, 'value': float(value),
+                                       'detector': self.detector})
+
+
+class DriftEventsMixin:
+    """
+    Mixin of the detectors that pass every drift to an event channel, e.g. a DriftEventChannel, as soon as it is
+    detected. The detector calls self.events with the index and the statistic value of every drift if it is not None.
+
+    Attributes:
+        events (callable): Event channel called with the index and statistic value of every drift, None if drifts
+            are only recorded.
+
+    Methods:
+        set_events: Passes every drift to an event channel as soon as it is detected.
+    """
+
+    events = None
+
+    def set_events(self, events):
+        """
+        Passes every drift to an event channel as soon as it is detected, in addition to the results.
+
+        Args:
+            events (callable): Function called with the index and statistic value of every drift, e.g. a
+                DriftEventChannel. None to stop passing drifts.
+
+        Returns:
+            The detector.
+        """
+        self.events = events
+
+        return self
+
+
+class JsonLinesEventSink:
+    """
+    Sink appending the drift events to a file, one JSON object per line.
+
+    Attributes:
+        path (str): Path of the file.
+
+    Methods:
+        __init__: Initializes the JsonLinesEventSink and opens the file.
+        write: Appends events to the file.
+        close: Closes the file.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes the JsonLinesEventSink and opens the file.
+
+        Args:
+            path (str): Path of the file, the events are appended if it exists.
+
+        Returns:
+            None
+        """
+        self.path = path
+        self._file = open(path, 'a')
+
+    def write(self, events):
+        """
+        Appends events to the file. The file is flushed after every batch, so consumers see the events immediately.
+
+        Args:
+            events (list): The events.
+
+        Returns:
+            None
+        """
+        self._file.write(''.join(json.dumps(event) + '\n' for event in events))
+        self._file.flush()
+
+    def close(self):
+        """
+        Closes the file.
+
+        Returns:
+            None
+        """
+        self._file.close()
+
+
+class SocketEventSink:
+    """
+    Sink sending the drift events to a local socket, one JSON object per line. The connection is opened with the
+    first batch and opened again after an error, so the consumer may start after the detection.
+
+    Attributes:
+        address (str or tuple): Path of a Unix domain socket, or (host, port) of a TCP socket.
+        timeout (float): Timeout of connecting and sending in seconds.
+
+    Methods:
+        __init__: Initializes the SocketEventSink with specified parameters.
+        write: Sends events to the socket.
+        close: Closes the connection.
+    """
+
+    def __init__(self, address, timeout=1.0):
+        """
+        Initializes the SocketEventSink with specified parameters.
+
+        Args:
+            address (str or tuple): Path of a Unix domain socket, or (host, port) of a TCP socket.
+            timeout (float, optional): Timeout of connecting and sending in seconds. Default is 1.
+
+        Returns:
+            None
+        """
+        self.address = address if isinstance(address, str) else tuple(address)
+        self.timeout = timeout
+        self._sock = None
+
+    def _connect(self):
+        if isinstance(self.address, str):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.address)
+            except OSError:
+                sock.close()
+                raise
+            return sock
+
+        return socket.create_connection(self.address, timeout=self.timeout)
+
+    def write(self, events):
+        """
+        Sends events to the socket.
+
+        Args:
+            events (list): The events.
+
+        Returns:
+            None
+        """
+        if self._sock is None:
+            self._sock = self._connect()
+        try:
+            self._sock.sendall(''.join(json.dumps(event) + '\n' for event in events).encode())
+        except OSError:
+            self.close()
+            raise
+
+    def close(self):
+        """
+        Closes the connection.
+
+        Returns:
+            None
+        """
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class SqliteEventSink:
+    """
+    Sink inserting the drift events into a table of a local SQLite database, with the columns tag, idx, timestamp,
+    value and detector. The events of a batch are inserted in one transaction.
+
+    Attributes:
+        path (str): Path of the SQLite database.
+        table (str): Name of the table.
+
+    Methods:
+        __init__: Initializes the SqliteEventSink and creates the table.
+        write: Inserts events into the table.
+        close: Closes the database.
+    """
+
+    def __init__(self, path, table='drift_events'):
+        """
+        Initializes the SqliteEventSink and creates the table.
+
+        Args:
+            path (str): Path of the SQLite database.
+            table (str, optional): Name of the table. Default is 'drift_events'.
+
+        Returns:
+            None
+        """
+        self.path = path
+        self.table = table
+        # The connection is used by the thread of the publisher and closed by the thread that closes the publisher
+        self._con = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._con:
+            self._con.execute(f'CREATE TABLE IF NOT EXISTS "{table}" (tag TEXT, idx INTEGER, timestamp TEXT, '
+                              f'value REAL, detector TEXT)')
+
+    def write(self, events):
+        """
+        Inserts events into the table.
+
+        Args:
+            events (list): The events.
+
+        Returns:
+            None
+        """
+        with self._con:
+            self._con.executemany(f'INSERT INTO "{self.table}" VALUES (?, ?, ?, ?, ?)',
+                                  [(e['tag'], e['index'], e['timestamp'], e['value'], e['detector'])
+                                   for e in events])
+
+    def close(self):
+        """
+        Closes the database.
+
+        Returns:
+            None
+        """
+        self._con.close()
+
+
+def build_event_sinks(config):
+    """
+    Builds the sinks of the events section of a config.
+
+    Args:
+        config (dict): The events section, with the optional keys 'jsonl' (path of the file), 'socket' (path of a Unix
+            domain socket or [host, port]) and 'sqlite' (path of the database), each None if not used.
+
+    Returns:
+        list: The sinks.
+    """
+    sinks = []
+    if config.get('jsonl'):
+        sinks.append(JsonLinesEventSink(config['jsonl']))
+    if config.get('socket'):
+        sinks.append(SocketEventSink(config['socket']))
+    if config.get('sqlite'):
+        sinks.append(SqliteEventSink(config['sqlite']))
+
+    return sinks
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# This file contains a bounded history of detected drifts for detectors that monitor a data stream for a long time.
+# The most recent drifts are kept in a preallocated ring buffer, older drifts are passed to an optional sink (e.g. a
+# file) when they are overwritten, and cumulative counters summarize all drifts since the start.
+# library: numpy
+# -----------------------------------------------------------------------------------------------------------
+import numpy as np
+
+
+class DriftHistory:
+    """
+    Ring buffer of the indices and statistic values of the most recent drifts.
+
+    Attributes:
+        capacity (int): Number of drifts kept in the buffer.
+        sink (callable): Function called with the index and statistic value of every drift that is removed from the
+            buffer, None to discard them.
+        cnt_drift (int): Number of drifts since the start.
+        cnt_spilled (int): Number of drifts removed from the buffer.
+        value_sum (float): Sum of the statistic values of all drifts.
+        value_min (float): Smallest statistic value of all drifts.
+        value_max (float): Largest statistic value of all drifts.
+
+    Methods:
+        __init__: Initializes the DriftHistory with specified parameters.
+        append: Adds a drift, passing the oldest drift to the sink if the buffer is full.
+        drift_ind: Returns the indices of the drifts in the buffer.
+        result_list: Returns the statistic values of the drifts in the buffer.
+        flush: Passes all drifts in the buffer to the sink and empties the buffer.
+    """
+
+    def __init__(self, capacity, sink=None):
+        """
+        Initializes the DriftHistory with specified parameters.
+
+        Args:
+            capacity (int): Number of drifts kept in the buffer.
+            sink (callable, optional): Function called with the index and statistic value of every drift that is
+                removed from the buffer. Default is None (removed drifts are discarded).
+
+        Returns:
+            None
+        """
+        self.capacity = capacity
+        self.sink = sink
+        self._ind = np.empty(capacity, dtype=np.int64)
+        self._values = np.empty(capacity, dtype=np.float64)
+        self._start = 0
+        self._size = 0
+        self.cnt_drift = 0
+        self.cnt_spilled = 0
+        self.value_sum = 0.0
+        self.value_min = np.inf
+        self.value_max = -np.inf
+
+    def __len__(self):
+        return self._size
+
+    def append(self, index, value):
+        """
+        Adds a drift, passing the oldest drift to the sink if the buffer is full.
+
+        Args:
+            index (int): Index of the data stream where the drift was detected.
+            value (float): The statistic value of the drift.
+
+        Returns:
+            None
+        """
+        if self._size == self.capacity:
+            self._spill(self._start)
+            self._start = (self._start + 1) % self.capacity
+            self._size -= 1
+
+        pos = (self._start + self._size) % self.capacity
+        self._ind[pos] = index
+        self._values[pos] = value
+        self._size += 1
+
+        self.cnt_drift += 1
+        self.value_sum += value
+        self.value_min = min(self.value_min, value)
+        self.value_max = max(self.value_max, value)
+
+    def _spill(self, pos):
+        self.cnt_spilled += 1
+        if self.sink is not None:
+            self.sink(int(self._ind[pos]), float(self._values[pos]))
+
+    def _order(self):
+        return (self._start + np.arange(self._size)) % self.capacity
+
+    def drift_ind(self):
+        """
+        Returns the indices of the drifts in the buffer, oldest first.
+
+        Returns:
+            numpy.ndarray: The indices of the drifts.
+        """
+        return self._ind[self._order()]
+
+    def result_list(self):
+        """
+        Returns the statistic values of the drifts in the buffer, oldest first.
+
+        Returns:
+            numpy.ndarray: The statistic values of the drifts.
+        """
+        return self._values[self._order()]
+
+    def flush(self):
+        """
+        Passes all drifts in the buffer to the sink and empties the buffer.
+
+        Returns:
+            None
+        """
+        for pos in self._order():
+            self._spill(pos)
+        self._start = 0
+        self._size = 0
+
+
+class CsvDriftSink:
+    """
+    Sink of a DriftHistory that appends the removed drifts to a csv file with the columns index and value.
+
+    Attributes:
+        path (str): Path of the csv file.
+
+    Methods:
+        __init__: Initializes the CsvDriftSink and opens the csv file.
+        __call__: Appends a drift to the csv file.
+        close: Closes the csv file.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes the CsvDriftSink and opens the csv file.
+
+        Args:
+            path (str): Path of the csv file, the drifts are appended if it exists.
+
+        Returns:
+            None
+        """
+        self.path = path
+        self._file = open(path, 'a')
+
+    def __call__(self, index, value):
+        """
+        Appends a drift to the csv file.
+
+        Args:
+            index (int): Index of the data stream where the drift was detected.
+            value (float): The statistic value of the drift.
+
+        Returns:
+            None
+        """
+        self._file.write(f'{index},{value!r}\n')
+
+    def close(self):
+        """
+        Closes the csv file.
+
+        Returns:
+            None
+        """
+        self._file.close()
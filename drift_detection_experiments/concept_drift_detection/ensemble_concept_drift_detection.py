@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# This file contains an ensemble runner that applies several concept drift detectors to a data stream in one pass.
+# The windowed detectors share the window extraction and the rank engine, so every batch is sliced, sorted and
+# merged into the references only once, while every detector keeps its own reference, results and execution time.
+# Optionally the drifts of all detectors are combined by a majority vote.
+# library: numpy
+# -----------------------------------------------------------------------------------------------------------
+import importlib
+import inspect
+import time
+
+import numpy as np
+
+from rank_two_sample_engine import RankTwoSampleEngine
+from window_concept_drift_detection import WindowConceptDriftDetector
+
+
+def build_detectors(detector_configs, engine=None):
+    """
+    Builds the detectors of an ensemble from their configurations. Every detector that accepts a rank engine gets the
+    same engine, so the batches are only sorted once for all of them.
+
+    Args:
+        detector_configs (list): List of detector configurations, each a dictionary with the detector 'class' as
+            'module.Class' and the detector 'params', as in the 'detector' section of config.json.
+        engine (RankTwoSampleEngine, optional): The shared rank engine. Default is a new engine.
+
+    Returns:
+        list: The detectors in the order of the configurations.
+    """
+    engine = engine if engine is not None else RankTwoSampleEngine(max_references=max(8, len(detector_configs)))
+    detectors = []
+    for detector_config in detector_configs:
+        detector_module, detector_class = detector_config['class'].rsplit('.', 1)
+        DetectorClass = getattr(importlib.import_module(detector_module), detector_class)
+        params = dict(detector_config['params'])
+        if 'engine' in inspect.signature(DetectorClass).parameters:
+            params['engine'] = engine
+        detectors.append(DetectorClass(**params))
+
+    return detectors
+
+
+class EnsembleConceptDriftDetector:
+    """
+    Runs several concept drift detectors on a data stream in a single pass.
+
+    The windowed detectors (subclasses of WindowConceptDriftDetector) must use the same batch size. Every batch is
+    extracted once and passed to all windowed detectors, which compute their statistics against their own
+    references. Detectors that share a rank engine sort and merge each batch only once. The sequential detectors
+    (ADWIN, Page Hinkley) process the stream value by value and are run on the full stream.
+
+    Attributes:
+        detectors (list): The detectors of the ensemble.
+        names (list): Names of the detectors, used as keys of the results.
+        min_votes (int): Number of detectors that must detect a drift in the same voting window for a drift of the
+            ensemble. None disables the voting.
+        vote_window (int): Size of the voting windows of the data stream.
+        batch_size (int): Common batch size of the windowed detectors, None if there are no windowed detectors.
+        exec_time (dict): Execution time of every detector in seconds.
+
+    Methods:
+        __init__: Initializes the EnsembleConceptDriftDetector with specified parameters.
+        detect_drift_window: Monitors a data stream for concept drifts with all detectors.
+        vote: Combines the drifts of all detectors by a majority vote.
+    """
+
+    def __init__(self, detectors, names=None, min_votes=None, vote_window=None):
+        """
+        Initializes the EnsembleConceptDriftDetector with specified parameters.
+
+        Args:
+            detectors (list): The detectors of the ensemble, e.g. built with build_detectors.
+            names (list, optional): Names of the detectors. Default is the class name of each detector, numbered if
+                a class is used more than once.
+            min_votes (int, optional): Number of detectors that must detect a drift in the same voting window for a
+                drift of the ensemble. Default is None (no voting).
+            vote_window (int, optional): Size of the voting windows. Default is the batch size of the windowed
+                detectors.
+
+        Returns:
+            None
+        """
+        batch_sizes = {detector.batch_size for detector in detectors
+                       if isinstance(detector, WindowConceptDriftDetector)}
+        if len(batch_sizes) > 1:
+            raise ValueError(f'The windowed detectors of an ensemble must use the same batch size, got {batch_sizes}')
+        self.batch_size = batch_sizes.pop() if batch_sizes else None
+
+        if names is None:
+            class_names = [type(detector).__name__ for detector in detectors]
+            names = [name if class_names.count(name) == 1 else f'{name}_{class_names[:i].count(name)}'
+                     for i, name in enumerate(class_names)]
+        if len(names) != len(detectors) or len(set(names)) != len(names):
+            raise ValueError('The ensemble needs one unique name per detector')
+
+        self.vote_window = vote_window if vote_window is not None else self.batch_size
+        if min_votes is not None and self.vote_window is None:
+            raise ValueError('The voting window must be given if the ensemble has no windowed detectors')
+
+        self.detectors = detectors
+        self.names = names
+        self.min_votes = min_votes
+        self.exec_time = {name: 0.0 for name in names}
+
+    def detect_drift_window(self, data_stream, overlapping=False, stride=1, bounds=None):
+        """
+        Monitors a data stream for concept drifts with all detectors. The windowed detectors record the same indices
+        as their own detect_drift_window, or detect_drift_time_window if bounds are given.
+
+        Args:
+            data_stream (array-like): The data stream to monitor for concept drifts.
+            overlapping (bool, optional): If True, the windowed detectors use overlapping batches. Default is False.
+            stride (int, optional): Step between the start of two consecutive batches in overlapping mode.
+                Default is 1.
+            bounds (tuple, optional): First index and index after the last value of every batch, e.g. from
+                time_window_bounds or MaskedStream.count_window_bounds. Default is None (batches of batch_size values).
+
+        Returns:
+            dict: A dictionary with the results of every detector by name, each containing 'drift_ind',
+                'result_list', 'cnt_drift' and 'time' (execution time in seconds). If voting is enabled, the key
+                'vote' contains the results of the ensemble (see vote).
+        """
+        windowed = [(name, detector) for name, detector in zip(self.names, self.detectors)
+                    if isinstance(detector, WindowConceptDriftDetector)]
+
+        for name, detector in zip(self.names, self.detectors):
+            if not isinstance(detector, WindowConceptDriftDetector):
+                st = time.perf_counter()
+                detector.detect_drift_window(data_stream)
+                self.exec_time[name] += time.perf_counter() - st
+
+        if windowed:
+            if bounds is not None:
+                batches = zip(np.asarray(bounds[0]).tolist(), np.asarray(bounds[1]).tolist())
+            elif overlapping:
+                batches = ((i, i + self.batch_size) for i in range(0, len(data_stream) - self.batch_size + 1, stride))
+            else:
+                batches = ((i, i + self.batch_size) for i in range(0, len(data_stream), self.batch_size))
+
+            for i, j in batches:
+                batch_data = data_stream[i:j]
+                for name, detector in windowed:
+                    st = time.perf_counter()
+                    if detector.process_batch(batch_data, i, overlapping):
+                        print(f'{name}: Concept drift detected at index {j - 1}')
+                    self.exec_time[name] += time.perf_counter() - st
+
+        results = {}
+        for name, detector in zip(self.names, self.detectors):
+            if isinstance(detector, WindowConceptDriftDetector):
+                results[name] = dict(detector.results(), time=self.exec_time[name])
+            else:
+                results[name] = {'drift_ind': detector.drift_ind, 'result_list': detector.result_list,
+                                 'cnt_drift': detector.cnt_drift, 'time': self.exec_time[name]}
+        if self.min_votes is not None:
+            results['vote'] = self.vote(results)
+
+        return results
+
+    def vote(self, results):
+        """
+        Combines the drifts of all detectors by a majority vote. The data stream is divided into voting windows and
+        a drift of the ensemble is detected in every window in which at least min_votes detectors detected a drift.
+
+        Args:
+            results (dict): The results of the detectors by name, as returned by detect_drift_window.
+
+        Returns:
+            dict: A dictionary containing the following information:
+                - 'drift_ind' (list): Start indices of the voting windows with a drift of the ensemble.
+                - 'result_list' (list): Number of detectors that detected a drift in these windows.
+                - 'cnt_drift' (int): Number of drifts of the ensemble.
+        """
+        votes = {}
+        for name in self.names:
+            for window in {ind // self.vote_window for ind in results[name]['drift_ind']}:
+                votes[window] = votes.get(window, 0) + 1
+
+        windows = sorted(window for window, cnt in votes.items() if cnt >= self.min_votes)
+
+        return {'drift_ind': [window * self.vote_window for window in windows],
+                'result_list': [votes[window] for window in windows], 'cnt_drift': len(windows)}
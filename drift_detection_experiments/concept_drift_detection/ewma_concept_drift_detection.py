@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# Univariate concept drift detection with an EWMA control chart. The exponentially weighted moving average is computed
+# for whole segments with the linear recurrence filter of scipy, and compared with the time-varying control limits.
+# library: numpy / scipy
+# reference: Roberts, S. W. (1959). Control chart tests based on geometric moving averages. Technometrics, 1(3),
+#            239-250.
+# -----------------------------------------------------------------------------------------------------------
+import numpy as np
+from scipy.signal import lfilter
+
+from control_chart_concept_drift_detection import ControlChartConceptDriftDetector
+
+
+class EwmaConceptDriftDetector(ControlChartConceptDriftDetector):
+    """
+    Concept Drift Detector based on an exponentially weighted moving average (EWMA) control chart.
+
+    The values are standardized with the mean and standard deviation of the warm-up period and smoothed with
+    z_t = smoothing * x_t + (1 - smoothing) * z_{t-1}, starting at 0. A drift is detected when z_t leaves the control
+    limits +-threshold * sqrt(smoothing / (2 - smoothing) * (1 - (1 - smoothing)^(2t))).
+
+    Attributes:
+        threshold (float): Width L of the control limits in standard deviations of the EWMA.
+        smoothing (float): Smoothing factor lambda of the EWMA.
+
+    Methods:
+        __init__: Initializes the EwmaConceptDriftDetector with specified parameters.
+        start_chart: Returns the EWMA after the warm-up period.
+        chart: Computes the EWMA for a segment of standardized values.
+
+    Reference:
+        - Roberts, S. W. (1959). Control chart tests based on geometric moving averages. Technometrics, 1(3),
+          239-250.
+    """
+
+    def __init__(self, threshold=3.0, smoothing=0.2, min_instances=30, segment_size=65536):
+        """
+        Initializes the EwmaConceptDriftDetector with specified parameters.
+
+        Args:
+            threshold (float, optional): Width L of the control limits. Default is 3.
+            smoothing (float, optional): Smoothing factor lambda between 0 and 1. Default is 0.2.
+            min_instances (int, optional): Number of values of the warm-up period. Default is 30.
+            segment_size (int, optional): Maximum number of values for which the chart is computed at once.
+                Default is 65536.
+
+        Returns:
+            None
+        """
+        super().__init__(min_instances, segment_size)
+        self.threshold = threshold
+        self.smoothing = smoothing
+
+    def start_chart(self):
+        """
+        Returns the EWMA after the warm-up period.
+
+        Returns:
+            tuple: The EWMA (0) and the number of monitored values (0).
+        """
+        return 0.0, 0
+
+    def chart(self, z, state):
+        """
+        Computes the EWMA for a segment of standardized values.
+
+        Args:
+            z (numpy.ndarray): The standardized values of the segment.
+            state (tuple): The EWMA and the number of monitored values before the segment.
+
+        Returns:
+            tuple: The EWMA of every value, a boolean array of the alarms and the EWMA and number of monitored values
+                after the segment.
+        """
+        ewma, _ = lfilter([self.smoothing], [1.0, self.smoothing - 1.0], z,
+                          zi=[(1.0 - self.smoothing) * state[0]])
+        t = state[1] + np.arange(1, len(z) + 1)
+        limit = self.threshold * np.sqrt(self.smoothing / (2.0 - self.smoothing)
+                                         * (1.0 - (1.0 - self.smoothing) ** (2 * t)))
+
+        return ewma, np.abs(ewma) > limit, (ewma[-1], t[-1])
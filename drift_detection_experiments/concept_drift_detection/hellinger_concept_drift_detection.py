@@ -2,14 +2,15 @@
 # -----------------------------------------------------------------------------------------------------------
 # Description:
 # This python file contains a univarate concept drift detector based on the hellinger distance
-# library: frouros
+# library: numpy (same results as the frouros HellingerDistance detector)
 # reference :https://github.com/IFCA/frouros/blob/main/frouros/detectors/
 # data_drift/batch/distance_based/hellinger_distance.py
 # -----------------------------------------------------------------------------------------------------------
-from frouros.detectors.data_drift.batch.distance_based import HellingerDistance
+from rank_two_sample_engine import RankTwoSampleEngine
+from window_concept_drift_detection import WindowConceptDriftDetector
 
 
-class HellingerDistanceDriftDetector:
+class HellingerDistanceDriftDetector(WindowConceptDriftDetector):
     """
     Concept Drift Detector based on the Hellinger Distance.
 
@@ -18,99 +19,66 @@ class HellingerDistanceDriftDetector:
         threshold (float): The threshold value for drift detection.
         reference_data (array-like): Reference data used for drift detection.
         drift_ind (list): List to store indices where concept drift is detected.
-        detector: Instance of HellingerDistance for computing Hellinger Distance.
+        engine (RankTwoSampleEngine): Engine computing the Hellinger Distance from the sorted batches, can be shared with
+            other detectors running on the same batches.
         cnt_drift (int): Counter to keep track of the number of detected concept drifts.
         result_list (list): List to store distances of drift detection results.
-        distance (float): The distance value of the most recent drift detection.
+        distance (float): The distance value of the most recent batch.
 
     Methods:
         __init__: Initializes the HellingerDistanceDriftDetector with specified parameters.
-        detect_drift: Detects concept drift in a given batch of new data.
-        detect_drift_window: Monitors a data stream for concept drifts using batches of data.
+        statistic: Computes the Hellinger Distance for a given batch of data.
+        is_drift: Decides whether a distance indicates a concept drift.
 
     Reference:
         - Library: frouros
         - Reference: https://github.com/IFCA/frouros/blob/main/frouros/detectors/data_drift/batch/distance_based/hellinger_distance.py
     """
 
-    def __init__(self, batch_size, threshold):
+    def __init__(self, batch_size, threshold, engine=None, reference_size=None, reference_decay=0.0):
         """
         Initializes the HellingerDistanceDriftDetector with specified parameters.
 
         Args:
             batch_size (int): Size of the data batches used for drift detection.
             threshold (float): The threshold value for drift detection.
+            engine (RankTwoSampleEngine, optional): Engine to use, e.g. the engine of other detectors running on the
+                same batches. Default is a new engine.
+            reference_size (int, optional): Maximum size of a reservoir sample of the stable period used as
+                reference. Default is None (the batch that triggered the last drift is the reference).
+            reference_decay (float, optional): Decay rate per batch of the weights of the reservoir sample.
+                Default is 0 (uniform sample).
 
         Returns:
             None
         """
-        self.batch_size = batch_size
+        super().__init__(batch_size, reference_size, reference_decay)
         self.threshold = threshold
-        self.reference_data = None
-        self.drift_ind = []
-        self.detector = HellingerDistance()
-        self.cnt_drift = 0
-        self.result_list = []
+        self.engine = engine if engine is not None else RankTwoSampleEngine()
         self.distance = None
 
-    def detect_drift(self, new_data):
+    def statistic(self, new_data):
         """
-        Detects concept drift in a given batch of new data using the Hellinger Distance.
+        Computes the Hellinger Distance between the reference data and a given batch of new data.
 
         Args:
             new_data (array-like): The new data batch to analyze for concept drift.
 
         Returns:
-            bool: True if concept drift is detected, False otherwise.
+            float: The Hellinger Distance.
         """
-        if self.reference_data is None:
-            self.reference_data = new_data
-
-        self.detector.fit(self.reference_data)
-
-        result = self.detector.compare(new_data)
-        self.distance = result[0].distance
+        self.distance = self.engine.hellinger(self.reference_data, new_data)
 
-        if result[0].distance > self.threshold:
-            return True
-        else:
-            return False
+        return self.distance
 
-    def detect_drift_window(self, data_stream, overlapping=False):
+    def is_drift(self, value):
         """
-        Monitors a data stream for concept drifts using batches of data.
+        Decides whether a Hellinger Distance indicates a concept drift.
 
         Args:
-            data_stream (array-like): The data stream to monitor for concept drifts.
-            overlapping (bool, optional): If True, allow overlapping batches. Default is False.
+            value (float): The Hellinger Distance.
 
         Returns:
-            dict: A dictionary containing the following information:
-                - 'drift_ind' (list): Indices where concept drift is detected.
-                - 'result_list' (list): List of distances from drift detection results.
-                - 'cnt_drift' (int): Number of detected concept drifts.
+            bool: True if concept drift is detected, False otherwise.
         """
-
-        if overlapping:
-
-            for i in range(len(data_stream) - self.batch_size + 1):
-                batch_data = data_stream[i:i + self.batch_size]
-                if self.detect_drift(batch_data):
-                    print(f'Concept drift detected at index {i + self.batch_size - 1}')
-                    self.drift_ind.append(i + self.batch_size - 1)
-                    self.cnt_drift += 1
-                    self.result_list.append(self.distance)
-                    self.reference_data = batch_data
-
-        else:
-
-            for i in range(0, data_stream.shape[0], self.batch_size):
-                batch_data = data_stream[i:i + self.batch_size]
-                if self.detect_drift(batch_data):
-                    print(f'Concept drift detected at index {i + self.batch_size - 1}')
-                    self.drift_ind.append(i)
-                    self.cnt_drift += 1
-                    self.result_list.append(self.distance)
-                    self.reference_data = batch_data
-
-        return {'drift_ind': self.drift_ind, 'result_list': self.result_list, 'cnt_drift': self.cnt_drift}
+        return value > self.threshold
@@ -1,15 +1,16 @@
 #!/usr/bin/env python3
 # -----------------------------------------------------------------------------------------------------------
 # Description:
-# This file contains an implementation of the Kolmogorov Smirnov Drift Detection algorithm based on scipy.stats
-# Kolmogorov Smirnov Test
-# Library: scipy
+# This file contains an implementation of the Kolmogorov Smirnov Drift Detection algorithm based on the
+# Kolmogorov Smirnov Test of the rank engine, which gives the same results as scipy.stats.ks_2samp
+# Library: numpy / scipy
 #  Reference: https://docs.scipy.org/doc/scipy/reference/generated/scipy.stats.ks_2samp.html
 # -----------------------------------------------------------------------------------------------------------
-from scipy.stats import ks_2samp
+from rank_two_sample_engine import RankTwoSampleEngine
+from window_concept_drift_detection import WindowConceptDriftDetector
 
 
-class KS_Concept_Drift_Detector:
+class KS_Concept_Drift_Detector(WindowConceptDriftDetector):
     """
     Concept Drift Detector based on the Kolmogorov-Smirnov Test using a sliding window approach.
 
@@ -20,107 +21,81 @@ class KS_Concept_Drift_Detector:
         drift_ind (list): List to store indices where concept drift is detected.
         cnt_drift (int): Counter to keep track of the number of detected concept drifts.
         result_list (list): List to store p-values of drift detection results.
+        engine (RankTwoSampleEngine): Rank engine computing the test, can be shared with a CvmConceptDriftDetector.
+        ks_stat (float): The Kolmogorov-Smirnov test statistic of the most recent batch.
+        p_value (float): The p-value of the most recent batch.
 
     Methods:
         __init__: Initializes the KS_Concept_Drift_Detector with specified parameters.
-        detect_drift: Detects concept drift in a given batch of new data.
+        statistic: Computes the p-value of the Kolmogorov-Smirnov Test for a given batch of data.
+        is_drift: Decides whether a p-value indicates a concept drift.
         test_stat: Computes the Kolmogorov-Smirnov test statistic and p-value for a given batch of data.
-        detect_drift_window: Monitors a data stream for concept drifts using batches of data.
 
     Reference:
-        - Library: scipy
+        - Library: numpy / scipy
         - Reference: https://docs.scipy.org/doc/scipy/reference/generated/scipy.stats.ks_2samp.html
     """
 
-    def __init__(self, batch_size, significance_level):
+    def __init__(self, batch_size, significance_level, engine=None, reference_size=None, reference_decay=0.0):
         """
         Initializes the KS_Concept_Drift_Detector with specified parameters.
 
         Args:
             batch_size (int): Size of the data batches used for drift detection.
             significance_level (float): The significance level for drift detection.
+            engine (RankTwoSampleEngine, optional): Rank engine to use, e.g. the engine of a CvmConceptDriftDetector
+                running on the same batches. Default is a new engine.
+            reference_size (int, optional): Maximum size of a reservoir sample of the stable period used as
+                reference. Default is None (the batch that triggered the last drift is the reference).
+            reference_decay (float, optional): Decay rate per batch of the weights of the reservoir sample.
+                Default is 0 (uniform sample).
 
         Returns:
             None
         """
-        self.batch_size = batch_size
+        super().__init__(batch_size, reference_size, reference_decay)
         self.significance_level = significance_level
-        self.reference_data = None
-        self.drift_ind = []
-        self.cnt_drift = 0
-        self.result_list = []
+        self.engine = engine if engine is not None else RankTwoSampleEngine()
+        self.ks_stat = None
+        self.p_value = None
 
-    def detect_drift(self, new_data):
+    def statistic(self, new_data):
         """
-        Detects concept drift in a given batch of new data using the Kolmogorov-Smirnov Test.
+        Computes the p-value of the Kolmogorov-Smirnov Test for a given batch of new data.
 
         Args:
             new_data (array-like): The new data batch to analyze for concept drift.
 
         Returns:
-            bool: True if concept drift is detected, False otherwise.
+            float: The p-value of the Kolmogorov-Smirnov Test.
         """
+        self.ks_stat, self.p_value = self.engine.ks(self.reference_data, new_data)
 
-        if self.reference_data is None:
-            self.reference_data = new_data
-
-        ks_stat, p_value = ks_2samp(new_data, self.reference_data)
-
-        if p_value < self.significance_level:
-            return True
-        else:
-            return False
+        return self.p_value
 
-    def test_stat(self, new_data):
+    def is_drift(self, value):
         """
-        Computes the Kolmogorov-Smirnov test statistic and p-value for a given batch of data.
+        Decides whether a p-value of the Kolmogorov-Smirnov Test indicates a concept drift.
 
         Args:
-            new_data (array-like): The data batch to analyze for concept drift.
+            value (float): The p-value of the Kolmogorov-Smirnov Test.
 
         Returns:
-            tuple: A tuple containing the Kolmogorov-Smirnov test statistic and p-value.
+            bool: True if concept drift is detected, False otherwise.
         """
-        if self.reference_data is None:
-            self.reference_data = new_data
+        return value < self.significance_level
 
-        return ks_2samp(new_data, self.reference_data)
-
-    def detect_drift_window(self, data_stream, overlapping=False):
+    def test_stat(self, new_data):
         """
-        Monitors a data stream for concept drifts using batches of data.
+        Computes the Kolmogorov-Smirnov test statistic and p-value for a given batch of data.
 
         Args:
-            data_stream (array-like): The data stream to monitor for concept drifts.
-            overlapping (bool, optional): If True, allow overlapping batches. Default is False.
+            new_data (array-like): The data batch to analyze for concept drift.
 
         Returns:
-            dict: A dictionary containing the following information:
-                - 'drift_ind' (list): Indices where concept drift is detected.
-                - 'result_list' (list): List of p-values from drift detection results.
-                - 'cnt_drift' (int): Number of detected concept drifts.
+            tuple: A tuple containing the Kolmogorov-Smirnov test statistic and p-value.
         """
+        if self.reference_data is None:
+            self.set_reference(new_data)
 
-        if overlapping:
-            for i in range(len(data_stream) - self.batch_size + 1):
-                batch_data = data_stream[i:i + self.batch_size]
-                if self.detect_drift(batch_data):
-                    print(f'Concept drift detected at index {i + self.batch_size - 1}')
-                    self.cnt_drift += 1
-                    self.drift_ind.append(i + self.batch_size - 1)
-                    ks_stat, p_value = self.test_stat(batch_data)
-                    self.result_list.append(p_value)
-                    self.reference_data = batch_data
-
-        else:
-            for i in range(0, data_stream.shape[0], self.batch_size):
-                batch_data = data_stream[i:i + self.batch_size]
-                if self.detect_drift(batch_data):
-                    print(f'Concept drift detected at index {i + self.batch_size - 1}')
-                    self.cnt_drift += 1
-                    self.drift_ind.append(i)
-                    ks_stat, p_value = self.test_stat(batch_data)
-                    self.result_list.append(p_value)
-                    self.reference_data = batch_data
-
-        return {'drift_ind': self.drift_ind, 'result_list': self.result_list, 'cnt_drift': self.cnt_drift}
+        return self.engine.ks(self.reference_data, new_data)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# This file contains the shared handling of sensor dropouts (NaN or infinite values) for all detectors. The validity
+# mask, the valid values and the gaps of a stream are computed once with vectorized operations. Batches consist of
+# valid values only: the boundaries of all batches are computed at once from a prefix count of the mask, batches whose
+# share of valid values is below a minimum fill ratio are skipped, and every batch is a slice of the valid values.
+# Indices of the valid values are mapped back to the rows of the raw stream.
+# library: numpy
+# -----------------------------------------------------------------------------------------------------------
+import numpy as np
+
+
+class MaskedStream:
+    """
+    Data stream with its validity mask, the compacted valid values and the gaps of invalid values.
+
+    A row is valid if all its values are finite. Detectors run on values (the valid rows only), with batches from
+    count_window_bounds or time_window_bounds on the timestamps of the valid rows, and their drift indices are mapped
+    to the raw rows with raw_index.
+
+    Attributes:
+        mask (numpy.ndarray): Boolean validity mask of the raw rows.
+        values (numpy.ndarray): The valid rows.
+        valid_index (numpy.ndarray): Raw index of every valid row.
+
+    Methods:
+        __init__: Initializes the MaskedStream and computes the validity mask and the valid values.
+        gaps: Returns the runs of invalid rows.
+        count_window_bounds: Returns the boundaries of count-based batches of valid values.
+        valid_bounds: Returns the boundaries of the valid values of a range of raw rows.
+        raw_index: Maps indices of the valid values to raw rows.
+    """
+
+    def __init__(self, data_stream):
+        """
+        Initializes the MaskedStream and computes the validity mask and the valid values.
+
+        Args:
+            data_stream (array-like): The raw data stream, one- or two-dimensional (one column per tag).
+
+        Returns:
+            None
+        """
+        data_stream = np.asarray(data_stream)
+        finite = np.isfinite(data_stream)
+        self.mask = finite if finite.ndim == 1 else finite.all(axis=1)
+        self.values = data_stream[self.mask]
+        self.valid_index = np.flatnonzero(self.mask)
+        self._cum_valid = np.concatenate([[0], np.cumsum(self.mask)])
+
+    def __len__(self):
+        return len(self.mask)
+
+    def gaps(self):
+        """
+        Returns the runs of invalid rows.
+
+        Returns:
+            tuple: Arrays with the first raw index and the raw index after the last row of every gap.
+        """
+        edges = np.diff(np.concatenate([[0], (~self.mask).view(np.int8), [0]]))
+
+        return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+    def count_window_bounds(self, batch_size, overlapping=False, stride=1, min_fill=0.0):
+        """
+        Returns the boundaries of the batches of detect_drift_window in the valid values. The batches cover the same
+        raw rows as the batches of the raw stream, but contain only their valid values, and batches in which the share
+        of valid values is below min_fill are skipped.
+
+        Args:
+            batch_size (int): Number of raw rows of a batch.
+            overlapping (bool, optional): If True, the batches overlap. Default is False.
+            stride (int, optional): Step between the start of two consecutive batches in overlapping mode.
+                Default is 1.
+            min_fill (float, optional): Smallest share of valid values of a batch. Default is 0 (batches with at
+                least one valid value).
+
+        Returns:
+            tuple: Arrays with the first index and the index after the last value of every batch in values, for
+                detect_drift_time_window.
+        """
+        n = len(self.mask)
+        if overlapping:
+            raw_starts = np.arange(0, n - batch_size + 1, stride)
+        else:
+            raw_starts = np.arange(0, n, batch_size)
+        raw_ends = np.minimum(raw_starts + batch_size, n)
+
+        starts = self._cum_valid[raw_starts]
+        ends = self._cum_valid[raw_ends]
+        keep = (ends > starts) & (ends - starts >= min_fill * (raw_ends - raw_starts))
+
+        return starts[keep], ends[keep]
+
+    def valid_bounds(self, raw_start, raw_end):
+        """
+        Returns the boundaries of the valid values of a range of raw rows in values.
+
+        Args:
+            raw_start (int): First raw row.
+            raw_end (int): Raw row after the last row.
+
+        Returns:
+            tuple: The first index and the index after the last value in values.
+        """
+        return int(self._cum_valid[raw_start]), int(self._cum_valid[raw_end])
+
+    def raw_index(self, ind):
+        """
+        Maps indices of the valid values, e.g. the drift indices of a detector, to raw rows.
+
+        Args:
+            ind (list): Indices of the valid values.
+
+        Returns:
+            list: The raw indices.
+        """
+        return self.valid_index[np.asarray(ind, dtype=np.int64)].tolist()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# This file contains a permutation test calibration for the distance based drift detectors (JS, Hellinger, EMD, MMD
+# and PSI). For a pair of consecutive batches, the pooled sample is sorted once and every permutation is represented
+# as a boolean mask over the sorted pooled sample, so that thousands of permutation statistics are computed in batched
+# numpy operations. The pairs of a data stream are distributed over a process pool.
+# library: numpy / scipy
+# reference: https://en.wikipedia.org/wiki/Permutation_test
+# -----------------------------------------------------------------------------------------------------------
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from rank_two_sample_engine import auto_histogram_cdf, js_distance
+
+
+class PooledSample:
+    """
+    Pooled sample of a reference batch and a new batch, sorted once and shared by all permutations.
+
+    Attributes:
+        n_ref (int): Size of the reference batch.
+        n_new (int): Size of the new batch.
+        values (numpy.ndarray): The sorted pooled sample.
+        observed (numpy.ndarray): Mask of the reference values in the sorted pooled sample.
+
+    Methods:
+        __init__: Sorts the pooled sample and computes the mask of the observed split.
+        permutation_masks: Draws random splits of the pooled sample.
+    """
+
+    def __init__(self, reference_data, new_data):
+        """
+        Sorts the pooled sample and computes the mask of the observed split.
+
+        Args:
+            reference_data (array-like): The reference batch.
+            new_data (array-like): The new batch.
+
+        Returns:
+            None
+        """
+        reference_data = np.ravel(reference_data)
+        new_data = np.ravel(new_data)
+        self.n_ref = reference_data.shape[0]
+        self.n_new = new_data.shape[0]
+
+        pooled = np.concatenate([reference_data, new_data])
+        order = np.argsort(pooled, kind='stable')
+        self.values = pooled[order]
+        self.observed = order < self.n_ref
+
+    def permutation_masks(self, num_permutations, rng):
+        """
+        Draws random splits of the pooled sample into a reference part of size n_ref and a new part.
+
+        Args:
+            num_permutations (int): Number of random splits.
+            rng (numpy.random.Generator): Random number generator.
+
+        Returns:
+            numpy.ndarray: Boolean array of shape (num_permutations, n_ref + n_new) marking the reference values.
+        """
+        keys = rng.random((num_permutations, self.values.shape[0]))
+        kth = np.partition(keys, self.n_ref - 1, axis=1)[:, self.n_ref - 1:self.n_ref]
+
+        return keys <= kth
+
+
+def _bin_counts(masks, bin_index, num_bins):
+    """
+    Counts the reference and new values of every split per bin.
+
+    Args:
+        masks (numpy.ndarray): Boolean split masks of shape (P, N).
+        bin_index (numpy.ndarray): Bin of every value of the sorted pooled sample.
+        num_bins (int): Number of bins.
+
+    Returns:
+        tuple: Counts of the reference values and of the new values, both of shape (P, num_bins).
+    """
+    one_hot = np.zeros((bin_index.shape[0], num_bins))
+    one_hot[np.arange(bin_index.shape[0]), bin_index] = 1.0
+    ref_counts = masks @ one_hot
+
+    return ref_counts, one_hot.sum(axis=0) - ref_counts
+
+
+def hellinger_statistics(pooled, masks, num_bins=10):
+    """
+    Computes the Hellinger distance of the frouros HellingerDistance detector for every split.
+
+    Args:
+        pooled (PooledSample): The pooled sample.
+        masks (numpy.ndarray): Boolean split masks of shape (P, N).
+        num_bins (int, optional): Number of bins. Default is 10.
+
+    Returns:
+        numpy.ndarray: The Hellinger distances.
+    """
+    # The bin edges only depend on the pooled sample and are therefore the same for all splits
+    edges = np.histogram_bin_edges(pooled.values, bins=num_bins)
+    bin_index = np.minimum(np.searchsorted(edges, pooled.values, side='right') - 1, num_bins - 1)
+    ref_counts, new_counts = _bin_counts(masks, bin_index, num_bins)
+
+    diff = np.sqrt(ref_counts / pooled.n_ref) - np.sqrt(new_counts / pooled.n_new)
+    return np.sqrt(np.sum(diff ** 2, axis=1)) / np.sqrt(2)
+
+
+def psi_statistics(pooled, masks, num_bins=10):
+    """
+    Computes the mean population stability index of the PsiConceptDriftDetector for every split.
+
+    Args:
+        pooled (PooledSample): The pooled sample.
+        masks (numpy.ndarray): Boolean split masks of shape (P, N).
+        num_bins (int, optional): Number of bins. Default is 10.
+
+    Returns:
+        numpy.ndarray: The mean PSI values.
+    """
+    eps = 1e-4
+    min_val, max_val = pooled.values[0], pooled.values[-1]
+    edges = min_val + (max_val - min_val) * np.arange(num_bins + 1) / num_bins
+    edges[0] = min_val - eps
+    edges[-1] = max_val + eps
+    # Right closed intervals as in pandas.cut
+    bin_index = np.searchsorted(edges, pooled.values, side='left') - 1
+    ref_counts, new_counts = _bin_counts(masks, bin_index, num_bins)
+
+    percent_ref = ref_counts / pooled.n_ref
+    percent_new = new_counts / pooled.n_new
+    percent_ref[percent_ref == 0] = eps
+    percent_new[percent_new == 0] = eps
+
+    return np.mean((percent_ref - percent_new) * np.log(percent_ref / percent_new), axis=1)
+
+
+def emd_statistics(pooled, masks):
+    """
+    Computes the earth mover's distance (1-D Wasserstein distance) of the frouros EMD detector for every split.
+
+    Args:
+        pooled (PooledSample): The pooled sample.
+        masks (numpy.ndarray): Boolean split masks of shape (P, N).
+
+    Returns:
+        numpy.ndarray: The earth mover's distances.
+    """
+    ref_cdf = np.cumsum(masks, axis=1)
+    new_cdf = np.arange(1, masks.shape[1] + 1) - ref_cdf
+    cdf_diff = np.abs(ref_cdf / pooled.n_ref - new_cdf / pooled.n_new)
+
+    return cdf_diff[:, :-1] @ np.diff(pooled.values)
+
+
+def js_statistics(pooled, masks, num_bins=10):
+    """
+    Computes the Jensen-Shannon distance of the frouros JS detector for every split.
+
+    Args:
+        pooled (PooledSample): The pooled sample.
+        masks (numpy.ndarray): Boolean split masks of shape (P, N).
+        num_bins (int, optional): Number of bins. Default is 10.
+
+    Returns:
+        numpy.ndarray: The Jensen-Shannon distances.
+    """
+    num_splits = masks.shape[0]
+    values = np.broadcast_to(pooled.values, masks.shape)
+    # Selecting with the masks keeps the values of every row sorted
+    ref_sorted = values[masks].reshape(num_splits, pooled.n_ref)
+    new_sorted = values[~masks].reshape(num_splits, pooled.n_new)
+
+    points = np.linspace(pooled.values[0], pooled.values[-1], num_bins)
+    p = np.diff(auto_histogram_cdf(ref_sorted, points), axis=1)
+    q = np.diff(auto_histogram_cdf(new_sorted, points), axis=1)
+
+    return js_distance(p, q)
+
+
+def mmd_statistics(pooled, masks, sigma=1.0, block_size=1000):
+    """
+    Computes the maximum mean discrepancy with the RBF kernel of the frouros MMD detector for every split. The kernel
+    matrix of the pooled sample is computed once in blocks of rows and shared by all splits.
+
+    Args:
+        pooled (PooledSample): The pooled sample.
+        masks (numpy.ndarray): Boolean split masks of shape (P, N).
+        sigma (float, optional): Bandwidth of the RBF kernel. Default is 1.0.
+        block_size (int, optional): Number of kernel matrix rows computed at once. Default is 1000.
+
+    Returns:
+        numpy.ndarray: The maximum mean discrepancies.
+    """
+    n_ref, n_new = pooled.n_ref, pooled.n_new
+    a = masks.astype(float)
+    a_k = np.zeros_like(a)
+    row_sums = np.zeros(pooled.values.shape[0])
+    for start in range(0, pooled.values.shape[0], block_size):
+        block = pooled.values[start:start + block_size]
+        kernel = np.exp(-(block[:, None] - pooled.values[None, :]) ** 2 / (2 * sigma ** 2))
+        a_k += a[:, start:start + block_size] @ kernel
+        row_sums[start:start + block_size] = kernel.sum(axis=1)
+
+    k_ref_ref = np.sum(a_k * a, axis=1)
+    k_ref_all = a @ row_sums
+    k_ref_new = k_ref_all - k_ref_ref
+    k_new_new = row_sums.sum() - 2 * k_ref_all + k_ref_ref
+
+    return ((k_ref_ref - n_ref) / (n_ref * (n_ref - 1)) + (k_new_new - n_new) / (n_new * (n_new - 1))
+            - 2 * k_ref_new / (n_ref * n_new))
+
+
+# Batched statistic of every calibratable detector class and the detector parameters it depends on
+PERMUTATION_STATISTICS = {
+    'JsConceptDriftDetector': (js_statistics, ()),
+    'HellingerDistanceDriftDetector': (hellinger_statistics, ()),
+    'EmdConceptDriftDetector': (emd_statistics, ()),
+    'MmdConceptDriftDetector': (mmd_statistics, ()),
+    'PsiConceptDriftDetector': (psi_statistics, ('num_bins',)),
+}
+
+
+def permutation_test(detector_class, reference_data, new_data, num_permutations, detector_params=None, seed=None,
+                     chunk_size=250):
+    """
+    Computes the statistic of a detector for the observed split of two batches and for random permutations of the
+    pooled sample.
+
+    Args:
+        detector_class (str): Name of the detector class, e.g. 'JsConceptDriftDetector'.
+        reference_data (array-like): The reference batch.
+        new_data (array-like): The new batch.
+        num_permutations (int): Number of permutations.
+        detector_params (dict, optional): Parameters of the detector. Default is None.
+        seed (int or numpy.random.SeedSequence, optional): Seed of the permutations. Default is None.
+        chunk_size (int, optional): Number of permutations computed at once. Default is 250.
+
+    Returns:
+        tuple: The observed statistic and an array with the permutation statistics.
+    """
+    if detector_class not in PERMUTATION_STATISTICS:
+        raise ValueError(f"Detector \'{detector_class}\' can not be calibrated. Your options are "
+                         f"{list(PERMUTATION_STATISTICS)}")
+    statistics, param_names = PERMUTATION_STATISTICS[detector_class]
+    kwargs = {name: detector_params[name] for name in param_names if detector_params and name in detector_params}
+
+    rng = np.random.default_rng(seed)
+    pooled = PooledSample(reference_data, new_data)
+    observed = statistics(pooled, pooled.observed[None, :], **kwargs)[0]
+
+    permuted = []
+    for start in range(0, num_permutations, chunk_size):
+        masks = pooled.permutation_masks(min(chunk_size, num_permutations - start), rng)
+        permuted.append(statistics(pooled, masks, **kwargs))
+
+    return observed, np.concatenate(permuted)
+
+
+def _calibrate_pair(task):
+    """
+    Runs the permutation test of one pair of batches (executed in the worker processes).
+
+    Args:
+        task (tuple): Detector class, detector parameters, reference batch, new batch, number of permutations,
+            significance level and seed.
+
+    Returns:
+        tuple: The calibrated threshold, the p-value and the observed statistic of the pair.
+    """
+    detector_class, detector_params, reference_data, new_data, num_permutations, alpha, seed = task
+    observed, permuted = permutation_test(detector_class, reference_data, new_data, num_permutations,
+                                          detector_params, seed)
+    threshold = np.quantile(permuted, 1 - alpha)
+    p_value = (1 + np.sum(permuted >= observed)) / (1 + num_permutations)
+
+    return float(threshold), float(p_value), float(observed)
+
+
+def calibrate_streams(detector_class, streams, detector_params, num_references=10, num_permutations=2000,
+                      alpha=0.01, workers=None, seed=0):
+    """
+    Calibrates the threshold of a distance based detector on several data streams. For every stream, num_references
+    pairs of consecutive batches are taken evenly spaced over the stream and a permutation test is run on every pair.
+    The calibrated threshold of a pair is the (1 - alpha) quantile of its permutation statistics, the threshold of the
+    stream is the median over its pairs. Every stream must contain at least two batches.
+
+    Args:
+        detector_class (str): Name of the detector class, e.g. 'JsConceptDriftDetector'.
+        streams (dict): Data streams to calibrate on, keyed by tag.
+        detector_params (dict): Parameters of the detector, 'batch_size' is used as size of the batches.
+        num_references (int, optional): Number of pairs of batches per stream. Default is 10.
+        num_permutations (int, optional): Number of permutations per pair. Default is 2000.
+        alpha (float, optional): Significance level of the calibrated threshold. Default is 0.01.
+        workers (int, optional): Number of worker processes. Default is the number of CPUs.
+        seed (int, optional): Seed of the permutations. Default is 0.
+
+    Returns:
+        dict: A dictionary keyed by tag containing the following information:
+            - 'threshold' (float): Calibrated threshold of the stream.
+            - 'thresholds' (list): Calibrated thresholds of the pairs.
+            - 'p_values' (list): Permutation p-values of the observed statistic of the pairs.
+            - 'distances' (list): Observed statistics of the pairs.
+            - 'start_ind' (list): Start indices of the pairs in the stream.
+    """
+    batch_size = detector_params['batch_size']
+    for tag, stream in streams.items():
+        if len(stream) < 2 * batch_size:
+            raise ValueError(f"Stream '{tag}' has {len(stream)} values, the calibration needs at least two batches "
+                             f"of batch_size {batch_size}")
+    seeds = np.random.SeedSequence(seed).spawn(len(streams) * num_references)
+
+    tasks = []
+    starts = {}
+    for tag, stream in streams.items():
+        starts[tag] = np.linspace(0, len(stream) - 2 * batch_size, num_references).astype(int)
+        for start in starts[tag]:
+            tasks.append((detector_class, detector_params, stream[start:start + batch_size],
+                          stream[start + batch_size:start + 2 * batch_size], num_permutations, alpha,
+                          seeds[len(tasks)]))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pair_results = iter(list(executor.map(_calibrate_pair, tasks)))
+
+    results = {}
+    for tag in streams:
+        thresholds, p_values, distances = zip(*[next(pair_results) for _ in range(num_references)])
+        results[tag] = {'threshold': float(np.median(thresholds)), 'thresholds': list(thresholds),
+                        'p_values': list(p_values), 'distances': list(distances),
+                        'start_ind': starts[tag].tolist()}
+
+    return results
@@ -7,8 +7,10 @@
 # -----------------------------------------------------------------------------------------------------------
 from river.drift import PageHinkley
 
+from drift_events import DriftEventsMixin
 
-class PageHinkleyConceptDriftDetector:
+
+class PageHinkleyConceptDriftDetector(DriftEventsMixin):
     """
     Concept Drift Detector based on the Page Hinkley Test.
 
@@ -17,9 +19,12 @@ class PageHinkleyConceptDriftDetector:
         drift_ind (list): List to store indices where concept drift is detected.
         cnt_drift (int): Counter to keep track of the number of detected concept drifts.
         result_list (list): List to store detection results.
+        events (callable): Event channel called with the index of every drift (statistic value 0), None if drifts
+            are only recorded.
 
     Methods:
         __init__: Initializes the PageHinkleyConeptDriftDetector with specified parameters.
+        set_events: Passes every drift to an event channel as soon as it is detected.
         detect_drift_window: Monitors a data stream for concept drifts.
 
     Reference:
@@ -43,6 +48,7 @@ class PageHinkleyConceptDriftDetector:
         self.drift_ind = []
         self.cnt_drift = 0
         self.result_list = []
+        self.events = None
 
     def detect_drift_window(self, data_stream):
         """
@@ -68,5 +74,7 @@ class PageHinkleyConceptDriftDetector:
                 self.ph._reset()
 
                 self.result_list.append(0)
+                if self.events is not None:
+                    self.events(i, 0)
 
         return {'drift_ind': self.drift_ind, 'result_list': self.result_list, 'cnt_drift': self.cnt_drift}
@@ -0,0 +1,711 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# This file contains a rank based engine for the two sample tests and distances of the windowed drift detectors
+# (Kolmogorov Smirnov, Cramer von Mises, earth mover's distance, Hellinger distance, Jensen Shannon distance and
+# population stability index). Every reference batch and every new batch is sorted once, the new batch is merged into
+# the reference with searchsorted, and all statistics are computed from the sorted samples and the merged ranks.
+# The p-values are read from tables that are computed once per batch size. The samples are sorted and merged in their
+# own float type (e.g. float32 streams), while bin edges, CDFs and sums are computed in float64.
+# The earth mover's distance is computed from the quantile functions of both samples on a common grid, which is kept
+# with the sorted reference until the next drift. For overlapping windows, the sorted window is updated incrementally
+# instead of sorting every window again, and the distances of many windows are computed in one vectorized call.
+# library: numpy / scipy
+# reference: https://docs.scipy.org/doc/scipy/reference/generated/scipy.stats.ks_2samp.html
+# reference: https://docs.scipy.org/doc/scipy/reference/generated/scipy.stats.cramervonmises_2samp.html
+# reference: https://github.com/IFCA/frouros/tree/main/frouros/detectors/data_drift/batch/distance_based
+# -----------------------------------------------------------------------------------------------------------
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+from scipy.special import gammaln, kv, rel_entr
+from scipy.stats import cramervonmises_2samp, ks_2samp, kstwo
+
+# Largest batch size for which the exact Kolmogorov Smirnov distribution is used (same limit as scipy.stats.ks_2samp)
+KS_MAX_EXACT_N = 10000
+# Smallest batch size for which the asymptotic Cramer von Mises distribution is used (same limit as scipy)
+CVM_MIN_ASYMPTOTIC_N = 21
+# Grid of the normalized Cramer von Mises statistic on which the limiting distribution is tabulated
+CVM_TABLE_GRID = np.linspace(0.003, 3.0, 6000)
+# Number of batch sizes for which the quantile grid of the earth mover's distance is kept per reference
+EMD_MAX_GRIDS = 4
+# Sorted windows are updated incrementally if consecutive windows are closer than batch_size / WINDOW_SLIDE_FACTOR
+WINDOW_SLIDE_FACTOR = 8
+
+
+class RankTwoSampleEngine:
+    """
+    Rank based engine computing two sample tests and distances between a reference batch and a new batch.
+
+    The sorted references are kept until they are evicted by newer references, and the sorted new batch is kept
+    until a different batch is passed. Detectors sharing one engine therefore only sort every batch once, even if
+    they use different references. The batches are identified by object identity, they must therefore not be
+    modified in place. For the earth mover's distance, the quantile function of every reference is kept as well, and
+    the last sorted window of a data stream is kept to compute the next windows of an overlapping scan incrementally.
+
+    Attributes:
+        max_references (int): Number of sorted references kept by the engine.
+
+    Methods:
+        __init__: Initializes the RankTwoSampleEngine.
+        sorted_reference: Returns the sorted reference data and its ranks.
+        sorted_new: Returns the sorted new batch and its ranks.
+        merge: Merges a new batch into the sorted reference.
+        sorted_windows: Returns the sorted windows of a data stream.
+        ks: Computes the Kolmogorov Smirnov test statistic and p-value.
+        cvm: Computes the Cramer von Mises test statistic and p-value.
+        emd: Computes the earth mover's distance.
+        emd_windows: Computes the earth mover's distances of many windows of a data stream.
+        hellinger: Computes the Hellinger distance.
+        psi: Computes the mean population stability index.
+        js: Computes the Jensen-Shannon distance.
+    """
+
+    def __init__(self, max_references=8):
+        """
+        Initializes the RankTwoSampleEngine.
+
+        Args:
+            max_references (int, optional): Number of sorted references kept by the engine. Default is 8.
+
+        Returns:
+            None
+        """
+        self.max_references = max_references
+        self._references = OrderedDict()
+        self._new_data = None
+        self._new = None
+        self._merges = {}
+        self._window = None
+
+    def __getstate__(self):
+        # The caches are keyed by object identity, which is meaningless in another process
+        return {'max_references': self.max_references}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @staticmethod
+    def _sort(data, presorted=False):
+        """
+        Sorts a sample and counts for every value the values that are smaller ('left') and smaller or equal
+        ('right').
+
+        Args:
+            data (array-like): The sample.
+            presorted (bool, optional): True if the sample is known to be sorted, e.g. a reservoir sample. Default is
+                False.
+
+        Returns:
+            dict: A dictionary containing the sample ('data'), the sorted sample ('sorted') and the counts ('ranks').
+        """
+        data_sorted = np.ravel(data)
+        # Reservoir references are kept sorted, checking this is cheaper than sorting them again
+        if not presorted and not np.all(data_sorted[1:] >= data_sorted[:-1]):
+            data_sorted = np.sort(data_sorted)
+
+        return {'data': data, 'sorted': data_sorted, 'ranks': _tie_ranks(data_sorted)}
+
+    def sorted_reference(self, reference_data, presorted=False):
+        """
+        Returns the sorted reference data and its ranks, sorting it only if it is not kept by the engine yet.
+
+        Args:
+            reference_data (array-like): The reference data.
+            presorted (bool, optional): True if the reference is known to be sorted, e.g. a reservoir sample, so
+                its order is not checked. Default is False.
+
+        Returns:
+            dict: A dictionary containing the sorted reference ('sorted') and its ranks ('ranks').
+        """
+        key = id(reference_data)
+        entry = self._references.get(key)
+        if entry is None or entry['data'] is not reference_data:
+            entry = self._sort(reference_data, presorted)
+            self._references[key] = entry
+            if len(self._references) > self.max_references:
+                self._references.popitem(last=False)
+        self._references.move_to_end(key)
+
+        return entry
+
+    def sorted_new(self, new_data):
+        """
+        Returns the sorted new batch and its ranks, sorting it only if it differs from the previous batch.
+
+        Args:
+            new_data (array-like): The new data batch.
+
+        Returns:
+            dict: A dictionary containing the sorted new batch ('sorted') and its ranks ('ranks').
+        """
+        if new_data is not self._new_data:
+            self._new_data = new_data
+            self._new = self._sort(new_data)
+            self._merges = {}
+
+        return self._new
+
+    def merge(self, reference_data, new_data):
+        """
+        Merges a new batch into the sorted reference. For every value of both samples, the number of values of each
+        sample that are strictly smaller ('left') and smaller or equal ('right') is returned.
+
+        Args:
+            reference_data (array-like): The reference data.
+            new_data (array-like): The new data batch.
+
+        Returns:
+            dict: A dictionary containing the sorted samples ('ref_sorted', 'new_sorted') and the left/right counts
+                of the reference values in the reference ('ref_ref') and the new batch ('ref_new') and of the new
+                values in the reference ('new_ref') and the new batch ('new_new').
+        """
+        new = self.sorted_new(new_data)
+        reference = self.sorted_reference(reference_data)
+        key = id(reference_data)
+        if key in self._merges:
+            return self._merges[key]
+
+        ref_sorted, new_sorted = reference['sorted'], new['sorted']
+        merged = {
+            'ref_sorted': ref_sorted,
+            'new_sorted': new_sorted,
+            'ref_ref': reference['ranks'],
+            'ref_new': (np.searchsorted(new_sorted, ref_sorted, side='left'),
+                        np.searchsorted(new_sorted, ref_sorted, side='right')),
+            'new_ref': (np.searchsorted(ref_sorted, new_sorted, side='left'),
+                        np.searchsorted(ref_sorted, new_sorted, side='right')),
+            'new_new': new['ranks'],
+        }
+        self._merges[key] = merged
+
+        return merged
+
+    def ks(self, reference_data, new_data):
+        """
+        Computes the two sided two sample Kolmogorov Smirnov test between the reference data and a new batch.
+
+        Args:
+            reference_data (array-like): The reference data.
+            new_data (array-like): The new data batch.
+
+        Returns:
+            tuple: A tuple containing the Kolmogorov Smirnov test statistic and p-value.
+        """
+        merged = self.merge(reference_data, new_data)
+        n_ref = merged['ref_sorted'].shape[0]
+        n_new = merged['new_sorted'].shape[0]
+
+        # Difference of the empirical CDFs at every value of the pooled sample
+        diff_ref = merged['ref_ref'][1] / n_ref - merged['ref_new'][1] / n_new
+        diff_new = merged['new_ref'][1] / n_ref - merged['new_new'][1] / n_new
+        ks_stat = max(np.max(np.abs(diff_ref)), np.max(np.abs(diff_new)))
+
+        if n_ref != n_new and max(n_ref, n_new) <= KS_MAX_EXACT_N:
+            # Exact distribution for samples of different size (e.g. the last partial batch of a stream)
+            return ks_stat, ks_2samp(merged['new_sorted'], merged['ref_sorted']).pvalue
+
+        return ks_stat, ks_p_value(ks_stat, n_ref, n_new)
+
+    def cvm(self, reference_data, new_data):
+        """
+        Computes the two sample Cramer von Mises test between the reference data and a new batch.
+
+        Args:
+            reference_data (array-like): The reference data.
+            new_data (array-like): The new data batch.
+
+        Returns:
+            tuple: A tuple containing the Cramer von Mises test statistic and p-value.
+        """
+        merged = self.merge(reference_data, new_data)
+        n_ref = merged['ref_sorted'].shape[0]
+        n_new = merged['new_sorted'].shape[0]
+        if max(n_ref, n_new) < CVM_MIN_ASYMPTOTIC_N:
+            result = cramervonmises_2samp(merged['ref_sorted'], merged['new_sorted'], method='exact')
+            return result.statistic, result.pvalue
+
+        # Midranks in the pooled sample: (number of smaller values + number of smaller or equal values + 1) / 2
+        rank_ref = (merged['ref_ref'][0] + merged['ref_new'][0] + merged['ref_ref'][1] + merged['ref_new'][1] + 1) / 2
+        rank_new = (merged['new_ref'][0] + merged['new_new'][0] + merged['new_ref'][1] + merged['new_new'][1] + 1) / 2
+
+        u = n_ref * np.sum((rank_ref - np.arange(1, n_ref + 1)) ** 2)
+        u += n_new * np.sum((rank_new - np.arange(1, n_new + 1)) ** 2)
+        k, n = n_ref * n_new, n_ref + n_new
+        cvm_stat = u / (k * n) - (4 * k - 1) / (6 * n)
+
+        return cvm_stat, cvm_p_value(cvm_stat, n_ref, n_new)
+
+    def sorted_windows(self, data_stream, starts, batch_size):
+        """
+        Returns the sorted windows data_stream[i:i + batch_size] of the start indices as rows of an array. Windows
+        that follow each other closely (overlapping scans) are updated incrementally from the previous window, by
+        removing the values that leave the window and inserting the values that enter it, also across calls for the
+        same data stream. Other windows are sorted at once.
+
+        Args:
+            data_stream (array-like): The data stream.
+            starts (array-like): The increasing start indices of complete windows.
+            batch_size (int): Number of values of a window.
+
+        Returns:
+            numpy.ndarray: The sorted windows, one per row.
+        """
+        stream, data_stream = data_stream, np.asarray(data_stream)
+        starts = np.asarray(starts, dtype=np.int64)
+        if len(starts) == 0:
+            return np.empty((0, batch_size), dtype=data_stream.dtype)
+        if len(starts) == 1 or np.max(np.diff(starts)) * WINDOW_SLIDE_FACTOR > batch_size:
+            return np.sort(np.lib.stride_tricks.sliding_window_view(data_stream, batch_size)[starts], axis=1)
+
+        state = self._window
+        if (state is None or state['stream'] is not stream or state['start'] > starts[0]
+                or starts[0] - state['start'] >= batch_size or len(state['sorted']) != batch_size):
+            state = {'stream': stream, 'start': int(starts[0]),
+                     'sorted': np.sort(data_stream[starts[0]:starts[0] + batch_size])}
+        window, pos = state['sorted'], state['start']
+        windows = np.empty((len(starts), batch_size), dtype=window.dtype)
+        for k, i in enumerate(starts.tolist()):
+            if i != pos:
+                window = _slide_sorted(window, data_stream[pos:i], data_stream[pos + batch_size:i + batch_size])
+                pos = i
+            windows[k] = window
+        state['sorted'], state['start'] = window, pos
+        self._window = state
+
+        return windows
+
+    def _emd_grid(self, reference_data, n_new):
+        """
+        Returns the quantile function of the reference on the common grid of the quantile functions of the
+        reference and of a batch with n_new values. The grid is kept with the sorted reference.
+
+        Args:
+            reference_data (array-like): The reference data.
+            n_new (int): Number of values of the new batch.
+
+        Returns:
+            tuple: For every interval of the grid, the index of the sorted new batch, the width of the interval in
+                units of 1 / (n_ref * n_new) and the value of the reference quantile function as float64. The index
+                and the widths are None if both samples have the same size (every interval has the same width).
+        """
+        reference = self.sorted_reference(reference_data)
+        grids = reference.setdefault('emd', {})
+        if n_new not in grids:
+            ref_sorted = reference['sorted']
+            n_ref = ref_sorted.shape[0]
+            if n_ref == n_new:
+                grids[n_new] = (None, None, ref_sorted.astype(np.float64))
+            else:
+                # Steps of both quantile functions in units of 1 / (n_ref * n_new). The widths are kept as integer
+                # counts, so a distance that is a multiple of the resolution of the data (e.g. quantized sensor
+                # values) is computed exactly and a drift at a distance equal to the threshold is decided as before
+                steps = np.union1d(np.arange(n_ref, dtype=np.int64) * n_new,
+                                   np.arange(n_new, dtype=np.int64) * n_ref)
+                width = np.diff(np.append(steps, n_ref * n_new)).astype(np.float64)
+                grids[n_new] = (steps // n_ref, width, ref_sorted[steps // n_new].astype(np.float64))
+            if len(grids) > EMD_MAX_GRIDS:
+                grids.pop(next(iter(grids)))
+
+        return grids[n_new]
+
+    def emd(self, reference_data, new_data):
+        """
+        Computes the earth mover's distance (1-D Wasserstein distance) between the reference data and a new batch,
+        which is the area between the quantile functions (or the empirical CDFs) of both samples.
+
+        Args:
+            reference_data (array-like): The reference data.
+            new_data (array-like): The new data batch.
+
+        Returns:
+            float: The earth mover's distance.
+        """
+        new_sorted = self.sorted_new(new_data)['sorted']
+
+        return self._emd_sorted(reference_data, new_sorted[np.newaxis])[0]
+
+    def _emd_sorted(self, reference_data, windows):
+        """
+        Computes the earth mover's distances between the reference data and sorted windows of the same size.
+
+        Args:
+            reference_data (array-like): The reference data.
+            windows (numpy.ndarray): The sorted windows, one per row.
+
+        Returns:
+            numpy.ndarray: The earth mover's distance of every window.
+        """
+        n_new = windows.shape[1]
+        index, width, ref_quantiles = self._emd_grid(reference_data, n_new)
+        if index is None:
+            return np.mean(np.abs(windows - ref_quantiles), axis=1)
+
+        n_ref = self.sorted_reference(reference_data)['sorted'].shape[0]
+
+        return (np.abs(windows[:, index] - ref_quantiles) @ width) / (n_ref * n_new)
+
+    def emd_windows(self, reference_data, data_stream, starts, batch_size):
+        """
+        Computes the earth mover's distances between the reference data and the windows
+        data_stream[i:i + batch_size] of the start indices in one vectorized call. A window at the end of the stream
+        may be incomplete.
+
+        Args:
+            reference_data (array-like): The reference data.
+            data_stream (array-like): The data stream.
+            starts (array-like): The increasing start indices of the windows.
+            batch_size (int): Number of values of a window.
+
+        Returns:
+            numpy.ndarray: The earth mover's distance of every window.
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        complete = int(np.searchsorted(starts, len(data_stream) - batch_size, side='right'))
+        distances = np.empty(len(starts))
+        if complete:
+            windows = self.sorted_windows(data_stream, starts[:complete], batch_size)
+            distances[:complete] = self._emd_sorted(reference_data, windows)
+        for k in range(complete, len(starts)):
+            distances[k] = self.emd(reference_data, data_stream[starts[k]:starts[k] + batch_size])
+
+        return distances
+
+    def _pooled_range(self, reference_data, new_data):
+        """
+        Returns the sorted samples and the range of the pooled sample.
+
+        Args:
+            reference_data (array-like): The reference data.
+            new_data (array-like): The new data batch.
+
+        Returns:
+            tuple: The sorted reference, the sorted new batch, the minimum and the maximum of the pooled sample as
+                float64, so the bin edges are computed in float64 for float32 samples as well.
+        """
+        ref_sorted = self.sorted_reference(reference_data)['sorted']
+        new_sorted = self.sorted_new(new_data)['sorted']
+
+        return (ref_sorted, new_sorted, float(min(ref_sorted[0], new_sorted[0])),
+                float(max(ref_sorted[-1], new_sorted[-1])))
+
+    def hellinger(self, reference_data, new_data, num_bins=10):
+        """
+        Computes the Hellinger distance of the frouros HellingerDistance detector, with num_bins equal width bins over
+        the range of the pooled sample.
+
+        Args:
+            reference_data (array-like): The reference data.
+            new_data (array-like): The new data batch.
+            num_bins (int, optional): Number of bins. Default is 10.
+
+        Returns:
+            float: The Hellinger distance.
+        """
+        ref_sorted, new_sorted, min_val, max_val = self._pooled_range(reference_data, new_data)
+        edges = np.histogram_bin_edges(np.array([min_val, max_val]), bins=num_bins)
+
+        percents = []
+        for data_sorted in (ref_sorted, new_sorted):
+            # Bins are closed on the left, the last bin also on the right (as numpy.histogram)
+            cum_counts = np.searchsorted(data_sorted, _edges_like(edges, data_sorted), side='left')
+            cum_counts[-1] = data_sorted.shape[0]
+            percents.append(np.diff(cum_counts) / data_sorted.shape[0])
+
+        return np.sqrt(np.sum((np.sqrt(percents[0]) - np.sqrt(percents[1])) ** 2)) / np.sqrt(2)
+
+    def psi(self, reference_data, new_data, num_bins=10):
+        """
+        Computes the mean population stability index of the PsiConceptDriftDetector, with num_bins equal width bins
+        over the range of the pooled sample.
+
+        Args:
+            reference_data (array-like): The reference data.
+            new_data (array-like): The new data batch.
+            num_bins (int, optional): Number of bins. Default is 10.
+
+        Returns:
+            float: The mean PSI value.
+        """
+        eps = 1e-4
+        ref_sorted, new_sorted, min_val, max_val = self._pooled_range(reference_data, new_data)
+        edges = min_val + (max_val - min_val) * np.arange(num_bins + 1) / num_bins
+        edges[0] = min_val - eps
+        edges[-1] = max_val + eps
+
+        percents = []
+        for data_sorted in (ref_sorted, new_sorted):
+            # Bins are closed on the right (as pandas.cut)
+            cum_counts = np.searchsorted(data_sorted, _edges_like(edges, data_sorted), side='right')
+            percent = np.diff(cum_counts) / data_sorted.shape[0]
+            percent[percent == 0] = eps
+            percents.append(percent)
+
+        return np.mean((percents[0] - percents[1]) * np.log(percents[0] / percents[1]))
+
+    def js(self, reference_data, new_data, num_bins=10):
+        """
+        Computes the Jensen-Shannon distance of the frouros JS detector. The probabilities of the num_bins - 1
+        intervals between num_bins equally spaced points over the pooled range are taken from the CDFs of numpy 'auto'
+        histograms of both samples.
+
+        Args:
+            reference_data (array-like): The reference data.
+            new_data (array-like): The new data batch.
+            num_bins (int, optional): Number of points. Default is 10.
+
+        Returns:
+            float: The Jensen-Shannon distance.
+        """
+        ref_sorted, new_sorted, min_val, max_val = self._pooled_range(reference_data, new_data)
+        points = np.linspace(min_val, max_val, num_bins)
+        p = np.diff(auto_histogram_cdf(ref_sorted[None, :], points), axis=1)
+        q = np.diff(auto_histogram_cdf(new_sorted[None, :], points), axis=1)
+
+        return js_distance(p, q)[0]
+
+
+def _tie_ranks(data_sorted):
+    """
+    Counts for every value of a sorted sample the values that are smaller ('left') and smaller or equal ('right')
+    from the runs of equal values, in linear time instead of two binary searches per value. NaN values are sorted
+    last and form one run, as with numpy.searchsorted.
+
+    Args:
+        data_sorted (numpy.ndarray): The sorted sample.
+
+    Returns:
+        tuple: The left and right counts of every value.
+    """
+    n = len(data_sorted)
+    equal = data_sorted[1:] == data_sorted[:-1]
+    if data_sorted.dtype.kind == 'f':
+        equal |= np.isnan(data_sorted[1:]) & np.isnan(data_sorted[:-1])
+    # Start of every run of equal values, followed by n as the end of the last run
+    run_start = np.ones(n + 1, dtype=bool)
+    run_start[1:n] = ~equal
+    run_starts = np.flatnonzero(run_start)
+    run = np.cumsum(run_start[:n]) - 1
+
+    return run_starts[run], run_starts[run + 1]
+
+
+def _slide_sorted(window, leaving, entering):
+    """
+    Moves a sorted window along the data stream by removing the values that leave it and inserting the values that
+    enter it. If one value leaves and one value enters (a stride of 1), the window is updated in place by shifting
+    the values between both positions.
+
+    Args:
+        window (numpy.ndarray): The sorted window.
+        leaving (numpy.ndarray): The values leaving the window.
+        entering (numpy.ndarray): The values entering the window.
+
+    Returns:
+        numpy.ndarray: The sorted window after the move.
+    """
+    if len(leaving) == 1 and len(entering) == 1:
+        out_pos = int(window.searchsorted(leaving[0]))
+        in_pos = int(window.searchsorted(entering[0]))
+        if in_pos > out_pos:
+            window[out_pos:in_pos - 1] = window[out_pos + 1:in_pos]
+            window[in_pos - 1] = entering[0]
+        else:
+            window[in_pos + 1:out_pos + 1] = window[in_pos:out_pos]
+            window[in_pos] = entering[0]
+        return window
+
+    leaving = np.sort(leaving)
+    # Equal leaving values remove consecutive positions of the window
+    ind = np.searchsorted(window, leaving, side='left')
+    ind += np.arange(len(leaving)) - np.searchsorted(leaving, leaving, side='left')
+    window = np.delete(window, ind)
+    entering = np.sort(entering)
+
+    return np.insert(window, np.searchsorted(window, entering, side='left'), entering)
+
+
+def _edges_like(edges, data_sorted):
+    """
+    Converts bin edges to the float type of a sorted sample, as searchsorted would otherwise convert the whole sample
+    to the type of the edges.
+
+    Args:
+        edges (numpy.ndarray): The bin edges.
+        data_sorted (numpy.ndarray): The sorted sample.
+
+    Returns:
+        numpy.ndarray: The bin edges.
+    """
+    return edges.astype(np.result_type(data_sorted.dtype, np.float32), copy=False)
+
+
+def auto_histogram_cdf(samples, points):
+    """
+    Evaluates the CDF of scipy.stats.rv_histogram(numpy.histogram(sample, bins='auto')) at the given points for every
+    row of a matrix of sorted samples. The bins are computed in float64, also for float32 samples.
+
+    Args:
+        samples (numpy.ndarray): Sorted samples of shape (P, k).
+        points (numpy.ndarray): Points at which the CDFs are evaluated.
+
+    Returns:
+        numpy.ndarray: CDF values of shape (P, len(points)).
+    """
+    size = samples.shape[1]
+    first, last = samples[:, 0].astype(np.float64), samples[:, -1].astype(np.float64)
+    q75, q25 = np.percentile(samples, [75, 25], axis=1).astype(np.float64)
+
+    # Bin width of numpy's 'auto' estimator: minimum of the Freedman Diaconis and the Sturges estimator
+    sturges = (last - first) / (np.log2(size) + 1.0)
+    fd = 2.0 * (q75 - q25) * size ** (-1.0 / 3.0)
+    width = np.where(fd > 0, np.minimum(fd, sturges), sturges)
+    constant = last == first
+    first[constant] -= 0.5
+    last[constant] += 0.5
+    num_bins = np.where(constant, 1, np.ceil((last - first) / np.where(constant, 1.0, width)))
+    step = (last - first) / num_bins
+
+    # Edges of the histogram bin that contains each point, computed as in numpy.linspace
+    j = np.clip(np.floor((points[None, :] - first[:, None]) / step[:, None]), 0, num_bins[:, None] - 1)
+    lower = j * step[:, None] + first[:, None]
+    upper = np.where(j == num_bins[:, None] - 1, last[:, None], (j + 1) * step[:, None] + first[:, None])
+
+    cdf_lower = (samples[:, :, None] < lower[:, None, :]).sum(axis=1) / size
+    cdf_upper = np.where(j == num_bins[:, None] - 1, 1.0,
+                         (samples[:, :, None] < upper[:, None, :]).sum(axis=1) / size)
+
+    cdf = cdf_lower + (points[None, :] - lower) / (upper - lower) * (cdf_upper - cdf_lower)
+    cdf[points[None, :] <= first[:, None]] = 0.0
+    cdf[points[None, :] >= last[:, None]] = 1.0
+
+    return cdf
+
+
+def js_distance(p, q):
+    """
+    Computes the Jensen-Shannon distance (as scipy.spatial.distance.jensenshannon) between every row of two matrices
+    of probabilities.
+
+    Args:
+        p (numpy.ndarray): Probabilities of shape (P, B).
+        q (numpy.ndarray): Probabilities of shape (P, B).
+
+    Returns:
+        numpy.ndarray: The Jensen-Shannon distances.
+    """
+    p = p / p.sum(axis=1, keepdims=True)
+    q = q / q.sum(axis=1, keepdims=True)
+    m = (p + q) / 2.0
+
+    return np.sqrt((rel_entr(p, m).sum(axis=1) + rel_entr(q, m).sum(axis=1)) / 2.0)
+
+
+@lru_cache(maxsize=None)
+def _ks_exact_table(n):
+    """
+    Computes the exact null distribution of the two sample Kolmogorov Smirnov statistic for two samples of size n.
+
+    Args:
+        n (int): The size of both samples.
+
+    Returns:
+        numpy.ndarray: Array p with p[h] = P(D >= h / n) for h = 0, ..., n.
+    """
+    # P(D >= h/n) = 2 * sum_j (-1)^(j+1) * binom(2n, n - j*h) / binom(2n, n)
+    h = np.repeat(np.arange(1, n + 1), n // np.arange(1, n + 1))
+    j = np.concatenate([np.arange(1, n // i + 1) for i in range(1, n + 1)])
+    log_terms = 2 * gammaln(n + 1) - gammaln(n - j * h + 1) - gammaln(n + j * h + 1)
+    signs = np.where(j % 2 == 1, 1.0, -1.0)
+
+    table = 2 * np.bincount(h, weights=signs * np.exp(log_terms), minlength=n + 1)
+    table[0] = 1.0
+
+    return np.clip(table, 0.0, 1.0)
+
+
+def ks_p_value(ks_stat, n_ref, n_new):
+    """
+    Computes the p-value of the two sided two sample Kolmogorov Smirnov test. For samples of equal size up to
+    KS_MAX_EXACT_N, the exact distribution is read from a table that is computed once per batch size, otherwise
+    the asymptotic distribution of scipy.stats.ks_2samp is used.
+
+    Args:
+        ks_stat (float): The Kolmogorov Smirnov test statistic.
+        n_ref (int): Size of the reference sample.
+        n_new (int): Size of the new sample.
+
+    Returns:
+        float: The p-value.
+    """
+    if n_ref == n_new and n_ref <= KS_MAX_EXACT_N:
+        return _ks_exact_table(n_ref)[int(round(ks_stat * n_ref))]
+
+    m, n = sorted([float(n_ref), float(n_new)], reverse=True)
+    return kstwo.sf(ks_stat, np.round(m * n / (m + n)))
+
+
+def _cdf_cvm_inf(x):
+    """
+    Computes the CDF of the limiting distribution of the Cramer von Mises statistic (Csörgő and Faraway, 1996), using
+    the series expansion of scipy.stats.
+
+    Args:
+        x (numpy.ndarray): Values at which the CDF is evaluated.
+
+    Returns:
+        numpy.ndarray: The CDF values.
+    """
+    x = np.asarray(x, dtype=float)
+    total = np.zeros_like(x)
+    active = np.ones_like(x, dtype=bool)
+    k = 0
+    while np.any(active):
+        xa = x[active]
+        y = 4 * k + 1
+        q = y ** 2 / (16 * xa)
+        term = (np.exp(gammaln(k + 0.5) - gammaln(k + 1)) / (np.pi ** 1.5 * np.sqrt(xa))
+                * np.sqrt(y) * np.exp(-q) * kv(0.25, q))
+        total[active] += term
+        active[active] = np.abs(term) >= 1e-7
+        k += 1
+
+    return total
+
+
+@lru_cache(maxsize=None)
+def _cvm_table():
+    """
+    Tabulates the survival function of the limiting Cramer von Mises distribution on CVM_TABLE_GRID.
+
+    Returns:
+        numpy.ndarray: The survival function values on the grid.
+    """
+    return np.maximum(0.0, 1.0 - _cdf_cvm_inf(CVM_TABLE_GRID))
+
+
+def cvm_p_value(cvm_stat, n_ref, n_new):
+    """
+    Computes the asymptotic p-value of the two sample Cramer von Mises test. The normalized statistic is looked up in
+    the tabulated limiting distribution, values outside the table are evaluated directly.
+
+    Args:
+        cvm_stat (float): The Cramer von Mises test statistic.
+        n_ref (int): Size of the reference sample.
+        n_new (int): Size of the new sample.
+
+    Returns:
+        float: The p-value.
+    """
+    k, n = n_ref * n_new, n_ref + n_new
+    et = (1 + 1 / n) / 6
+    vt = (n + 1) * (4 * k * n - 3 * (n_ref ** 2 + n_new ** 2) - 2 * k) / (45 * n ** 2 * 4 * k)
+    tn = 1 / 6 + (cvm_stat - et) / np.sqrt(45 * vt)
+
+    if tn < CVM_TABLE_GRID[0]:
+        return 1.0
+    if tn > CVM_TABLE_GRID[-1]:
+        return max(0.0, 1.0 - _cdf_cvm_inf(np.array([tn]))[0])
+
+    return float(np.interp(tn, CVM_TABLE_GRID, _cvm_table()))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# This file contains a bounded reference sample for the windowed concept drift detectors. Instead of the single batch
+# that triggered the last drift, the reference is a random sample of at most max_size values collected over the
+# whole stable period since that drift. With decay = 0 the sample is a uniform reservoir sample, with decay > 0 recent
+# batches get exponentially larger weights. The sample is kept sorted and updated incrementally, so the rank engine
+# does not sort it again.
+# library: numpy
+# reference: Efraimidis, P. S., Spirakis, P. G. (2006). Weighted random sampling with a reservoir.
+# -----------------------------------------------------------------------------------------------------------
+import numpy as np
+
+
+class ReferenceSample:
+    """
+    Weighted reservoir sample of the values of a data stream since the last drift.
+
+    Every value gets the random key log(E) - decay * t, where E is exponentially distributed and t is the number of
+    batches since the last drift, and the max_size values with the smallest keys are kept. This is the weighted
+    reservoir sampling of Efraimidis and Spirakis with weights exp(decay * t); for decay = 0 all values have the same
+    probability to be in the sample. One-dimensional samples are kept sorted, so the sorted merge of an update costs
+    O(max_size) instead of a new sort.
+
+    Attributes:
+        max_size (int): Maximum number of values in the sample.
+        decay (float): Decay rate of the weights per batch.
+        data (numpy.ndarray): The current sample. A new array is created on every change and the array is kept if a
+            batch does not change the sample, so the rank engine keeps its sorted reference until the sample
+            actually changes.
+
+    Methods:
+        __init__: Initializes the ReferenceSample with specified parameters.
+        reset: Starts a new sample from the batch that triggered a drift.
+        update: Adds a batch of the stable period to the sample.
+    """
+
+    def __init__(self, max_size, decay=0.0, seed=0):
+        """
+        Initializes the ReferenceSample with specified parameters.
+
+        Args:
+            max_size (int): Maximum number of values in the sample.
+            decay (float, optional): Decay rate of the weights per batch, 0 for a uniform sample. Default is 0.
+            seed (int, optional): Seed of the random keys. Default is 0.
+
+        Returns:
+            None
+        """
+        self.max_size = max_size
+        self.decay = decay
+        self.data = None
+        self._keys = None
+        self._t = 0
+        self._rng = np.random.default_rng(seed)
+
+    def _new_keys(self, n):
+        return np.log(self._rng.standard_exponential(n)) - self.decay * self._t
+
+    def reset(self, batch_data):
+        """
+        Starts a new sample from the batch that triggered a drift.
+
+        Args:
+            batch_data (array-like): The batch.
+
+        Returns:
+            numpy.ndarray: The new sample.
+        """
+        batch_data = np.asarray(batch_data)
+        self._t = 0
+        keys = self._new_keys(len(batch_data))
+        if len(batch_data) > self.max_size:
+            keep = np.argpartition(keys, self.max_size - 1)[:self.max_size]
+            batch_data, keys = batch_data[keep], keys[keep]
+        if batch_data.ndim == 1:
+            order = np.argsort(batch_data, kind='stable')
+            batch_data, keys = batch_data[order], keys[order]
+
+        self.data, self._keys = batch_data.copy(), keys
+
+        return self.data
+
+    def update(self, batch_data):
+        """
+        Adds a batch of the stable period to the sample, replacing the values with the largest keys if the sample
+        exceeds max_size. If no value of the batch enters the sample, the sample and its array are unchanged.
+
+        Args:
+            batch_data (array-like): The values of the batch that are not in the sample yet.
+
+        Returns:
+            numpy.ndarray: The updated sample.
+        """
+        batch_data = np.asarray(batch_data)
+        self._t += 1
+        keys = self._new_keys(len(batch_data))
+
+        size = len(self._keys) + len(keys)
+        if size > self.max_size:
+            threshold = np.partition(np.concatenate([self._keys, keys]), self.max_size - 1)[self.max_size - 1]
+            keep_old = self._keys <= threshold
+            keep_new = keys <= threshold
+        else:
+            keep_old = np.ones(len(self._keys), dtype=bool)
+            keep_new = np.ones(len(keys), dtype=bool)
+
+        if not keep_new.any():
+            return self.data
+
+        old_data, old_keys = self.data[keep_old], self._keys[keep_old]
+        new_data, new_keys = batch_data[keep_new], keys[keep_new]
+        if batch_data.ndim == 1:
+            order = np.argsort(new_data, kind='stable')
+            new_data, new_keys = new_data[order], new_keys[order]
+            pos = np.searchsorted(old_data, new_data, side='right')
+            self.data = np.insert(old_data, pos, new_data)
+            self._keys = np.insert(old_keys, pos, new_keys)
+        else:
+            self.data = np.concatenate([old_data, new_data])
+            self._keys = np.concatenate([old_keys, new_keys])
+
+        return self.data
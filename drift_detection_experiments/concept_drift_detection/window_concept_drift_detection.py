@@ -0,0 +1,701 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# This file contains the base class of the windowed concept drift detectors. It owns the window iteration over the
+# data stream, the reference management and the recording of the results, while the subclasses only provide the
+# statistic between the reference and a new batch and the decision rule applied to it.
+# By default the batch that triggered a drift becomes the new reference. With reference_size, the reference is a
+# bounded (optionally decaying) reservoir sample of the whole stable period since the last drift.
+# With set_history, only the most recent drifts are kept in a ring buffer, so the memory of a detector that monitors a
+# stream for a long time stays constant. With set_events, every drift is also passed to an event channel (e.g. of a
+# DriftEventPublisher) as soon as it is detected.
+# detect_drift_parallel evaluates the batches of one stream speculatively on a process pool and gives the same results
+# as detect_drift_window. Detectors with batched statistics (window_statistics) are evaluated speculatively in chunks
+# of batches by detect_drift_window as well.
+# detect_drift_time_window uses time-based batches (e.g. a day or a shift) whose boundaries are computed once from the
+# timestamps of the stream by time_window_bounds.
+# -----------------------------------------------------------------------------------------------------------
+import copy
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from drift_events import DriftEventsMixin
+from drift_history import DriftHistory
+from reference_sample import ReferenceSample
+
+# Data stream, detector and boundaries of the reference batch of the worker processes of detect_drift_parallel, set
+# once per process by _set_worker_state. The reference is only sent once, after a drift the workers take the new
+# reference from their data stream
+_worker_stream = None
+_worker_detector = None
+_worker_reference = None
+# Number of values of the batches whose statistics are computed at once by detectors with batched statistics
+BATCHED_STATISTICS_VALUES = 2 ** 22
+
+
+def time_window_bounds(timestamps, window, step=None, origin='0s', min_samples=1):
+    """
+    Computes the boundaries of time-based batches of a data stream with irregular sampling. The batches start at
+    origin + k * step, measured from midnight of 1970-01-01 in the local time of the timestamps, and contain the values
+    with timestamps in [start, start + window). With step = window (default) the batches do not overlap and the last
+    batch may be incomplete, with step < window only batches that lie completely within the time range of the stream
+    are used, as with overlapping count-based batches.
+
+    Args:
+        timestamps (array-like): The sorted timestamps of the data stream, e.g. the column 'Timestamp'.
+        window (str or timedelta): Duration of a batch, e.g. '1D' or '8h'.
+        step (str or timedelta, optional): Time between the start of two consecutive batches. Default is window.
+        origin (str or timedelta, optional): Offset of the batch boundaries from midnight, e.g. '6h' for shifts
+            starting at 6:00. Default is '0s'.
+        min_samples (int, optional): Smallest number of values of a batch, batches with fewer values (e.g. in gaps
+            of the data) are skipped. Default is 1.
+
+    Returns:
+        tuple: Arrays with the first index and the index after the last value of every batch.
+    """
+    times = pd.DatetimeIndex(timestamps)
+    if times.tz is not None:
+        times = times.tz_localize(None)
+    t = times.asi8
+    if len(t) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    if np.any(t[1:] < t[:-1]):
+        raise ValueError('The timestamps of the data stream must be sorted')
+
+    window = pd.Timedelta(window).value
+    step = pd.Timedelta(step).value if step is not None else window
+    origin = pd.Timedelta(origin).value
+    if step < window:
+        first = origin - (origin - t[0]) // step * step
+        edges = np.arange(first, t[-1] - window + 2, step, dtype=np.int64)
+    else:
+        first = origin + (t[0] - origin) // step * step
+        edges = np.arange(first, t[-1] + 1, step, dtype=np.int64)
+
+    starts = np.searchsorted(t, edges, side='left')
+    ends = np.searchsorted(t, edges + window, side='left')
+    keep = ends - starts >= max(min_samples, 1)
+
+    return starts[keep], ends[keep]
+
+
+class WindowConceptDriftDetector(DriftEventsMixin):
+    """
+    Base class for concept drift detectors that compare batches of a data stream against a reference batch.
+
+    Attributes:
+        batch_size (int): Size of the data batches used for drift detection.
+        reference_data (array-like): Reference data used for drift detection.
+        drift_ind (list): List to store indices where concept drift is detected.
+        cnt_drift (int): Counter to keep track of the number of detected concept drifts.
+        result_list (list): List to store the statistic values of drift detection results.
+        reference_sample (ReferenceSample): Reservoir sample used as reference, None if the reference is the batch
+            that triggered the last drift.
+        engine (RankTwoSampleEngine): Rank engine of the subclasses based on ranks, None for the other subclasses
+            (class attribute).
+        history (DriftHistory): Bounded history of the drifts replacing drift_ind and result_list, None if all
+            drifts are kept in the lists.
+        events (callable): Event channel called with the index and statistic value of every drift, None if drifts
+            are only recorded.
+        batched_statistics (bool): True if the subclass computes the statistics of many batches at once in
+            window_statistics, class attribute.
+
+    Methods:
+        __init__: Initializes the WindowConceptDriftDetector with specified parameters.
+        set_reference: Replaces the reference data used for drift detection.
+        set_history: Keeps only the most recent drifts in a bounded history.
+        set_events: Passes every drift to an event channel as soon as it is detected.
+        results: Returns the detected drifts.
+        statistic: Computes the statistic between the reference data and a new batch (implemented by subclasses).
+        is_drift: Decides whether a statistic value indicates a concept drift (implemented by subclasses).
+        window_statistics: Computes the statistics of several batches of a data stream against the reference.
+        detect_drift: Detects concept drift in a given batch of new data.
+        process_batch: Computes the statistic of a batch, records a drift and updates the reference.
+        detect_drift_window: Monitors a data stream for concept drifts using batches of data.
+        detect_drift_coarse_to_fine: Monitors a data stream with a coarse scan and a refinement around drifts.
+        detect_drift_parallel: Monitors a data stream for concept drifts, evaluating the batches on several processes.
+        detect_drift_time_window: Monitors a data stream for concept drifts using time-based batches.
+    """
+
+    batched_statistics = False
+    engine = None
+
+    def __init__(self, batch_size, reference_size=None, reference_decay=0.0):
+        """
+        Initializes the WindowConceptDriftDetector with specified parameters.
+
+        Args:
+            batch_size (int): Size of the data batches used for drift detection.
+            reference_size (int, optional): Maximum size of a reservoir sample of the stable period used as
+                reference. Default is None (the batch that triggered the last drift is the reference).
+            reference_decay (float, optional): Decay rate per batch of the weights of the reservoir sample, 0 for a
+                uniform sample. Default is 0.
+
+        Returns:
+            None
+        """
+        self.batch_size = batch_size
+        self.reference_data = None
+        self.drift_ind = []
+        self.cnt_drift = 0
+        self.result_list = []
+        self.reference_sample = ReferenceSample(reference_size, reference_decay) if reference_size else None
+        self._sample_end = 0
+        self.history = None
+        self.events = None
+
+    def set_reference(self, reference_data):
+        """
+        Replaces the reference data used for drift detection. Subclasses extend this method to precompute the
+        reference side of their statistic once per reference instead of once per batch.
+
+        Args:
+            reference_data (array-like): The new reference data.
+
+        Returns:
+            None
+        """
+        self.reference_data = reference_data
+
+    def set_history(self, capacity, sink=None):
+        """
+        Keeps only the most recent drifts in a ring buffer instead of the lists drift_ind and result_list. Drifts
+        that are already in the lists are moved to the buffer.
+
+        Args:
+            capacity (int): Number of drifts kept in the buffer.
+            sink (callable, optional): Function called with the index and statistic value of every drift that is
+                removed from the buffer, e.g. a CsvDriftSink. Default is None (removed drifts are discarded).
+
+        Returns:
+            WindowConceptDriftDetector: The detector.
+        """
+        self.history = DriftHistory(capacity, sink)
+        for index, value in zip(self.drift_ind, self.result_list):
+            self.history.append(index, value)
+        self.drift_ind = []
+        self.result_list = []
+
+        return self
+
+    def results(self):
+        """
+        Returns the detected drifts. With a bounded history, only the drifts in the buffer are returned while
+        cnt_drift counts all drifts.
+
+        Returns:
+            dict: A dictionary containing the following information:
+                - 'drift_ind' (list): Indices where concept drift is detected.
+                - 'result_list' (list): List of statistic values from drift detection results.
+                - 'cnt_drift' (int): Number of detected concept drifts.
+        """
+        if self.history is not None:
+            return {'drift_ind': self.history.drift_ind().tolist(),
+                    'result_list': self.history.result_list().tolist(), 'cnt_drift': self.cnt_drift}
+
+        return {'drift_ind': self.drift_ind, 'result_list': self.result_list, 'cnt_drift': self.cnt_drift}
+
+    def statistic(self, new_data):
+        """
+        Computes the statistic between the reference data and a given batch of new data.
+
+        Args:
+            new_data (array-like): The new data batch to analyze for concept drift.
+
+        Returns:
+            float: The statistic value that is stored in the result list when a drift is detected.
+        """
+        raise NotImplementedError
+
+    def is_drift(self, value):
+        """
+        Decides whether a statistic value indicates a concept drift.
+
+        Args:
+            value (float): The statistic value returned by statistic.
+
+        Returns:
+            bool: True if concept drift is detected, False otherwise.
+        """
+        raise NotImplementedError
+
+    def window_statistics(self, data_stream, starts):
+        """
+        Computes the statistics of the batches data_stream[i:i + batch_size] of the start indices against the
+        reference. Subclasses with batched_statistics compute them at once.
+
+        Args:
+            data_stream (array-like): The data stream.
+            starts (array-like): The increasing start indices of the batches.
+
+        Returns:
+            list: The statistic values of the batches.
+        """
+        return [self.statistic(data_stream[i:i + self.batch_size]) for i in starts]
+
+    def detect_drift(self, new_data):
+        """
+        Detects concept drift in a given batch of new data.
+
+        Args:
+            new_data (array-like): The new data batch to analyze for concept drift.
+
+        Returns:
+            bool: True if concept drift is detected, False otherwise.
+        """
+        if self.reference_data is None:
+            self._update_reference(new_data, 0, True)
+
+        return self.is_drift(self.statistic(new_data))
+
+    def _update_reference(self, batch_data, start, drift):
+        """
+        Updates the reference after a batch. The batch that triggered a drift replaces the reference or restarts the
+        reservoir sample, the values of a batch without drift that are not in the reservoir sample yet are added to it.
+        The reference is only replaced if the reservoir sample changed, and the sorted reservoir sample is passed to
+        the rank engine as sorted reference, so the engine neither checks its order nor searches its ranks.
+
+        Args:
+            batch_data (array-like): The batch.
+            start (int): Index of the data stream where the batch starts.
+            drift (bool): True if the batch triggered a drift or is the first batch.
+
+        Returns:
+            None
+        """
+        if self.reference_sample is None:
+            if drift:
+                self.set_reference(batch_data)
+            return
+
+        end = start + len(batch_data)
+        if drift:
+            self.reference_sample.reset(batch_data)
+        elif end > self._sample_end:
+            self.reference_sample.update(batch_data[max(self._sample_end - start, 0):])
+        else:
+            return
+        self._sample_end = end
+        reference_data = self.reference_sample.data
+        if reference_data is not self.reference_data:
+            if self.engine is not None and reference_data.ndim == 1:
+                self.engine.sorted_reference(reference_data, presorted=True)
+            self.set_reference(reference_data)
+
+    def _record_drift(self, index, value):
+        """
+        Records a detected concept drift.
+
+        Args:
+            index (int): Index of the data stream where the concept drift is detected.
+            value (float): The statistic value of the batch that triggered the drift.
+
+        Returns:
+            None
+        """
+        if self.history is not None:
+            self.history.append(index, value)
+        else:
+            self.drift_ind.append(index)
+            self.result_list.append(value)
+        self.cnt_drift += 1
+        if self.events is not None:
+            self.events(index, value)
+
+    def process_batch(self, batch_data, start, overlapping=False):
+        """
+        Computes the statistic of a batch against the reference, records a drift and updates the reference.
+
+        Args:
+            batch_data (array-like): The batch, data_stream[start:start + batch_size].
+            start (int): Index of the data stream where the batch starts.
+            overlapping (bool, optional): If True, the drift is recorded at the end of the batch. Default is False.
+
+        Returns:
+            bool: True if concept drift is detected, False otherwise.
+        """
+        if self.reference_data is None:
+            self._update_reference(batch_data, start, True)
+
+        return self._process_value(batch_data, start, self.statistic(batch_data), overlapping)
+
+    def _process_value(self, batch_data, start, value, overlapping):
+        """
+        Records a drift and updates the reference for a batch whose statistic has already been computed.
+
+        Args:
+            batch_data (array-like): The batch.
+            start (int): Index of the data stream where the batch starts.
+            value (float): The statistic value of the batch.
+            overlapping (bool): If True, the drift is recorded at the end of the batch.
+
+        Returns:
+            bool: True if concept drift is detected, False otherwise.
+        """
+        drift = self.is_drift(value)
+        if drift:
+            self._record_drift(start + len(batch_data) - 1 if overlapping else start, value)
+        self._update_reference(batch_data, start, drift)
+
+        return drift
+
+    def _window_starts(self, length, overlapping, stride):
+        """
+        Returns the start indices of the batches of detect_drift_window.
+
+        Args:
+            length (int): Length of the data stream.
+            overlapping (bool): If True, the batches overlap.
+            stride (int): Step between the start of two consecutive batches in overlapping mode.
+
+        Returns:
+            range: The start indices of the batches.
+        """
+        if overlapping:
+            return range(0, length - self.batch_size + 1, stride)
+
+        return range(0, length, self.batch_size)
+
+    def detect_drift_window(self, data_stream, overlapping=False, stride=1):
+        """
+        Monitors a data stream for concept drifts using batches of data. The statistic of every batch is computed
+        exactly once and the batch that triggered a drift becomes the new reference (or restarts the reservoir
+        sample). For detectors with batched statistics, the statistics of the upcoming batches are computed at once
+        against the current reference, and after a drift the batches after it are computed again against the new
+        reference, which gives the same results.
+
+        Args:
+            data_stream (array-like): The data stream to monitor for concept drifts.
+            overlapping (bool, optional): If True, allow overlapping batches. Default is False.
+            stride (int, optional): Step between the start of two consecutive batches in overlapping mode.
+                Default is 1.
+
+        Returns:
+            dict: A dictionary containing the following information:
+                - 'drift_ind' (list): Indices where concept drift is detected.
+                - 'result_list' (list): List of statistic values from drift detection results.
+                - 'cnt_drift' (int): Number of detected concept drifts.
+        """
+        starts = self._window_starts(len(data_stream), overlapping, stride)
+        if self.batched_statistics and self.reference_sample is None:
+            chunk_size = max(1, BATCHED_STATISTICS_VALUES // self.batch_size)
+            pos = 0
+            while pos < len(starts):
+                if self.reference_data is None:
+                    self._update_reference(data_stream[starts[pos]:starts[pos] + self.batch_size], starts[pos], True)
+                chunk = starts[pos:pos + chunk_size]
+                for i, value in zip(chunk, self.window_statistics(data_stream, chunk)):
+                    pos += 1
+                    if self._process_value(data_stream[i:i + self.batch_size], i, value, overlapping):
+                        print(f'Concept drift detected at index {i + self.batch_size - 1}')
+                        break
+
+            return self.results()
+
+        for i in starts:
+            if self.process_batch(data_stream[i:i + self.batch_size], i, overlapping):
+                print(f'Concept drift detected at index {i + self.batch_size - 1}')
+
+        return self.results()
+
+    def detect_drift_coarse_to_fine(self, data_stream, coarse_stride=None, fine_stride=1, refine='linear',
+                                    masked=None, min_fill=0.0):
+        """
+        Monitors a data stream for concept drifts in two stages. A coarse scan compares the batches starting every
+        coarse_stride values with the reference. When a coarse batch triggers a drift, only the batches between the
+        previous coarse batch and this batch are compared, every fine_stride values, and the first of them that
+        triggers a drift locates the change. The drifts are recorded at the end of the batch as in overlapping mode,
+        at a fraction of its cost. A stream shorter than batch_size has no complete batch and gives no drifts, as in
+        overlapping mode. With a reservoir sample the reference changes after every batch, which the skipped batches
+        of the coarse scan would miss, so the stream is scanned like detect_drift_window in overlapping mode with
+        stride fine_stride.
+
+        Args:
+            data_stream (array-like): The data stream to monitor for concept drifts, the valid values of masked if it
+                is given.
+            coarse_stride (int, optional): Step between the batches of the coarse scan. Default is batch_size.
+            fine_stride (int, optional): Step between the batches of the refinement. Default is 1.
+            refine (str, optional): 'linear' compares all batches of the refinement in order, 'bisect' assumes that
+                all batches after the change trigger a drift and bisects the interval. Default is 'linear'.
+            masked (MaskedStream, optional): The masked raw stream of data_stream. The batches and strides are then
+                counted in raw rows as with count_window_bounds, every batch contains the valid values of its rows,
+                and batches with a share of valid values below min_fill are skipped (treated as batches without drift
+                by the bisection). Default is None.
+            min_fill (float, optional): Smallest share of valid values of a batch with masked. Default is 0.
+
+        Returns:
+            dict: A dictionary containing the following information:
+                - 'drift_ind' (list): Indices where concept drift is detected.
+                - 'result_list' (list): List of statistic values from drift detection results.
+                - 'cnt_drift' (int): Number of detected concept drifts.
+        """
+        if refine not in ('linear', 'bisect'):
+            raise ValueError(f'Unknown refinement {refine}')
+        coarse_stride = coarse_stride if coarse_stride is not None else self.batch_size
+        if coarse_stride < 1 or fine_stride < 1:
+            raise ValueError('The strides of the coarse scan and the refinement must be positive')
+        if self.reference_sample is not None:
+            if masked is not None:
+                starts, ends = masked.count_window_bounds(self.batch_size, True, fine_stride, min_fill)
+                return self.detect_drift_time_window(data_stream, starts, ends, overlapping=True)
+            return self.detect_drift_window(data_stream, overlapping=True, stride=fine_stride)
+        last = (len(masked) if masked is not None else len(data_stream)) - self.batch_size
+        if last < 0:
+            return self.results()
+
+        prev = None
+        i = 0
+        while True:
+            batch = self._coarse_to_fine_batch(data_stream, i, masked, min_fill)
+            if batch is not None:
+                start, batch_data = batch
+                if self.reference_data is None:
+                    self._update_reference(batch_data, start, True)
+
+                value = self.statistic(batch_data)
+                if not self.is_drift(value):
+                    self._update_reference(batch_data, start, False)
+                else:
+                    if prev is not None:
+                        i, (start, batch_data), value = self._refine_drift(data_stream, prev, i, batch, value,
+                                                                           fine_stride, refine, masked, min_fill)
+                    print(f'Concept drift detected at index {start + len(batch_data) - 1}')
+                    self._process_value(batch_data, start, value, True)
+                prev = i
+
+            # The last batch of the stream is always compared, even if it is not on the coarse grid
+            if i == last:
+                break
+            i = min(i + coarse_stride, last)
+
+        return self.results()
+
+    def _coarse_to_fine_batch(self, data_stream, i, masked, min_fill):
+        """
+        Returns the batch of the coarse-to-fine scan starting at row i.
+
+        Args:
+            data_stream (array-like): The data stream.
+            i (int): Start of the batch, a raw row with masked.
+            masked (MaskedStream): The masked raw stream of data_stream, or None.
+            min_fill (float): Smallest share of valid values of a batch with masked.
+
+        Returns:
+            tuple: The start of the batch in data_stream and the batch, or None if the share of valid values of the
+                batch is below min_fill.
+        """
+        if masked is None:
+            return i, data_stream[i:i + self.batch_size]
+
+        start, end = masked.valid_bounds(i, i + self.batch_size)
+        if end == start or end - start < min_fill * self.batch_size:
+            return None
+
+        return start, data_stream[start:end]
+
+    def _refine_drift(self, data_stream, lower, upper, upper_batch, upper_value, fine_stride, refine, masked,
+                      min_fill):
+        """
+        Locates the first batch that triggers a drift between a batch without drift and a batch with drift.
+
+        Args:
+            data_stream (array-like): The data stream.
+            lower (int): Start of the batch without drift.
+            upper (int): Start of the batch with drift.
+            upper_batch (tuple): The start in data_stream and the data of the batch with drift.
+            upper_value (float): The statistic value of the batch with drift.
+            fine_stride (int): Step between the compared batches.
+            refine (str): 'linear' or 'bisect'.
+            masked (MaskedStream): The masked raw stream of data_stream, or None.
+            min_fill (float): Smallest share of valid values of a batch with masked.
+
+        Returns:
+            tuple: The start (a raw row with masked), the start in data_stream and the data, and the statistic value
+                of the first batch that triggers a drift.
+        """
+        if refine == 'linear':
+            for j in range(lower + fine_stride, upper, fine_stride):
+                batch = self._coarse_to_fine_batch(data_stream, j, masked, min_fill)
+                if batch is None:
+                    continue
+                value = self.statistic(batch[1])
+                if self.is_drift(value):
+                    return j, batch, value
+        else:
+            while upper - lower > fine_stride:
+                mid = lower + max((upper - lower) // (2 * fine_stride), 1) * fine_stride
+                batch = self._coarse_to_fine_batch(data_stream, mid, masked, min_fill)
+                value = self.statistic(batch[1]) if batch is not None else None
+                if batch is not None and self.is_drift(value):
+                    upper, upper_batch, upper_value = mid, batch, value
+                else:
+                    lower = mid
+
+        return upper, upper_batch, upper_value
+
+    def detect_drift_parallel(self, data_stream, overlapping=False, stride=1, workers=None, chunk_size=None,
+                              masked=None, min_fill=0.0):
+        """
+        Monitors a data stream for concept drifts like detect_drift_window, computing the statistics of the batches on
+        a pool of processes. Since the reference only changes when a drift is detected, the upcoming batches are
+        evaluated speculatively against the current reference in chunks. The results are applied in order, and after
+        a drift the chunks that were evaluated against the old reference are discarded and the batches after the drift
+        are evaluated again against the new reference. The results are therefore identical to detect_drift_window.
+        The data stream and the detector are sent to every worker once, and after a drift the workers take the new
+        reference from their data stream, so a task only consists of the boundaries of its batches. At most one
+        chunk per worker is submitted ahead, so after a drift at most one chunk per worker is still evaluated against
+        the old reference. With a reservoir sample the reference changes after every batch, so the stream is
+        processed sequentially.
+
+        Args:
+            data_stream (array-like): The data stream to monitor for concept drifts.
+            overlapping (bool, optional): If True, allow overlapping batches. Default is False.
+            stride (int, optional): Step between the start of two consecutive batches in overlapping mode.
+                Default is 1.
+            workers (int, optional): Number of worker processes. Default is the number of CPUs.
+            chunk_size (int, optional): Number of batches evaluated by one task. Default is a quarter of the batches
+                per worker, at most 256.
+            masked (MaskedStream, optional): The masked raw stream of data_stream, the valid values of masked. The
+                batches are then the batches of valid values of count_window_bounds with min_fill, as with
+                detect_drift_time_window. Default is None.
+            min_fill (float, optional): Smallest share of valid values of a batch with masked. Default is 0.
+
+        Returns:
+            dict: A dictionary containing the following information:
+                - 'drift_ind' (list): Indices where concept drift is detected.
+                - 'result_list' (list): List of statistic values from drift detection results.
+                - 'cnt_drift' (int): Number of detected concept drifts.
+        """
+        ends = None
+        if masked is not None:
+            starts, ends = masked.count_window_bounds(self.batch_size, overlapping, stride, min_fill)
+            starts, ends = starts.tolist(), ends.tolist()
+        if self.reference_sample is not None:
+            if masked is not None:
+                return self.detect_drift_time_window(data_stream, starts, ends, overlapping)
+            return self.detect_drift_window(data_stream, overlapping, stride)
+
+        workers = workers if workers is not None else os.cpu_count()
+        if masked is None:
+            starts = self._window_starts(len(data_stream), overlapping, stride)
+        chunk_size = chunk_size if chunk_size is not None else max(1, min(256, len(starts) // (4 * workers)))
+
+        if len(starts) == 0:
+            return self.results()
+
+        # Boundaries of the reference batch in the data stream, None for a reference that was set before the scan
+        reference = None
+        if self.reference_data is None:
+            reference = (starts[0], ends[0] if ends is not None else starts[0] + self.batch_size)
+            self._update_reference(data_stream[reference[0]:reference[1]], reference[0], True)
+
+        pos = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=_set_worker_state,
+                                 initargs=(data_stream, self._statistic_copy(), reference)) as executor:
+            while pos < len(starts):
+                # All chunks submitted in this round are evaluated against the reference batch reference
+                pending = deque()
+                submitted = pos
+                drift = False
+                while not drift and (pending or submitted < len(starts)):
+                    while submitted < len(starts) and len(pending) < workers:
+                        chunk = range(submitted, min(submitted + chunk_size, len(starts)))
+                        chunk_ends = ends[chunk.start:chunk.stop] if ends is not None else None
+                        pending.append((chunk, executor.submit(_window_statistics, reference,
+                                                               starts[chunk.start:chunk.stop], chunk_ends)))
+                        submitted += len(chunk)
+
+                    chunk, future = pending.popleft()
+                    for k, value in zip(chunk, future.result()):
+                        pos += 1
+                        i = starts[k]
+                        j = ends[k] if ends is not None else i + self.batch_size
+                        if self._process_value(data_stream[i:j], i, value, overlapping):
+                            print(f'Concept drift detected at index {j - 1 if overlapping or ends is None else i}')
+                            drift = True
+                            # The batch of the drift is the new reference
+                            reference = (i, j)
+                            break
+
+                for _, future in pending:
+                    future.cancel()
+
+        return self.results()
+
+    def detect_drift_time_window(self, data_stream, starts, ends, overlapping=False):
+        """
+        Monitors a data stream for concept drifts using time-based batches, e.g. days or shifts, instead of batches
+        with batch_size values. The boundaries are computed once per data frame with time_window_bounds and every
+        batch is a slice (a view for numpy arrays) of the data stream. The drift indices refer to the values of the
+        stream, so they map directly to the timestamps.
+
+        Args:
+            data_stream (array-like): The data stream to monitor for concept drifts.
+            starts (array-like): First index of every batch, as returned by time_window_bounds.
+            ends (array-like): Index after the last value of every batch, as returned by time_window_bounds.
+            overlapping (bool, optional): If True, the drift is recorded at the last value of the batch instead of
+                the first value, as for overlapping count-based batches. Default is False.
+
+        Returns:
+            dict: A dictionary containing the following information:
+                - 'drift_ind' (list): Indices where concept drift is detected.
+                - 'result_list' (list): List of statistic values from drift detection results.
+                - 'cnt_drift' (int): Number of detected concept drifts.
+        """
+        for i, j in zip(np.asarray(starts).tolist(), np.asarray(ends).tolist()):
+            if self.process_batch(data_stream[i:j], i, overlapping):
+                print(f'Concept drift detected at index {j - 1 if overlapping else i}')
+
+        return self.results()
+
+    def _statistic_copy(self):
+        """
+        Returns a copy of the detector with the current reference but without results, which is sent once to every
+        worker process of detect_drift_parallel.
+
+        Returns:
+            WindowConceptDriftDetector: The copy.
+        """
+        probe = copy.copy(self)
+        probe.drift_ind = []
+        probe.result_list = []
+        probe.history = None
+        probe.events = None
+
+        return probe
+
+
+def _set_worker_state(data_stream, detector, reference):
+    global _worker_stream, _worker_detector, _worker_reference
+    _worker_stream = data_stream
+    _worker_detector = detector
+    _worker_reference = reference
+
+
+def _window_statistics(reference, starts, ends=None):
+    """
+    Computes the statistics of the batches of the data stream of a worker process against a reference batch of the
+    data stream. The reference of the detector of the worker is only replaced if the reference batch changed.
+
+    Args:
+        reference (tuple): First index and index after the last value of the reference batch in the data stream,
+            None for the reference of the detector that was sent to the worker.
+        starts (range or list): Start indices of the batches.
+        ends (list, optional): Index after the last value of every batch. Default is batches of batch_size values.
+
+    Returns:
+        list: The statistic values of the batches.
+    """
+    global _worker_reference
+    if reference != _worker_reference:
+        _worker_detector.set_reference(_worker_stream[reference[0]:reference[1]])
+        _worker_reference = reference
+
+    if ends is None:
+        return _worker_detector.window_statistics(_worker_stream, starts)
+
+    return [_worker_detector.statistic(_worker_stream[i:j]) for i, j in zip(starts, ends)]
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# File to calibrate the threshold of a distance based drift detector (JS, Hellinger, EMD, MMD or PSI) on a series of
+# data streams with permutation tests and save the calibrated thresholds
+# -----------------------------------------------------------------------------------------------------------
+import pandas as pd
+import numpy as np
+import time
+import json
+import sys
+from column_cache import load_data_frame
+
+sys.path.append(".../drift-detection-thesis/drift_detection_experiments/concept_drift_detection")
+
+from permutation_calibration import calibrate_streams
+
+with open('series_config.json') as f:
+    config = json.load(f)
+
+tag_list = config['drift_detection']['tag_list']
+df_name = config['drift_detection']['data_frame']
+dtype = config['drift_detection']['dtype']
+calibration = config['calibration']
+
+detector_class = config['detector']['class'].rsplit('.', 1)[1]
+detector_params = config['detector']['params']
+
+if __name__ == '__main__':
+    if config['drift_detection']['column_cache']:
+        drift_df = load_data_frame(df_name, ['Timestamp'] + tag_list, dtype=dtype)
+    else:
+        drift_df = pd.read_pickle(df_name)
+    streams = {tag: np.asarray(drift_df[tag], dtype=dtype) for tag in tag_list}
+
+    st = time.time()
+    results = calibrate_streams(detector_class, streams, detector_params,
+                                num_references=calibration['num_references'],
+                                num_permutations=calibration['num_permutations'],
+                                alpha=calibration['alpha'],
+                                workers=calibration['workers'],
+                                seed=calibration['seed'])
+    et = time.time()
+
+    print('Results of Calibration:')
+    for tag in tag_list:
+        print(f" {tag}: calibrated threshold {results[tag]['threshold']}")
+        for i in range(len(results[tag]['thresholds'])):
+            print(f"  Batch at date: {drift_df['Timestamp'].iloc[results[tag]['start_ind'][i]]}"
+                  f" threshold: {results[tag]['thresholds'][i]} p-value: {results[tag]['p_values'][i]}")
+    print(f"Execution time {et - st}")
+
+    result_name = calibration['result_path'] + config['drift_detection']['title'] + '_calibration.json'
+    with open(result_name, 'w') as f:
+        json.dump({'detector': config['detector'], 'calibration': calibration, 'results': results}, f, indent=2)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# File contains a column cache for the pickled dataframes of the drift detection experiments. Each column is written
+# once as a .npy file next to the pickle, together with a manifest that records the size and modification time of the
+# pickle. The runner scripts load the columns they need as memory maps instead of unpickling the whole dataframe,
+# and the cache is rebuilt automatically when the pickle changes. In float32 mode, the float columns are converted once
+# into a float32 copy next to the float64 file, so the memory maps read half the bytes.
+# The cache is built under a lock file, so concurrent runs (e.g. the workers of a sweep) build it only once and never
+# remove a cache that another run has just built.
+# Usage as one-time converter: python column_cache.py /path/to/your/data/df_drift_EI8
+# -----------------------------------------------------------------------------------------------------------
+import json
+import os
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_NAME = 'manifest.json'
+# Seconds between two attempts to acquire the lock of a cache on Windows
+LOCK_RETRY_SECONDS = 0.1
+
+
+def cache_dir_of(df_name):
+    """
+    Returns the default cache directory of a pickled dataframe.
+
+    Args:
+        df_name (str): Path of the pickled dataframe.
+
+    Returns:
+        str: Path of the cache directory.
+    """
+    return df_name + '_columns'
+
+
+def _source_signature(df_name):
+    """
+    Returns the size and modification time of a pickled dataframe, used to detect changes of the pickle.
+
+    Args:
+        df_name (str): Path of the pickled dataframe.
+
+    Returns:
+        dict: A dictionary containing the size ('size') and modification time in ns ('mtime_ns') of the pickle.
+    """
+    stat = os.stat(df_name)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def read_manifest(df_name, cache_dir=None):
+    """
+    Reads the manifest of the column cache of a pickled dataframe.
+
+    Args:
+        df_name (str): Path of the pickled dataframe.
+        cache_dir (str, optional): Cache directory. Default is the directory returned by cache_dir_of.
+
+    Returns:
+        dict: The manifest, or None if the cache does not exist or does not match the current pickle.
+    """
+    cache_dir = cache_dir if cache_dir is not None else cache_dir_of(df_name)
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get('source') != _source_signature(df_name):
+        return None
+
+    return manifest
+
+
+@contextmanager
+def _cache_lock(cache_dir):
+    """
+    Holds an exclusive lock on the lock file next to a cache directory while the cache is built. The lock is
+    released by the operating system if the process ends, so a crashed run does not block the cache.
+
+    Args:
+        cache_dir (str): Cache directory.
+
+    Returns:
+        generator: Context manager holding the lock.
+    """
+    with open(f'{cache_dir}.lock', 'a+') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(LOCK_RETRY_SECONDS)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def build_column_cache(df_name, cache_dir=None):
+    """
+    Writes every column of a pickled dataframe with a numeric or datetime type as .npy file and writes the manifest.
+    Timezone aware timestamps are stored in UTC together with their timezone. The files are written to a temporary
+    directory first, so concurrent runs never read a partial cache. Builds are serialized by a lock file, and a cache
+    that was built by another run while waiting for the lock is used as it is.
+
+    Args:
+        df_name (str): Path of the pickled dataframe.
+        cache_dir (str, optional): Cache directory. Default is the directory returned by cache_dir_of.
+
+    Returns:
+        dict: The manifest of the new cache.
+
+    Raises:
+        OSError: If an outdated cache can not be replaced, e.g. on Windows while another run has its files open.
+    """
+    cache_dir = cache_dir if cache_dir is not None else cache_dir_of(df_name)
+    with _cache_lock(cache_dir):
+        manifest = read_manifest(df_name, cache_dir)
+        if manifest is None:
+            manifest = _write_column_cache(df_name, cache_dir)
+
+    return manifest
+
+
+def _write_column_cache(df_name, cache_dir):
+    """
+    Writes the column cache of a pickled dataframe and replaces an outdated cache, called with the lock held.
+
+    Args:
+        df_name (str): Path of the pickled dataframe.
+        cache_dir (str): Cache directory.
+
+    Returns:
+        dict: The manifest of the new cache.
+    """
+    source = _source_signature(df_name)
+    drift_df = pd.read_pickle(df_name)
+
+    tmp_dir = f'{cache_dir}.tmp{os.getpid()}'
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    columns = {}
+    for i, column in enumerate(drift_df.columns):
+        series = drift_df[column]
+        tz = None
+        if isinstance(series.dtype, pd.DatetimeTZDtype):
+            # Timezone aware timestamps are stored in UTC and converted back when they are loaded
+            tz = str(series.dt.tz)
+            series = series.dt.tz_convert('UTC').dt.tz_localize(None)
+        values = series.to_numpy()
+        if values.dtype.kind not in 'biufM':
+            continue
+        file_name = f'column_{i:04d}.npy'
+        np.save(os.path.join(tmp_dir, file_name), np.ascontiguousarray(values))
+        columns[str(column)] = {'file': file_name, 'dtype': values.dtype.str, 'length': len(values), 'tz': tz}
+
+    manifest = {'source': source, 'columns': columns}
+    with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # The outdated cache is moved away before it is removed, runs that still read its memory maps keep their files
+    old_dir = f'{cache_dir}.old{os.getpid()}'
+    try:
+        if os.path.isdir(cache_dir):
+            os.replace(cache_dir, old_dir)
+        os.replace(tmp_dir, cache_dir)
+    except OSError as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise OSError(f'The outdated column cache {cache_dir} can not be replaced, it may be in use by another '
+                      f'run') from e
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    return manifest
+
+
+def _converted_column(cache_dir, entry, dtype):
+    """
+    Returns the path of a float column of the cache converted to another float type, writing the converted file
+    the first time it is needed. The file is written to a temporary file first and under the lock of the cache, so
+    concurrent runs never read a partial file and never write while the cache is replaced. The converted files are
+    removed with the cache when the pickle changes.
+
+    Args:
+        cache_dir (str): Cache directory.
+        entry (dict): The manifest entry of the column.
+        dtype (numpy.dtype): The float type.
+
+    Returns:
+        str: Path of the converted .npy file.
+    """
+    path = os.path.join(cache_dir, entry['file'].replace('.npy', f'.{dtype.name}.npy'))
+    if not os.path.exists(path):
+        with _cache_lock(cache_dir):
+            if not os.path.exists(path):
+                values = np.load(os.path.join(cache_dir, entry['file']), mmap_mode='r')
+                tmp_path = f'{path}.tmp{os.getpid()}.npy'
+                np.save(tmp_path, values.astype(dtype))
+                os.replace(tmp_path, path)
+
+    return path
+
+
+def load_column(df_name, column, cache_dir=None, dtype=None):
+    """
+    Loads one column of a pickled dataframe from the column cache, building the cache if it does not exist or the
+    pickle has changed.
+
+    Args:
+        df_name (str): Path of the pickled dataframe.
+        column (str): Name of the column, e.g. a tag or 'Timestamp'.
+        cache_dir (str, optional): Cache directory. Default is the directory returned by cache_dir_of.
+        dtype (str, optional): Float type of float columns, e.g. 'float32'. Default is None (as stored).
+
+    Returns:
+        numpy.ndarray: The values of the column, a read-only view of the memory map for numeric columns.
+    """
+    return load_data_frame(df_name, [column], cache_dir, dtype)[column].to_numpy()
+
+
+def load_data_frame(df_name, columns, cache_dir=None, dtype=None):
+    """
+    Loads columns of a pickled dataframe from the column cache, building the cache if it does not exist or the
+    pickle has changed. The numeric columns are read-only memory maps, so only the pages that are accessed are read
+    and concurrent runs share the page cache of the operating system.
+
+    Args:
+        df_name (str): Path of the pickled dataframe.
+        columns (list): Names of the columns, e.g. ['Timestamp'] + tag_list.
+        cache_dir (str, optional): Cache directory. Default is the directory returned by cache_dir_of.
+        dtype (str, optional): Float type of the float columns, e.g. 'float32' for the compact mode of the
+            detectors. Integer and datetime columns are not converted. Default is None (as stored).
+
+    Returns:
+        pandas.DataFrame: Dataframe with the requested columns and a range index.
+    """
+    cache_dir = cache_dir if cache_dir is not None else cache_dir_of(df_name)
+    manifest = read_manifest(df_name, cache_dir)
+    if manifest is None:
+        manifest = build_column_cache(df_name, cache_dir)
+
+    data = {}
+    for column in dict.fromkeys(columns):
+        if column not in manifest['columns']:
+            raise KeyError(f'Column {column} is not in the column cache of {df_name}')
+        entry = manifest['columns'][column]
+        path = os.path.join(cache_dir, entry['file'])
+        if dtype is not None and np.dtype(entry['dtype']).kind == 'f' and np.dtype(entry['dtype']) != np.dtype(dtype):
+            path = _converted_column(cache_dir, entry, np.dtype(dtype))
+        data[column] = np.load(path, mmap_mode='r')
+        if entry['tz'] is not None:
+            data[column] = pd.DatetimeIndex(data[column]).tz_localize('UTC').tz_convert(entry['tz'])
+
+    return pd.DataFrame(data, copy=False)
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:]:
+        cache = build_column_cache(name)
+        print(f"Cached {len(cache['columns'])} columns of {name} in {cache_dir_of(name)}")
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# File contains the evaluation of detected drifts against labeled drift intervals. A labeled drift (a run of rows with
+# label 1) is detected if a drift is detected in it, drifts detected in rows with label 0 are false alarms. The
+# intervals are found with one vectorized pass over the labels, and the detections are assigned to the intervals with
+# searchsorted, so a run is evaluated without a python loop over the rows.
+# The online evaluator computes the same counts, the detection delays and the false alarm rate while the detector runs,
+# from the drift events and the intervals, so streams and chunked runs are evaluated without keeping the labels or the
+# drifts, and runs exceeding a false alarm budget can be stopped early.
+# -----------------------------------------------------------------------------------------------------------
+import numpy as np
+
+
+def label_intervals(labels):
+    """
+    Returns the labeled drift intervals, the runs of rows with label 1.
+
+    Args:
+        labels (array-like): The label of every row, 1 inside a drift interval and 0 outside.
+
+    Returns:
+        tuple: Arrays with the first and the last row of every interval.
+    """
+    edges = np.diff(np.concatenate([[0], (np.asarray(labels) == 1).view(np.int8), [0]]))
+
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1
+
+
+def evaluate_drifts(drift_ind, labels):
+    """
+    Counts the detected and missed drift intervals and the false alarms of a detector run, as evaluate_detector.
+
+    Args:
+        drift_ind (list): Indices where concept drift is detected.
+        labels (array-like): The label of every row, 1 inside a drift interval and 0 outside.
+
+    Returns:
+        dict: A dictionary containing the following information:
+            - 'total' (int): Number of labeled drift intervals.
+            - 'tp' (int): Number of intervals with at least one detected drift.
+            - 'fp' (int): Number of rows with label 0 in which a drift is detected.
+            - 'fn' (int): Number of intervals without a detected drift.
+    """
+    labels = np.asarray(labels)
+    ind = np.unique(np.asarray(drift_ind, dtype=np.int64))
+    ind = ind[(ind >= 0) & (ind < len(labels))]
+    starts, ends = label_intervals(labels)
+    detected = np.searchsorted(ind, ends, side='right') > np.searchsorted(ind, starts, side='left')
+    tp = int(np.count_nonzero(detected))
+
+    return {'total': len(starts), 'tp': tp, 'fp': int(np.count_nonzero(labels[ind] == 0)), 'fn': len(starts) - tp}
+
+
+def iter_label_intervals(label_chunks):
+    """
+    Yields the labeled drift intervals of labels given in consecutive chunks, e.g. the label chunks of a
+    SyntheticDriftStream. An interval spanning several chunks is yielded once, when it ends.
+
+    Args:
+        label_chunks (iterable): The labels of consecutive rows in chunks, 1 inside a drift interval and 0 outside.
+
+    Returns:
+        generator: Tuples with the first and the last row of every interval.
+    """
+    offset = 0
+    open_start = None
+    for chunk in label_chunks:
+        chunk = np.asarray(chunk)
+        if len(chunk) == 0:
+            continue
+        starts, ends = label_intervals(chunk)
+        starts = starts + offset
+        ends = ends + offset
+        if open_start is not None:
+            if len(starts) and starts[0] == offset:
+                # The open interval continues in this chunk
+                starts[0] = open_start
+            else:
+                yield open_start, offset - 1
+            open_start = None
+        if len(ends) and ends[-1] == offset + len(chunk) - 1:
+            # The last interval may continue in the next chunk
+            open_start = int(starts[-1])
+            starts, ends = starts[:-1], ends[:-1]
+        yield from zip(starts.tolist(), ends.tolist())
+        offset += len(chunk)
+    if open_start is not None:
+        yield open_start, offset - 1
+
+
+class FalseAlarmBudgetExceeded(Exception):
+    """
+    Raised by an OnlineDriftEvaluator when the number of false alarms exceeds its budget. The exception is raised in
+    the event callback of the detector, so it stops the detection.
+
+    Attributes:
+        evaluator (OnlineDriftEvaluator): The evaluator, with the counts up to the drift that exceeded the budget.
+    """
+
+    def __init__(self, evaluator):
+        super().__init__(f'{evaluator.fp} false alarms exceed the budget of {evaluator.max_false_alarms}')
+        self.evaluator = evaluator
+
+
+class OnlineDriftEvaluator:
+    """
+    Evaluates the drifts of a detector against labeled drift intervals while the detection runs.
+
+    The evaluator is the event callback of a detector (set_events), or is called with the drift indices of a
+    finished run. The drifts must be passed in increasing order of their index, as the detectors report them, and the
+    intervals are read lazily from an iterator, so only the current interval and the running counts are kept. The
+    counts match evaluate_drifts: an interval is detected by its first drift, further drifts in it are ignored, and
+    drifts outside the intervals are false alarms. The detection delay is the number of rows from the start of an
+    interval to its first drift.
+
+    Attributes:
+        n_rows (int): Number of labeled rows, drifts after the last row are ignored. None if unknown.
+        max_false_alarms (int): Number of false alarms after which FalseAlarmBudgetExceeded is raised. None disables
+            the budget.
+        position (int): Number of rows evaluated.
+        total (int): Number of intervals ending before position, plus the detected interval containing position.
+        tp (int): Number of detected intervals.
+        fp (int): Number of false alarms.
+        fn (int): Number of intervals ending before position without a drift.
+
+    Methods:
+        __init__: Initializes the OnlineDriftEvaluator with specified parameters.
+        __call__: Evaluates a drift.
+        advance: Marks the rows before a position as evaluated.
+        finish: Evaluates the remaining intervals.
+        metrics: Returns the current counts, detection delays and false alarm rate.
+    """
+
+    def __init__(self, intervals, n_rows=None, max_false_alarms=None):
+        """
+        Initializes the OnlineDriftEvaluator with specified parameters.
+
+        Args:
+            intervals (iterable): The labeled drift intervals sorted by row, tuples with the first and the last row,
+                e.g. zip(*label_intervals(labels)) or iter_label_intervals(label_chunks).
+            n_rows (int, optional): Number of labeled rows. Default is None.
+            max_false_alarms (int, optional): Budget of false alarms. Default is None.
+
+        Returns:
+            None
+        """
+        self.n_rows = n_rows
+        self.max_false_alarms = max_false_alarms
+        self.position = 0
+        self.total = 0
+        self.tp = 0
+        self.fp = 0
+        self.fn = 0
+        self._intervals = iter(intervals)
+        self._interval = self._next_interval()
+        self._detected = False
+        self._last_drift = -1
+        self._labeled_rows = 0
+        self._delay_sum = 0
+        self._delay_max = None
+
+    def _next_interval(self):
+        interval = next(self._intervals, None)
+
+        return (int(interval[0]), int(interval[1])) if interval is not None else None
+
+    def _close_intervals(self, row):
+        # Counts the intervals ending before row and moves to the next interval
+        while self._interval is not None and self._interval[1] < row:
+            start, end = self._interval
+            if not self._detected:
+                self.total += 1
+                self.fn += 1
+            self._labeled_rows += max(0, min(end + 1, self.position) - start)
+            self._interval = self._next_interval()
+            self._detected = False
+
+    def __call__(self, index, value=None):
+        """
+        Evaluates a drift.
+
+        Args:
+            index (int): Index where the drift was detected.
+            value (float, optional): The statistic value of the drift, not used. Default is None.
+
+        Returns:
+            None
+
+        Raises:
+            FalseAlarmBudgetExceeded: If the drift is a false alarm that exceeds the budget.
+        """
+        index = int(index)
+        if index <= self._last_drift or (self.n_rows is not None and index >= self.n_rows):
+            return
+        self._last_drift = index
+        self.position = max(self.position, index + 1)
+        self._close_intervals(index)
+
+        if self._interval is not None and self._interval[0] <= index:
+            if not self._detected:
+                self._detected = True
+                self.total += 1
+                self.tp += 1
+                delay = index - self._interval[0]
+                self._delay_sum += delay
+                self._delay_max = delay if self._delay_max is None else max(self._delay_max, delay)
+            return
+
+        self.fp += 1
+        if self.max_false_alarms is not None and self.fp > self.max_false_alarms:
+            raise FalseAlarmBudgetExceeded(self)
+
+    def advance(self, position):
+        """
+        Marks the rows before a position as evaluated, e.g. after a chunk of a chunked run. No drift before position
+        may be passed afterwards, intervals ending before position without a drift are counted as missed.
+
+        Args:
+            position (int): Number of evaluated rows.
+
+        Returns:
+            None
+        """
+        self.position = max(self.position, int(position))
+        self._close_intervals(self.position)
+
+    def finish(self):
+        """
+        Evaluates the remaining intervals at the end of the run, intervals without a drift are counted as missed.
+
+        Returns:
+            dict: The metrics, as returned by metrics.
+        """
+        if self.n_rows is not None:
+            self.position = max(self.position, int(self.n_rows))
+        self._close_intervals(np.inf)
+
+        return self.metrics()
+
+    def metrics(self):
+        """
+        Returns the current counts, detection delays and false alarm rate.
+
+        Returns:
+            dict: A dictionary containing the following information:
+                - 'total' (int): Number of evaluated intervals.
+                - 'tp' (int): Number of intervals with at least one detected drift.
+                - 'fp' (int): Number of false alarms.
+                - 'fn' (int): Number of evaluated intervals without a detected drift.
+                - 'mean_delay' (float): Mean detection delay in rows, None without detected intervals.
+                - 'max_delay' (int): Maximum detection delay in rows, None without detected intervals.
+                - 'false_alarm_rate' (float): False alarms per evaluated row with label 0, None without such rows.
+        """
+        labeled_rows = self._labeled_rows
+        if self._interval is not None:
+            labeled_rows += max(0, min(self._interval[1] + 1, self.position) - self._interval[0])
+        normal_rows = self.position - labeled_rows
+
+        return {'total': self.total, 'tp': self.tp, 'fp': self.fp, 'fn': self.fn,
+                'mean_delay': self._delay_sum / self.tp if self.tp else None, 'max_delay': self._delay_max,
+                'false_alarm_rate': self.fp / normal_rows if normal_rows > 0 else None}
@@ -10,6 +10,9 @@ import time
 import json
 import importlib
 import sys
+from column_cache import load_data_frame
+from result_cache import ResultCache
+from drift_evaluation import evaluate_drifts
 
 
 # Load the labels:
@@ -21,17 +24,33 @@ with open('series_config.json') as f:
 
 sys.path.append(".../drift-detection-thesis/drift_detection_experiments/concept_drift_detection")
 
+from window_concept_drift_detection import WindowConceptDriftDetector
+from masked_stream import MaskedStream
+
 tag_list = config['drift_detection']['tag_list']
 df_name = config['drift_detection']['data_frame']
+dtype = config['drift_detection']['dtype']
 
 detector_module, detector_class = config['detector']['class'].rsplit('.', 1)
 DetectorClass = getattr(importlib.import_module(detector_module), detector_class)
 
 detector_params = config['detector']['params']
 
-drift_df = pd.read_pickle(df_name)
+if config['result_cache']['enabled']:
+    result_cache = ResultCache(config['result_cache']['path'], config['result_cache']['max_size_mb'] * 2 ** 20)
+else:
+    result_cache = None
+
+if config['drift_detection']['column_cache']:
+    drift_df = load_data_frame(df_name, ['Timestamp'] + tag_list, dtype=dtype)
+else:
+    drift_df = pd.read_pickle(df_name)
 time_total = 0
 
+# With masking, sensor dropouts are removed and the batches consist of valid values only
+masking = config['masking']
+masking_params = {'min_fill': masking['min_fill']} if masking['enabled'] else {}
+
 tp = 0
 fp = 0
 fn = 0
@@ -39,47 +58,52 @@ total = 0
 
 
 for tag in tag_list:
-    stream = np.array(drift_df[tag])
+    stream = np.asarray(drift_df[tag], dtype=dtype)
     labels = label_df[tag]
-    detector = DetectorClass(**detector_params)
 
     if config['drift_detection']['reshape_streams']:
         stream = stream.reshape(stream.shape[0], 1)
 
-    st = time.time()
-    results = detector.detect_drift_window(stream)
-    et = time.time()
-    elapsed_time = et - st
+    # Detection is skipped if the results of the detector on this stream are cached. The key is computed from the
+    # stream before masking, as in run_experiment_series, so both runners share the cached results.
+    cache_key = result_cache.key(stream, config['detector']['class'],
+                                 dict(detector_params, **masking_params)) if result_cache else None
+    if masking['enabled']:
+        masked = MaskedStream(stream)
+        stream = masked.values
+    cached = result_cache.get(cache_key) if result_cache else None
+    if cached is not None:
+        print(f'Results of {tag} loaded from the result cache')
+        results, elapsed_time = cached
+    else:
+        detector = DetectorClass(**detector_params)
+        st = time.time()
+        if masking['enabled'] and isinstance(detector, WindowConceptDriftDetector):
+            batch_starts, batch_ends = masked.count_window_bounds(detector.batch_size, min_fill=masking['min_fill'])
+            results = detector.detect_drift_time_window(stream, batch_starts, batch_ends)
+        else:
+            results = detector.detect_drift_window(stream)
+        et = time.time()
+        elapsed_time = et - st
+        if result_cache:
+            result_cache.put(cache_key, results, elapsed_time)
     time_total += elapsed_time
 
+    # The drifts are mapped from the valid values to the rows of the dataframe
+    if masking['enabled']:
+        results = dict(results, drift_ind=masked.raw_index(results['drift_ind']))
+
     print('Results of Drift Detection:')
     print(f" Number of detected drifts {results['cnt_drift']}")
     for i in range(len(results['drift_ind'])):
         print(f" Drift detected at date: {drift_df['Timestamp'].iloc[results['drift_ind'][i]]}")
         print(f" With distance: {results['result_list'][i]}")
 
-    start = -1
-    end = -1
-    results_ind = np.array(results['drift_ind'])
-
-
-    for i in range(len(labels)):
-
-        if (labels[i] == 0) & (i in results['drift_ind']):
-            fp += 1
-
-        if (labels[i] == 1) & (start == -1):
-            start = i
-        if (labels[i] == 1) & (start != -1):
-            if labels[i + 1] == 0:
-                end = i
-                total += 1
-                if len(np.where((results_ind >= start) & (results_ind <= end))[0]) != 0:
-                    tp += 1
-                else:
-                    fn += 1
-                start = -1
-                end = -1
+    counts = evaluate_drifts(results['drift_ind'], labels)
+    total += counts['total']
+    tp += counts['tp']
+    fp += counts['fp']
+    fn += counts['fn']
 
 print(f"Average Execution time {time_total/len(config['drift_detection']['tag_list'])}")
 print(f' Total number of drifts {total}')
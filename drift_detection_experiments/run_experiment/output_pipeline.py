@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# File contains a bounded background executor for the output work of the experiment runners (plots, reports). The
+# output of a data stream is written while the drift detection of the next data stream runs, at most max_pending
+# tasks are queued, and the errors of all tasks are raised together at the end of the run.
+# -----------------------------------------------------------------------------------------------------------
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class OutputPipeline:
+    """
+    Bounded background executor for plot and report output.
+
+    submit blocks while max_pending tasks are queued or running, so the output can not pile up in memory when the
+    detection is faster than the output. close waits for all tasks in submission order and raises a RuntimeError if
+    any task failed, so a run ends only after all output is written.
+
+    Attributes:
+        workers (int): Number of output threads.
+        max_pending (int): Maximum number of queued and running tasks.
+
+    Methods:
+        __init__: Initializes the OutputPipeline with specified parameters.
+        submit: Queues an output task, waiting if max_pending tasks are pending.
+        close: Waits for all output tasks and raises the errors of failed tasks.
+    """
+
+    def __init__(self, workers=2, max_pending=4):
+        """
+        Initializes the OutputPipeline with specified parameters.
+
+        Args:
+            workers (int, optional): Number of output threads. Default is 2.
+            max_pending (int, optional): Maximum number of queued and running tasks. Default is 4.
+
+        Returns:
+            None
+        """
+        self.workers = workers
+        self.max_pending = max(max_pending, workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='output')
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._tasks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # Do not mask the error of the run with errors of the output tasks
+            self._executor.shutdown(wait=True)
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queues an output task, waiting if max_pending tasks are pending.
+
+        Args:
+            fn (callable): The output function, e.g. create_report or plot_drift_plotly.
+            *args: Positional arguments of the output function.
+            **kwargs: Keyword arguments of the output function.
+
+        Returns:
+            concurrent.futures.Future: The future of the task.
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self._tasks.append((getattr(fn, '__name__', repr(fn)), future))
+
+        return future
+
+    def close(self):
+        """
+        Waits for all output tasks and raises the errors of failed tasks.
+
+        Returns:
+            None
+        """
+        self._executor.shutdown(wait=True)
+        errors = [(name, future.exception()) for name, future in self._tasks if future.exception() is not None]
+        self._tasks = []
+        if errors:
+            for name, error in errors:
+                print(f'Output task {name} failed: {error!r}')
+            raise RuntimeError(f'{len(errors)} output tasks failed') from errors[0][1]
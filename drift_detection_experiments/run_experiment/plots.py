@@ -2,28 +2,130 @@
 # -----------------------------------------------------------------------------------------------------------
 # Description:
 # Thi file contains functions to plot the results of drift detection experiments
+# The data streams are downsampled to a pixel appropriate number of points before plotting, with
+# Largest-Triangle-Three-Buckets (LTTB) or min/max decimation, and the drift markers are added in one batch.
 # -----------------------------------------------------------------------------------------------------------
 import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
 import plotly.express as px
 
+# Number of plotted points per data stream, two points per pixel of the exported images (width 1800)
+PLOT_POINTS = 3600
 
 
-def plot_drift(df, tag, stream, ind_list, save_path):
-    plt.plot(df['Timestamp'], stream)
+def lttb_indices(x, y, num_points):
+    """
+    Selects the points of a data stream with the Largest-Triangle-Three-Buckets algorithm. The first and last point
+    are kept and from every bucket in between the point forming the largest triangle with the previously selected
+    point and the mean of the next bucket is selected.
+
+    Args:
+        x (numpy.ndarray): Float x values of the data stream in ascending order.
+        y (numpy.ndarray): Float y values of the data stream.
+        num_points (int): Number of selected points.
+
+    Returns:
+        numpy.ndarray: Indices of the selected points.
+    """
+    n = len(y)
+    if num_points >= n or num_points < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, num_points - 1).astype(np.int64)
+    finite = np.isfinite(y[:n - 1])
+    counts = np.maximum(np.add.reduceat(finite, edges[:-1]), 1)
+    mean_x = np.add.reduceat(x[:n - 1], edges[:-1]) / np.diff(edges)
+    mean_y = np.add.reduceat(np.where(finite, y[:n - 1], 0.0), edges[:-1]) / counts
+
+    selected = np.empty(num_points, dtype=np.int64)
+    selected[0] = a = 0
+    selected[-1] = n - 1
+    for i in range(num_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = (mean_x[i + 1], mean_y[i + 1]) if i < num_points - 3 else (x[n - 1], y[n - 1])
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + np.argmax(np.nan_to_num(area, nan=-1.0))
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax_indices(y, num_points):
+    """
+    Selects the minimum and the maximum of every bucket of a data stream, which keeps all spikes of the stream.
+
+    Args:
+        y (numpy.ndarray): Float y values of the data stream.
+        num_points (int): Maximum number of selected points (two per bucket).
+
+    Returns:
+        numpy.ndarray: Indices of the selected points in ascending order.
+    """
+    n = len(y)
+    num_buckets = num_points // 2
+    if num_points >= n or num_buckets < 1:
+        return np.arange(n)
+
+    size = -(-n // num_buckets)
+    padded = np.full(num_buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(num_buckets, size)
+    offsets = np.arange(num_buckets) * size
+    ind = np.concatenate([offsets + np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1),
+                          offsets + np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1)])
+
+    return np.unique(ind[ind < n])
+
+
+def downsample(df, tag, num_points=PLOT_POINTS, method='lttb'):
+    """
+    Reduces the Timestamp column and a tag of a dataframe to a pixel appropriate number of points.
+
+    Args:
+        df (pandas.DataFrame): Dataframe with the columns 'Timestamp' and tag.
+        tag (str): Name of the plotted tag.
+        num_points (int, optional): Number of plotted points, None disables downsampling. Default is PLOT_POINTS.
+        method (str, optional): 'lttb' or 'minmax'. Default is 'lttb'.
+
+    Returns:
+        pandas.DataFrame: Dataframe with the selected rows of 'Timestamp' and tag.
+    """
+    y = np.asarray(df[tag], dtype=np.float64)
+    if num_points is None or num_points >= len(y):
+        return df[['Timestamp', tag]]
+
+    if method == 'lttb':
+        x = pd.DatetimeIndex(df['Timestamp']).asi8
+        ind = lttb_indices((x - x[0]).astype(np.float64), y, num_points)
+    elif method == 'minmax':
+        ind = minmax_indices(y, num_points)
+    else:
+        raise ValueError(f'Unknown downsampling method {method}')
+
+    return df[['Timestamp', tag]].iloc[ind]
+
+
+def plot_drift(df, tag, stream, ind_list, save_path, num_points=PLOT_POINTS, method='lttb'):
+    plot_df = downsample(pd.DataFrame({'Timestamp': df['Timestamp'], tag: stream}), tag, num_points, method)
+    plt.plot(plot_df['Timestamp'], plot_df[tag])
     plt.title(tag)
-    for ind in ind_list:
-        plt.axvline(x=df['Timestamp'].iloc[ind], color='red')
+    if len(ind_list):
+        plt.vlines(df['Timestamp'].iloc[list(ind_list)], 0, 1, color='red', transform=plt.gca().get_xaxis_transform())
     plt.savefig(save_path)
 
 
-def plot_drift_plotly(df, tag, drift_ind, save_path, line=False, save_plot=False):
+def plot_drift_plotly(df, tag, drift_ind, save_path, line=False, save_plot=False, num_points=PLOT_POINTS,
+                      method='lttb'):
+    plot_df = downsample(df, tag, num_points, method)
     if line:
-        fig = px.line(df, x="Timestamp", y=tag)
+        fig = px.line(plot_df, x="Timestamp", y=tag)
     else:
-        fig = px.scatter(df, x="Timestamp", y=tag)
+        fig = px.scatter(plot_df, x="Timestamp", y=tag)
 
-    for ind in drift_ind:
-        fig.add_vline(x=df['Timestamp'].iloc[ind])
+    # All drift markers are added as one layer of shapes instead of one add_vline call per drift
+    fig.update_layout(shapes=[dict(type='line', xref='x', yref='paper', x0=x, x1=x, y0=0, y1=1)
+                              for x in df['Timestamp'].iloc[list(drift_ind)]])
 
     if save_plot:
         fig.write_image(save_path, width=1800, height=500)
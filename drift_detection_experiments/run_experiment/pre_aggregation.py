@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# File contains the pre-aggregation stage of the experiment pipeline. The raw values of a tag are summarized per time
+# bin (e.g. per minute or per hour) on the Timestamp column, so that slow process drifts can be detected on a stream
+# with a fraction of the values. The bins are computed once per dataframe and the statistics of all bins are computed
+# with numpy reductions in chunks of rows, ignoring invalid values (sensor dropouts). The indices of the aggregated
+# stream are mapped back to the first raw row of their bin, so the drift indices refer to the rows of the raw
+# dataframe.
+# -----------------------------------------------------------------------------------------------------------
+import numpy as np
+
+from window_concept_drift_detection import time_window_bounds
+
+# Statistics of a bin, quantiles are given as 'q' followed by the probability, e.g. 'q0.95'
+STATISTICS = ('mean', 'std', 'min', 'max', 'median')
+
+
+def aggregation_bins(timestamps, freq, origin='0s'):
+    """
+    Computes the time bins of the pre-aggregation. Empty bins (gaps of the data) are skipped, so the bins are
+    adjacent and cover all rows.
+
+    Args:
+        timestamps (array-like): The sorted timestamps of the raw dataframe.
+        freq (str or timedelta): Duration of a bin, e.g. '1min' or '1h'.
+        origin (str or timedelta, optional): Offset of the bin boundaries from midnight. Default is '0s'.
+
+    Returns:
+        tuple: Arrays with the first raw index and the raw index after the last value of every bin.
+    """
+    return time_window_bounds(timestamps, freq, origin=origin)
+
+
+def _reduce(values, starts, counts, statistic):
+    """
+    Computes a statistic of adjacent bins, ignoring invalid (NaN or infinite) values, as pandas resample. Bins without
+    valid values are NaN, and the standard deviation is the sample standard deviation (ddof=1), which is NaN for
+    bins with less than 2 valid values.
+
+    Args:
+        values (numpy.ndarray): The raw values of the bins.
+        starts (numpy.ndarray): Index of the first value of every bin in values.
+        counts (numpy.ndarray): Number of values of every bin.
+        statistic (str): The statistic, one of STATISTICS or a quantile such as 'q0.95'.
+
+    Returns:
+        numpy.ndarray: The statistic of every bin.
+    """
+    valid = np.isfinite(values)
+    n_valid = np.add.reduceat(valid, starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if statistic == 'mean':
+            return np.add.reduceat(np.where(valid, values, 0.0), starts) / n_valid
+        if statistic == 'std':
+            deviation = np.where(valid, values - np.repeat(_reduce(values, starts, counts, 'mean'), counts), 0.0)
+            return np.where(n_valid > 1, np.sqrt(np.add.reduceat(deviation ** 2, starts) / (n_valid - 1)), np.nan)
+    if statistic == 'min':
+        return np.fmin.reduceat(np.where(valid, values, np.nan), starts)
+    if statistic == 'max':
+        return np.fmax.reduceat(np.where(valid, values, np.nan), starts)
+    if statistic not in STATISTICS and not statistic.startswith('q'):
+        raise ValueError(f'Unknown aggregation statistic {statistic}')
+
+    q = 0.5 if statistic == 'median' else float(statistic[1:])
+    # Sorting by bin and value puts the sorted valid values of every bin next to each other, followed by the invalid
+    # values, which are sorted as NaN (an infinite value would otherwise be sorted between the valid values)
+    bins = np.repeat(np.arange(len(starts)), counts)
+    masked_values = np.where(valid, values, np.nan)
+    sorted_values = masked_values[np.lexsort((masked_values, bins))]
+    pos = starts + q * np.maximum(n_valid - 1, 0)
+    lower = np.floor(pos).astype(np.int64)
+    upper = np.minimum(lower + 1, starts + np.maximum(n_valid - 1, 0))
+    quantiles = sorted_values[lower] + (pos - lower) * (sorted_values[upper] - sorted_values[lower])
+
+    return np.where(n_valid > 0, quantiles, np.nan)
+
+
+def aggregate_stream(values, starts, ends, statistic='mean', chunk_size=2 ** 22):
+    """
+    Summarizes the raw values of a tag per bin in one pass over chunks of about chunk_size rows.
+
+    Args:
+        values (array-like): The raw values of the tag.
+        starts (numpy.ndarray): First raw index of every bin, as returned by aggregation_bins.
+        ends (numpy.ndarray): Raw index after the last value of every bin.
+        statistic (str, optional): The statistic of a bin, one of STATISTICS or a quantile such as 'q0.95'.
+            Default is 'mean'.
+        chunk_size (int, optional): Number of raw rows processed at once. Default is 2 ** 22.
+
+    Returns:
+        numpy.ndarray: The aggregated stream with one value per bin, float32 for a float32 stream and float64
+            otherwise.
+    """
+    values = np.asarray(values)
+    out = np.empty(len(starts), dtype=np.result_type(values.dtype, np.float32))
+    first = 0
+    while first < len(starts):
+        # Chunks end at a bin boundary, a bin larger than chunk_size is a chunk of its own
+        last = max(int(np.searchsorted(ends, starts[first] + chunk_size, side='right')), first + 1)
+        # The statistics are computed in float64, also for a float32 stream
+        chunk = values[starts[first]:ends[last - 1]].astype(np.float64, copy=False)
+        out[first:last] = _reduce(chunk, starts[first:last] - starts[first], ends[first:last] - starts[first:last],
+                                  statistic)
+        first = last
+
+    return out
+
+
+def to_raw_index(drift_ind, starts):
+    """
+    Maps indices of the aggregated stream to the first raw row of their bins.
+
+    Args:
+        drift_ind (list): Indices of the aggregated stream, e.g. the drift indices of a detector.
+        starts (numpy.ndarray): First raw index of every bin, as returned by aggregation_bins.
+
+    Returns:
+        list: The raw indices.
+    """
+    return [int(starts[i]) for i in drift_ind]
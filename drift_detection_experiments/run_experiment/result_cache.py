@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# File contains an on-disk cache of drift detection results. The results of a detector on a data stream are stored
+# under a key combining a hash of the data stream, the detector class and its parameters, so an unchanged experiment
+# is not computed again. The size of the cache is bounded, the least recently used results are removed first.
+# -----------------------------------------------------------------------------------------------------------
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+def to_json(value):
+    """
+    Converts the numpy values of the detector results to python values for json.
+
+    Args:
+        value: A value that json can not serialize.
+
+    Returns:
+        The python value.
+    """
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class ResultCache:
+    """
+    Content addressed on-disk cache of drift detection results with least recently used eviction.
+
+    Every entry is a json file named after its key, containing the results of detect_drift_window and the execution
+    time of the detection. Reading an entry updates its modification time, which is used as the time of last use.
+
+    Attributes:
+        cache_dir (str): Directory of the cache files.
+        max_bytes (int): Maximum total size of the cache files.
+
+    Methods:
+        __init__: Initializes the ResultCache with specified parameters.
+        key: Computes the key of a detector run on a data stream.
+        get: Returns the cached results of a key.
+        put: Stores the results of a key and evicts the least recently used entries.
+    """
+
+    def __init__(self, cache_dir, max_bytes=512 * 2 ** 20):
+        """
+        Initializes the ResultCache with specified parameters.
+
+        Args:
+            cache_dir (str): Directory of the cache files, created if it does not exist.
+            max_bytes (int, optional): Maximum total size of the cache files. Default is 512 MB.
+
+        Returns:
+            None
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(stream, detector_class, detector_params):
+        """
+        Computes the key of a detector run on a data stream.
+
+        Args:
+            stream (numpy.ndarray): The data stream.
+            detector_class (str): The detector class as 'module.Class', as in config['detector']['class'].
+            detector_params (dict): The parameters of the detector.
+
+        Returns:
+            str: The hex digest of the key.
+        """
+        stream = np.ascontiguousarray(stream)
+        h = hashlib.sha256()
+        h.update(f'{stream.dtype.str}{stream.shape}'.encode())
+        h.update(memoryview(stream).cast('B'))
+        h.update(detector_class.encode())
+        h.update(json.dumps(detector_params, sort_keys=True, default=to_json).encode())
+
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def get(self, key):
+        """
+        Returns the cached results of a key.
+
+        Args:
+            key (str): The key returned by key.
+
+        Returns:
+            tuple: The results of detect_drift_window and the execution time, or None if the key is not cached.
+        """
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+            os.utime(self._path(key))
+        except (OSError, ValueError):
+            return None
+
+        return entry['results'], entry['time']
+
+    def put(self, key, results, exec_time):
+        """
+        Stores the results of a key and evicts the least recently used entries if the cache exceeds max_bytes.
+
+        Args:
+            key (str): The key returned by key.
+            results (dict): The results of detect_drift_window.
+            exec_time (float): The execution time of the detection.
+
+        Returns:
+            None
+        """
+        tmp_path = f'{self._path(key)}.tmp{os.getpid()}'
+        with open(tmp_path, 'w') as f:
+            json.dump({'results': results, 'time': exec_time}, f, default=to_json)
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        """
+        Removes the least recently used entries until the cache does not exceed max_bytes.
+
+        Returns:
+            None
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.json'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# File to run a batch of drift detection experiments defined in batch_config.json in one process. The config lists
+# datasets and detectors with parameter grids as sweep_config.json, and the experiments (one per tag, detector and
+# parameter combination) are grouped by dataset: every dataframe and label dataframe is loaded once, every stream is
+# converted once and shared by all experiments on its tag, and every detector class is imported once. Experiments on
+# tags with labels are evaluated online while the detector runs. With a false alarm budget, a detector configuration
+# is stopped as soon as its false alarms on all tags exceed the budget, and its remaining experiments are skipped.
+# With masking, sensor dropouts are removed once per tag, and the drifts refer to the rows of the dataframe.
+# -----------------------------------------------------------------------------------------------------------
+import pandas as pd
+import numpy as np
+import time
+import json
+import importlib
+import sys
+from column_cache import load_data_frame
+from result_cache import ResultCache, to_json
+from drift_evaluation import label_intervals, OnlineDriftEvaluator, FalseAlarmBudgetExceeded
+
+with open('batch_config.json') as f:
+    config = json.load(f)
+
+sys.path.append(".../drift-detection-thesis/drift_detection_experiments/concept_drift_detection")
+from window_concept_drift_detection import WindowConceptDriftDetector
+from masked_stream import MaskedStream
+from sweep_queue import expand_grid
+
+batch = config['batch']
+datasets = {dataset['data_frame']: dataset for dataset in config['datasets']}
+# With masking, sensor dropouts are removed and the batches consist of valid values only
+masking = config['masking']
+masking_params = {'min_fill': masking['min_fill']} if masking['enabled'] else {}
+
+if batch['result_cache']['enabled']:
+    result_cache = ResultCache(batch['result_cache']['path'], batch['result_cache']['max_size_mb'] * 2 ** 20)
+else:
+    result_cache = None
+
+# The experiments of a dataset run one after another, so only the streams of one dataset are kept in memory
+groups = {}
+for job in expand_grid(config):
+    groups.setdefault((job['data_frame'], job.get('dtype', batch['dtype'])), []).append(job)
+
+detector_classes = {}
+records = []
+# False alarms of every detector configuration, and the configurations that exceeded the budget
+false_alarms = {}
+stopped = set()
+for (df_name, dtype), jobs in groups.items():
+    tags = list(dict.fromkeys(job['tag'] for job in jobs))
+    st = time.time()
+    if batch['column_cache']:
+        drift_df = load_data_frame(df_name, ['Timestamp'] + tags, dtype=dtype)
+    else:
+        drift_df = pd.read_pickle(df_name)
+    streams = {tag: np.asarray(drift_df[tag], dtype=dtype) for tag in tags}
+    # The validity mask and the gaps of a tag are computed once and shared by all experiments on the tag
+    masked_streams = {tag: MaskedStream(stream) for tag, stream in streams.items()} if masking['enabled'] else {}
+    label_path = datasets[df_name].get('labels')
+    label_df = pd.read_pickle(label_path) if label_path else None
+    print(f'Loaded {len(tags)} tags of {df_name} for {len(jobs)} experiments in {time.time() - st:.2f} s')
+
+    for job in jobs:
+        config_name = f"{job['class']} {json.dumps(job['params'], sort_keys=True)}"
+        if config_name in stopped:
+            records.append({'job': job, 'skipped': True})
+            continue
+        if job['class'] not in detector_classes:
+            detector_module, detector_class = job['class'].rsplit('.', 1)
+            detector_classes[job['class']] = getattr(importlib.import_module(detector_module), detector_class)
+        stream = streams[job['tag']]
+
+        evaluator = None
+        if label_df is not None and job['tag'] in label_df:
+            labels = label_df[job['tag']]
+            budget = batch['false_alarm_budget']
+            evaluator = OnlineDriftEvaluator(zip(*label_intervals(labels)), n_rows=len(labels),
+                                             max_false_alarms=budget - false_alarms.get(config_name, 0)
+                                             if budget is not None else None)
+
+        # The cache key is computed on the stream before masking, so the positions of the dropouts are part of the key
+        cache_key = result_cache.key(stream, job['class'], dict(job['params'], **masking_params)) \
+            if result_cache else None
+        cached = result_cache.get(cache_key) if result_cache else None
+        masked = masked_streams.get(job['tag'])
+        try:
+            if cached is not None:
+                results, elapsed_time = cached
+                if evaluator is not None:
+                    for drift in (masked.raw_index(results['drift_ind']) if masked else results['drift_ind']):
+                        evaluator(drift)
+            else:
+                detector = detector_classes[job['class']](**job['params'])
+                # The evaluator receives every drift as it is detected, mapped to the rows of the dataframe, and stops
+                # the detection if the budget is exceeded
+                if evaluator is not None and masked:
+                    detector.set_events(lambda index, value, evaluator=evaluator, valid_index=masked.valid_index:
+                                        evaluator(int(valid_index[index]), value))
+                else:
+                    detector.set_events(evaluator)
+                st = time.time()
+                if masked and isinstance(detector, WindowConceptDriftDetector):
+                    batch_starts, batch_ends = masked.count_window_bounds(detector.batch_size,
+                                                                          min_fill=masking['min_fill'])
+                    results = detector.detect_drift_time_window(masked.values, batch_starts, batch_ends)
+                elif masked:
+                    results = detector.detect_drift_window(masked.values)
+                else:
+                    results = detector.detect_drift_window(stream)
+                et = time.time()
+                elapsed_time = et - st
+                if result_cache:
+                    result_cache.put(cache_key, results, elapsed_time)
+        except FalseAlarmBudgetExceeded as e:
+            stopped.add(config_name)
+            false_alarms[config_name] = false_alarms.get(config_name, 0) + e.evaluator.fp
+            records.append({'job': job, 'stopped': True, 'evaluation': e.evaluator.metrics()})
+            print(f"{job['tag']} {job['class']} {job['params']}: stopped, {e}")
+            continue
+
+        # The drifts are mapped from the valid values to the rows of the dataframe
+        if masked:
+            results = dict(results, drift_ind=masked.raw_index(results['drift_ind']))
+        record = {'job': job, 'result': dict(results, time=elapsed_time)}
+        if evaluator is not None:
+            record['evaluation'] = evaluator.finish()
+            false_alarms[config_name] = false_alarms.get(config_name, 0) + evaluator.fp
+        records.append(record)
+        print(f"{job['tag']} {job['class']} {job['params']}: {results['cnt_drift']} drifts in {elapsed_time:.2f} s"
+              + (f", evaluation {record['evaluation']}" if 'evaluation' in record else ''))
+    del drift_df, streams, masked_streams, label_df
+
+# The evaluation of a detector configuration is the sum over all tags with labels, as in evaluate_detector
+print('Evaluation of the detector configurations:')
+summary = {}
+for record in records:
+    if 'evaluation' in record:
+        name = f"{record['job']['class']} {json.dumps(record['job']['params'], sort_keys=True)}"
+        counts = summary.setdefault(name, dict.fromkeys(('total', 'tp', 'fp', 'fn'), 0))
+        for key in counts:
+            counts[key] += record['evaluation'][key]
+for name, counts in summary.items():
+    print(f" {name}: drifts {counts['total']}, true positives {counts['tp']}, false positives {counts['fp']}, "
+          f"false negatives {counts['fn']}" + (', stopped (false alarm budget exceeded)' if name in stopped else ''))
+
+result_name = batch['result_path'] + batch['title'] + '_batch.json'
+with open(result_name, 'w') as f:
+    json.dump(records, f, indent=2, default=to_json)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+#  File to run several (univariate) drift detectors in one pass over each data series of a dataframe and save the
+#  results of every detector and of the majority vote
+# -----------------------------------------------------------------------------------------------------------
+from plots import *
+import pandas as pd
+import numpy as np
+from src import *
+import json
+import sys
+from column_cache import load_data_frame
+from output_pipeline import OutputPipeline
+from pre_aggregation import aggregation_bins, aggregate_stream, to_raw_index
+
+with open('ensemble_config.json') as f:
+    config = json.load(f)
+
+sys.path.append(".../drift-detection-thesis/drift_detection_experiments/concept_drift_detection")
+
+from ensemble_concept_drift_detection import EnsembleConceptDriftDetector, build_detectors
+from masked_stream import MaskedStream
+from drift_events import DriftEventPublisher, build_event_sinks
+
+tag_list = config['drift_detection']['tag_list']
+df_name = config['drift_detection']['data_frame']
+dtype = config['drift_detection']['dtype']
+title = config['drift_detection']['title']
+detector_configs = config['detectors']
+
+if config['drift_detection']['column_cache']:
+    drift_df = load_data_frame(df_name, ['Timestamp'] + tag_list, dtype=dtype)
+else:
+    drift_df = pd.read_pickle(df_name)
+time_total = {}
+
+# With pre-aggregation the detectors run on one summary value per time bin, the bins are the same for all tags
+aggregation = config['aggregation']
+if aggregation['enabled']:
+    bin_starts, bin_ends = aggregation_bins(drift_df['Timestamp'], aggregation['freq'], aggregation['origin'])
+
+# Plots and reports are written in the background while the next tag is processed
+output = OutputPipeline(workers=config['drift_detection']['output_workers'])
+
+# Drift events of every detector are delivered to the sinks by a background thread while the detection runs
+if config['events']['enabled']:
+    events = DriftEventPublisher(build_event_sinks(config['events']), max_pending=config['events']['max_pending'])
+else:
+    events = None
+
+for tag in tag_list:
+    stream = np.asarray(drift_df[tag], dtype=dtype)
+    if aggregation['enabled']:
+        stream = aggregate_stream(stream, bin_starts, bin_ends, aggregation['statistic'], aggregation['chunk_size'])
+    # With masking, sensor dropouts are removed and the batches consist of valid values only
+    bounds = None
+    if config['masking']['enabled']:
+        masked = MaskedStream(stream)
+        stream = masked.values
+    detectors = build_detectors(detector_configs)
+    ensemble = EnsembleConceptDriftDetector(detectors, min_votes=config['ensemble']['min_votes'],
+                                            vote_window=config['ensemble']['vote_window'])
+    if events is not None:
+        # The events refer to the rows of the dataframe, as the drift indices of the results
+        rows = masked.valid_index if config['masking']['enabled'] else None
+        if aggregation['enabled']:
+            rows = bin_starts[rows] if rows is not None else bin_starts
+        for name, detector in zip(ensemble.names, detectors):
+            detector.set_events(events.channel(tag, name, drift_df['Timestamp'], rows))
+
+    if config['masking']['enabled'] and ensemble.batch_size is not None:
+        bounds = masked.count_window_bounds(ensemble.batch_size, config['drift_detection']['overlapping'],
+                                            min_fill=config['masking']['min_fill'])
+
+    results = ensemble.detect_drift_window(stream, overlapping=config['drift_detection']['overlapping'], bounds=bounds)
+    # The drifts are mapped from the valid values to the rows of the stream, and from the aggregated stream to the
+    # first raw row of their bin
+    if config['masking']['enabled']:
+        results = {name: dict(result, drift_ind=masked.raw_index(result['drift_ind']))
+                   for name, result in results.items()}
+    if aggregation['enabled']:
+        results = {name: dict(result, drift_ind=to_raw_index(result['drift_ind'], bin_starts))
+                   for name, result in results.items()}
+
+    print(f'Results of Drift Detection for {tag}:')
+    for name, detector_config in zip(ensemble.names, detector_configs):
+        time_total[name] = time_total.get(name, 0) + results[name]['time']
+        print(f" {name}: Number of detected drifts {results[name]['cnt_drift']}"
+              f" Execution time {results[name]['time']}")
+        for i in range(len(results[name]['drift_ind'])):
+            print(f"  Drift detected at date: {drift_df['Timestamp'].iloc[results[name]['drift_ind'][i]]}")
+            print(f"  With distance: {results[name]['result_list'][i]}")
+
+        if config['drift_detection']['create_plots']:
+            save_path = config['drift_detection']['plot_path'] + title + '_' + name + '_' + tag + '_.png'
+            output.submit(plot_drift_plotly, drift_df, tag, results[name]['drift_ind'], save_path,
+                          config['drift_detection']['line_plot'])
+
+        if config['drift_detection']['create_reports']:
+            report_name = config['drift_detection']['report_path'] + title + '_' + name + '_' + tag + '_.txt'
+            output.submit(create_report, drift_df, tag, results[name], results[name]['time'], report_name,
+                          {'detector': detector_config})
+
+    if 'vote' in results:
+        print(f" Vote: Number of detected drifts {results['vote']['cnt_drift']}")
+        for i in range(len(results['vote']['drift_ind'])):
+            print(f"  Drift detected at date: {drift_df['Timestamp'].iloc[results['vote']['drift_ind'][i]]}")
+            print(f"  With votes: {results['vote']['result_list'][i]}")
+
+        if config['drift_detection']['create_reports']:
+            report_name = config['drift_detection']['report_path'] + title + '_vote_' + tag + '_.txt'
+            output.submit(create_report, drift_df, tag, results['vote'],
+                          sum(results[name]['time'] for name in ensemble.names), report_name,
+                          {'detector': {'class': 'EnsembleConceptDriftDetector', 'params': config['ensemble']}})
+
+output.close()
+if events is not None:
+    events.close()
+    print(f'Published {events.cnt_published} drift events, {events.cnt_dropped} dropped, '
+          f'{events.cnt_errors} failed writes')
+
+for name in time_total:
+    print(f"Average Execution time {name} {time_total[name] / len(tag_list)}")
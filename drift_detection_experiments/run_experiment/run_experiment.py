@@ -5,6 +5,7 @@
 # -----------------------------------------------------------------------------------------------------------
 from plots import *
 from src import *
+from column_cache import load_data_frame
 import pandas as pd
 import numpy as np
 import time
@@ -17,8 +18,12 @@ with open('config.json') as f:
 
 sys.path.append("C:/Users/brand/OneDrive/Dokumente/Studium/Master_Thesis_Sicherung/Code_project/drift_detection_experiments/concept_drift_detection")
 
+from window_concept_drift_detection import WindowConceptDriftDetector
+from masked_stream import MaskedStream
+
 tag = config['drift_detection']['tag']
 df_name = config['drift_detection']['data_frame']
+dtype = config['drift_detection']['dtype']
 
 detector_module, detector_class = config['detector']['class'].rsplit('.', 1)
 DetectorClass = getattr(importlib.import_module(detector_module), detector_class)
@@ -26,18 +31,35 @@ DetectorClass = getattr(importlib.import_module(detector_module), detector_class
 detector_params = config['detector']['params']
 detector = DetectorClass(**detector_params)
 
-drift_df = pd.read_pickle(df_name)
-stream = np.array(drift_df.loc[:, tag])
+if config['drift_detection']['column_cache']:
+    drift_df = load_data_frame(df_name, ['Timestamp', tag], dtype=dtype)
+else:
+    drift_df = pd.read_pickle(df_name)
+stream = np.asarray(drift_df.loc[:, tag], dtype=dtype)
 
 
 if config['drift_detection']['reshape_stream']:
     stream = stream.reshape(stream.shape[0], 1)
 
+# With masking, sensor dropouts are removed and the batches consist of valid values only
+masking = config['masking']
+if masking['enabled']:
+    masked = MaskedStream(stream)
+    stream = masked.values
+
 st = time.time()
-results = detector.detect_drift_window(stream)
+if masking['enabled'] and isinstance(detector, WindowConceptDriftDetector):
+    batch_starts, batch_ends = masked.count_window_bounds(detector.batch_size, min_fill=masking['min_fill'])
+    results = detector.detect_drift_time_window(stream, batch_starts, batch_ends)
+else:
+    results = detector.detect_drift_window(stream)
 et = time.time()
 elapsed_time = et - st
 
+# The drifts are mapped from the valid values to the rows of the dataframe
+if masking['enabled']:
+    results = dict(results, drift_ind=masked.raw_index(results['drift_ind']))
+
 print('Results of Drift Detection:')
 print(f" Number of detected drifts {results['cnt_drift']}")
 for i in range(len(results['drift_ind'])):
@@ -11,49 +11,156 @@ import time
 import json
 import importlib
 import sys
+from column_cache import load_data_frame
+from output_pipeline import OutputPipeline
+from result_cache import ResultCache
+from pre_aggregation import aggregation_bins, aggregate_stream, to_raw_index
 
 with open('series_config.json') as f:
     config = json.load(f)
 
 sys.path.append(".../drift-detection-thesis/drift_detection_experiments/concept_drift_detection")
 
+from window_concept_drift_detection import WindowConceptDriftDetector, time_window_bounds
+from masked_stream import MaskedStream
+from drift_events import DriftEventPublisher, build_event_sinks
+
 tag_list = config['drift_detection']['tag_list']
 df_name = config['drift_detection']['data_frame']
+# Float type of the streams, with 'float32' the streams, batches, reference samples and sorted samples of the
+# detectors take half the memory
+dtype = config['drift_detection']['dtype']
 
 detector_module, detector_class = config['detector']['class'].rsplit('.', 1)
 DetectorClass = getattr(importlib.import_module(detector_module), detector_class)
 
 detector_params = config['detector']['params']
 
-drift_df = pd.read_pickle(df_name)
-time_total = 0
+# The coarse-to-fine scan locates drifts like overlapping batches, comparing only a fraction of the batches. The
+# parallel scan gives the same results as the sequential scan, so both share the entries of the result cache. The
+# time-based scan uses batches of a fixed duration (e.g. shifts) instead of batch_size values.
+scan = config['scan']
+if scan['mode'] == 'coarse_to_fine':
+    scan_params = {key: scan[key] for key in ('coarse_stride', 'fine_stride', 'refine')}
+elif scan['mode'] == 'time':
+    scan_params = {key: scan[key] for key in ('window', 'step', 'origin', 'min_samples')}
+else:
+    scan_params = {}
+
+# The runner is guarded, because the worker processes of the parallel scan import this module when they are started
+# with spawn (Windows, macOS)
+if __name__ == '__main__':
+    if config['result_cache']['enabled']:
+        result_cache = ResultCache(config['result_cache']['path'], config['result_cache']['max_size_mb'] * 2 ** 20)
+    else:
+        result_cache = None
+
+    if config['drift_detection']['column_cache']:
+        drift_df = load_data_frame(df_name, ['Timestamp'] + tag_list, dtype=dtype)
+    else:
+        drift_df = pd.read_pickle(df_name)
+    time_total = 0
+
+    # With pre-aggregation the detector runs on one summary value per time bin, the bins and the boundaries of the
+    # time-based batches are the same for all tags of the dataframe
+    aggregation = config['aggregation']
+    timestamps = drift_df['Timestamp']
+    if aggregation['enabled']:
+        bin_starts, bin_ends = aggregation_bins(timestamps, aggregation['freq'], aggregation['origin'])
+        timestamps = timestamps.iloc[bin_starts]
+    if scan['mode'] == 'time':
+        window_starts, window_ends = time_window_bounds(timestamps, **scan_params)
+
+    # With masking, sensor dropouts are removed and the batches consist of valid values only
+    masking = config['masking']
+    masking_params = {'min_fill': masking['min_fill']} if masking['enabled'] else {}
+
+    # Plots and reports are written in the background while the next tag is processed
+    output = OutputPipeline(workers=config['drift_detection']['output_workers'])
+
+    # Drift events are delivered to the sinks by a background thread while the detection runs. Results loaded from the
+    # result cache are not detected again and therefore publish no events.
+    if config['events']['enabled']:
+        events = DriftEventPublisher(build_event_sinks(config['events']), max_pending=config['events']['max_pending'])
+    else:
+        events = None
+
+    for tag in tag_list:
+        stream = np.asarray(drift_df[tag], dtype=dtype)
+        if aggregation['enabled']:
+            stream = aggregate_stream(stream, bin_starts, bin_ends, aggregation['statistic'], aggregation['chunk_size'])
 
-for tag in tag_list:
-    stream = np.array(drift_df[tag])
-    detector = DetectorClass(**detector_params)
+        if config['drift_detection']['reshape_streams']:
+            stream = stream.reshape(stream.shape[0], 1)
 
-    if config['drift_detection']['reshape_streams']:
-        stream = stream.reshape(stream.shape[0], 1)
+        # Detection is skipped if the results of the detector on this stream are cached. The key is computed from the
+        # stream before masking, so the positions of the dropouts are part of the key.
+        cache_key = result_cache.key(stream, config['detector']['class'],
+                                     dict(detector_params, **scan_params, **masking_params)) if result_cache else None
+        if masking['enabled']:
+            masked = MaskedStream(stream)
+            stream = masked.values
+            if scan['mode'] == 'time':
+                window_starts, window_ends = time_window_bounds(timestamps[masked.mask], **scan_params)
+        cached = result_cache.get(cache_key) if result_cache else None
+        if cached is not None:
+            print(f'Results of {tag} loaded from the result cache')
+            results, elapsed_time = cached
+        else:
+            detector = DetectorClass(**detector_params)
+            if events is not None:
+                # The events refer to the rows of the dataframe, as the drift indices of the results
+                rows = masked.valid_index if masking['enabled'] else None
+                if aggregation['enabled']:
+                    rows = bin_starts[rows] if rows is not None else bin_starts
+                detector.set_events(events.channel(tag, config['detector']['class'], drift_df['Timestamp'], rows))
+            st = time.time()
+            # The coarse-to-fine and parallel scans count the batches in rows of the dataframe as well
+            mask_args = {'masked': masked, 'min_fill': masking['min_fill']} if masking['enabled'] else {}
+            if scan['mode'] == 'coarse_to_fine':
+                results = detector.detect_drift_coarse_to_fine(stream, **scan_params, **mask_args)
+            elif scan['mode'] == 'parallel':
+                results = detector.detect_drift_parallel(stream, workers=scan['workers'], **mask_args)
+            elif scan['mode'] == 'time':
+                results = detector.detect_drift_time_window(stream, window_starts, window_ends,
+                                                            overlapping=scan['step'] is not None)
+            elif masking['enabled'] and isinstance(detector, WindowConceptDriftDetector):
+                batch_starts, batch_ends = masked.count_window_bounds(detector.batch_size, min_fill=masking['min_fill'])
+                results = detector.detect_drift_time_window(stream, batch_starts, batch_ends)
+            else:
+                results = detector.detect_drift_window(stream)
+            et = time.time()
+            elapsed_time = et - st
+            if result_cache:
+                result_cache.put(cache_key, results, elapsed_time)
+        time_total+=elapsed_time
 
-    st = time.time()
-    results = detector.detect_drift_window(stream)
-    et = time.time()
-    elapsed_time = et - st
-    time_total+=elapsed_time
+        # The drifts are mapped from the valid values to the rows of the stream, and from the aggregated stream to the
+        # first raw row of their bin
+        if masking['enabled']:
+            results = dict(results, drift_ind=masked.raw_index(results['drift_ind']))
+        if aggregation['enabled']:
+            results = dict(results, drift_ind=to_raw_index(results['drift_ind'], bin_starts))
 
-    print('Results of Drift Detection:')
-    print(f" Number of detected drifts {results['cnt_drift']}")
-    for i in range(len(results['drift_ind'])):
-        print(f" Drift detected at date: {drift_df['Timestamp'].iloc[results['drift_ind'][i]]}")
-        print(f" With distance: {results['result_list'][i]}")
+        print('Results of Drift Detection:')
+        print(f" Number of detected drifts {results['cnt_drift']}")
+        for i in range(len(results['drift_ind'])):
+            print(f" Drift detected at date: {drift_df['Timestamp'].iloc[results['drift_ind'][i]]}")
+            print(f" With distance: {results['result_list'][i]}")
 
 
-    if config['drift_detection']['create_plots']:
-        save_path = config['drift_detection']['plot_path'] + config['drift_detection']['title']+'_'+tag+'_.png'
-        plot_drift_plotly(drift_df, tag, results['drift_ind'], save_path, config['drift_detection']['line_plot'])
+        if config['drift_detection']['create_plots']:
+            save_path = config['drift_detection']['plot_path'] + config['drift_detection']['title']+'_'+tag+'_.png'
+            output.submit(plot_drift_plotly, drift_df, tag, results['drift_ind'], save_path,
+                          config['drift_detection']['line_plot'])
 
-    if config['drift_detection']['create_reports']:
-        report_name = config['drift_detection']['report_path'] + config['drift_detection']['title']+'_'+tag+'_.txt'
-        create_report(drift_df, tag, results, elapsed_time, report_name, config)
+        if config['drift_detection']['create_reports']:
+            report_name = config['drift_detection']['report_path'] + config['drift_detection']['title']+'_'+tag+'_.txt'
+            output.submit(create_report, drift_df, tag, results, elapsed_time, report_name, config)
 
-print(f"Average Execution time {time_total/len(config['drift_detection']['tag_list'])}")
+    output.close()
+    if events is not None:
+        events.close()
+        print(f'Published {events.cnt_published} drift events, {events.cnt_dropped} dropped, '
+              f'{events.cnt_errors} failed writes')
+    print(f"Average Execution time {time_total/len(config['drift_detection']['tag_list'])}")
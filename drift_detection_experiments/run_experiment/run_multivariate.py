@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+#  File to run a multivariate drift detection experiment on several tags of a dataframe in one pass (e.g. the
+#  correlation detector on all motor currents of a line) and save the results
+# -----------------------------------------------------------------------------------------------------------
+from plots import *
+import pandas as pd
+import numpy as np
+from src import *
+import time
+import json
+import importlib
+import sys
+from column_cache import load_data_frame
+from output_pipeline import OutputPipeline
+
+with open('multivariate_config.json') as f:
+    config = json.load(f)
+
+sys.path.append(".../drift-detection-thesis/drift_detection_experiments/concept_drift_detection")
+
+from masked_stream import MaskedStream
+
+tag_list = config['drift_detection']['tag_list']
+df_name = config['drift_detection']['data_frame']
+dtype = config['drift_detection']['dtype']
+title = config['drift_detection']['title']
+
+detector_module, detector_class = config['detector']['class'].rsplit('.', 1)
+DetectorClass = getattr(importlib.import_module(detector_module), detector_class)
+detector = DetectorClass(tags=tag_list, **config['detector']['params'])
+
+if config['drift_detection']['column_cache']:
+    drift_df = load_data_frame(df_name, ['Timestamp'] + tag_list, dtype=dtype)
+else:
+    drift_df = pd.read_pickle(df_name)
+stream = np.column_stack([np.asarray(drift_df[tag], dtype=dtype) for tag in tag_list])
+
+st = time.time()
+if config['masking']['enabled']:
+    # Rows with a dropout of any tag are removed, the batches consist of complete rows only
+    masked = MaskedStream(stream)
+    batch_starts, batch_ends = masked.count_window_bounds(detector.batch_size, config['drift_detection']['overlapping'],
+                                                          config['drift_detection']['stride'],
+                                                          config['masking']['min_fill'])
+    results = detector.detect_drift_time_window(masked.values, batch_starts, batch_ends,
+                                                config['drift_detection']['overlapping'])
+    results['drift_ind'] = masked.raw_index(results['drift_ind'])
+else:
+    results = detector.detect_drift_window(stream, overlapping=config['drift_detection']['overlapping'],
+                                           stride=config['drift_detection']['stride'])
+et = time.time()
+elapsed_time = et - st
+
+print('Results of Drift Detection:')
+print(f" Number of detected drifts {results['cnt_drift']}")
+for i in range(len(results['drift_ind'])):
+    print(f" Drift detected at date: {drift_df['Timestamp'].iloc[results['drift_ind'][i]]}")
+    print(f" With distance: {results['result_list'][i]}")
+    for tag_a, tag_b, change in results['drift_pairs'][i]:
+        print(f"  Correlation of {tag_a} and {tag_b} changed by {change}")
+
+# Plots and report are written in the background
+output = OutputPipeline(workers=config['drift_detection']['output_workers'])
+
+if config['drift_detection']['create_plots']:
+    for tag in tag_list:
+        save_path = config['drift_detection']['plot_path'] + title + '_' + tag + '_.png'
+        output.submit(plot_drift_plotly, drift_df, tag, results['drift_ind'], save_path,
+                      config['drift_detection']['line_plot'])
+
+if config['drift_detection']['create_report']:
+    report_name = config['drift_detection']['report_path'] + title + '_.txt'
+    output.submit(create_report, drift_df, tag_list, results, elapsed_time, report_name, config)
+
+output.close()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# File to run a parameter sweep of drift detection experiments defined in sweep_config.json with several worker
+# processes. The jobs are kept in a SQLite queue, so the sweep can be resumed after an interruption by starting the
+# file again, and the same file can be started on several machines that share the queue
+# -----------------------------------------------------------------------------------------------------------
+from concurrent.futures import ProcessPoolExecutor
+import json
+import sys
+
+sys.path.append(".../drift-detection-thesis/drift_detection_experiments/concept_drift_detection")
+
+from sweep_queue import SweepQueue, expand_grid, run_worker
+
+with open('sweep_config.json') as f:
+    config = json.load(f)
+
+sweep = config['sweep']
+
+if __name__ == '__main__':
+    queue = SweepQueue(sweep['queue'], sweep['lease_seconds'], sweep['max_attempts'])
+    print(f"Added {queue.add_jobs(expand_grid(config))} new jobs to {sweep['queue']}")
+    print(f"Jobs by status: {queue.counts()}")
+
+    with ProcessPoolExecutor(max_workers=sweep['workers']) as executor:
+        futures = [executor.submit(run_worker, sweep['queue'], sweep['lease_seconds'], sweep['max_attempts'])
+                   for _ in range(sweep['workers'])]
+        completed = sum(future.result() for future in futures)
+
+    print(f"Completed {completed} jobs in this run")
+    print(f"Jobs by status: {queue.counts()}")
+
+    result_name = sweep['result_path'] + sweep['title'] + '_sweep.json'
+    with open(result_name, 'w') as f:
+        json.dump(queue.results(), f, indent=2)
@@ -35,5 +35,9 @@ def create_report(df, tag, results, exec_time, file_name, config):
         f.write(f" Drift detected at date: {df['Timestamp'].iloc[results['drift_ind'][i]]}")
         f.write(f" With distance: {results['result_list'][i]}")
         f.write('\n')
+        # Multivariate detectors report the tag pairs that changed with every drift
+        for tag_a, tag_b, change in results.get('drift_pairs', [[]] * len(results['drift_ind']))[i]:
+            f.write(f"  Correlation of {tag_a} and {tag_b} changed by {change}")
+            f.write('\n')
 
     f.close()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# File contains a resumable work queue for parameter sweeps of drift detection experiments. A sweep config is
+# expanded into one job per data frame, tag, detector and parameter combination, and the jobs are stored in a SQLite
+# database. Workers claim jobs with a lease that they renew while the job runs; the job of a crashed worker is
+# claimed again once its lease has expired. Finished jobs keep their results in the database, so an interrupted
+# sweep resumes with the unfinished jobs. With masking, sensor dropouts are removed before the detection as in the
+# other runners, and the drift indices refer to the rows of the dataframe.
+# Note: SQLite locking requires a filesystem with working file locks when workers on several machines share a queue.
+# -----------------------------------------------------------------------------------------------------------
+import hashlib
+import importlib
+import itertools
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from column_cache import load_column
+from masked_stream import MaskedStream
+from result_cache import to_json
+from window_concept_drift_detection import WindowConceptDriftDetector
+
+
+def expand_grid(sweep_config):
+    """
+    Expands a sweep config into jobs. Every job runs one detector with one parameter combination on one tag.
+
+    Args:
+        sweep_config (dict): The sweep config with the keys 'datasets' (list of dictionaries with 'data_frame',
+            'tag_list' and optionally the float type 'dtype' of the streams), 'detectors' (list of dictionaries
+            with the detector 'class', the fixed 'params' and a 'grid' mapping parameter names to lists of values)
+            and optionally 'masking' (dictionary with 'enabled' and 'min_fill').
+
+    Returns:
+        list: The jobs, each a dictionary with 'data_frame', 'tag', 'class', 'params', the 'dtype' of the dataset
+            if it is given and 'min_fill' if masking is enabled.
+    """
+    masking = sweep_config.get('masking', {'enabled': False})
+    jobs = []
+    for dataset in sweep_config['datasets']:
+        for detector in sweep_config['detectors']:
+            grid = detector.get('grid', {})
+            for values in itertools.product(*grid.values()):
+                params = dict(detector.get('params', {}), **dict(zip(grid.keys(), values)))
+                for tag in dataset['tag_list']:
+                    job = {'data_frame': dataset['data_frame'], 'tag': tag, 'class': detector['class'],
+                           'params': params}
+                    # Jobs without dtype keep their ids, so existing queues are not run again
+                    if 'dtype' in dataset:
+                        job['dtype'] = dataset['dtype']
+                    if masking['enabled']:
+                        job['min_fill'] = masking['min_fill']
+                    jobs.append(job)
+
+    return jobs
+
+
+def job_id(job):
+    """
+    Computes the id of a job from its content, so adding the same job twice has no effect.
+
+    Args:
+        job (dict): The job.
+
+    Returns:
+        str: The id of the job.
+    """
+    return hashlib.sha256(json.dumps(job, sort_keys=True).encode()).hexdigest()[:32]
+
+
+class SweepQueue:
+    """
+    SQLite work queue of a parameter sweep with leases.
+
+    A job is 'pending', 'running', 'done' or 'failed'. claim takes the oldest pending job, or a running job whose
+    lease has expired, and leases it to a worker. complete and fail only succeed for the worker that holds the
+    lease. A failed job is retried until it has been claimed max_attempts times.
+
+    Attributes:
+        db_path (str): Path of the SQLite database.
+        lease_seconds (float): Duration of a lease.
+        max_attempts (int): Maximum number of claims of a job.
+
+    Methods:
+        __init__: Initializes the SweepQueue and creates the database if it does not exist.
+        add_jobs: Adds jobs to the queue, skipping jobs that are already queued.
+        claim: Leases the next job to a worker.
+        renew: Extends the lease of a job.
+        complete: Stores the results of a job and marks it as done.
+        fail: Records the error of a job and queues it again or marks it as failed.
+        counts: Returns the number of jobs by status.
+        results: Returns the finished jobs with their results.
+    """
+
+    def __init__(self, db_path, lease_seconds=600, max_attempts=3):
+        """
+        Initializes the SweepQueue and creates the database if it does not exist.
+
+        Args:
+            db_path (str): Path of the SQLite database.
+            lease_seconds (float, optional): Duration of a lease. Default is 600.
+            max_attempts (int, optional): Maximum number of claims of a job. Default is 3.
+
+        Returns:
+            None
+        """
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        with self._connect() as con:
+            con.execute('CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, job TEXT NOT NULL, '
+                        "status TEXT NOT NULL DEFAULT 'pending', worker TEXT, lease_until REAL, "
+                        'attempts INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT)')
+
+    def _connect(self):
+        con = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        return _Transaction(con)
+
+    def add_jobs(self, jobs):
+        """
+        Adds jobs to the queue, skipping jobs that are already queued.
+
+        Args:
+            jobs (list): The jobs, e.g. returned by expand_grid.
+
+        Returns:
+            int: Number of new jobs.
+        """
+        with self._connect() as con:
+            before = con.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+            con.executemany('INSERT OR IGNORE INTO jobs (id, job) VALUES (?, ?)',
+                            [(job_id(job), json.dumps(job, sort_keys=True)) for job in jobs])
+            return con.execute('SELECT COUNT(*) FROM jobs').fetchone()[0] - before
+
+    def claim(self, worker):
+        """
+        Leases the next job to a worker. Jobs whose lease expired on their last attempt, e.g. after the worker
+        crashed, are marked as failed first.
+
+        Args:
+            worker (str): The id of the worker.
+
+        Returns:
+            tuple: The id and the job, or None if no job can be claimed.
+        """
+        now = time.time()
+        with self._connect() as con:
+            con.execute("UPDATE jobs SET status = 'failed', error = COALESCE(error, 'lease expired'), "
+                        "lease_until = NULL WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                        (now, self.max_attempts))
+            row = con.execute("SELECT id, job FROM jobs WHERE attempts < ? AND (status = 'pending' OR "
+                              "(status = 'running' AND lease_until < ?)) ORDER BY rowid LIMIT 1",
+                              (self.max_attempts, now)).fetchone()
+            if row is None:
+                return None
+            con.execute("UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                        'WHERE id = ?', (worker, now + self.lease_seconds, row[0]))
+
+        return row[0], json.loads(row[1])
+
+    def renew(self, job, worker):
+        """
+        Extends the lease of a job.
+
+        Args:
+            job (str): The id of the job.
+            worker (str): The id of the worker holding the lease.
+
+        Returns:
+            bool: True if the worker still holds the lease, False otherwise.
+        """
+        with self._connect() as con:
+            return con.execute("UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                               (time.time() + self.lease_seconds, job, worker)).rowcount == 1
+
+    def complete(self, job, worker, result):
+        """
+        Stores the results of a job and marks it as done.
+
+        Args:
+            job (str): The id of the job.
+            worker (str): The id of the worker holding the lease.
+            result (dict): The results of the job.
+
+        Returns:
+            bool: True if the worker still held the lease, False if the results were discarded.
+        """
+        with self._connect() as con:
+            return con.execute("UPDATE jobs SET status = 'done', result = ?, lease_until = NULL "
+                               "WHERE id = ? AND worker = ? AND status = 'running'",
+                               (json.dumps(result, default=to_json), job, worker)).rowcount == 1
+
+    def fail(self, job, worker, error):
+        """
+        Records the error of a job and queues it again, or marks it as failed after max_attempts claims.
+
+        Args:
+            job (str): The id of the job.
+            worker (str): The id of the worker holding the lease.
+            error (str): Description of the error.
+
+        Returns:
+            None
+        """
+        with self._connect() as con:
+            con.execute("UPDATE jobs SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END, "
+                        "error = ?, lease_until = NULL WHERE id = ? AND worker = ? AND status = 'running'",
+                        (self.max_attempts, error, job, worker))
+
+    def counts(self):
+        """
+        Returns the number of jobs by status.
+
+        Returns:
+            dict: Number of jobs for every status.
+        """
+        with self._connect() as con:
+            return dict(con.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+
+    def results(self):
+        """
+        Returns the finished jobs with their results.
+
+        Returns:
+            list: The finished jobs, each a dictionary with 'job' and 'result'.
+        """
+        with self._connect() as con:
+            rows = con.execute("SELECT job, result FROM jobs WHERE status = 'done' ORDER BY rowid").fetchall()
+
+        return [{'job': json.loads(job), 'result': json.loads(result)} for job, result in rows]
+
+
+class _Transaction:
+    """
+    Context manager running the statements of a SQLite connection in one transaction that holds the write lock from
+    the start, so two workers can never claim the same job. The connection is closed at the end.
+    """
+
+    def __init__(self, con):
+        self.con = con
+
+    def __enter__(self):
+        self.con.execute('BEGIN IMMEDIATE')
+        return self.con
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.con.execute('COMMIT' if exc_type is None else 'ROLLBACK')
+        finally:
+            self.con.close()
+
+
+def run_job(job):
+    """
+    Runs the detector of a job on its tag. Jobs with 'min_fill' run on the valid values of the tag as the other
+    runners with masking, and their drift indices are mapped back to the rows of the dataframe.
+
+    Args:
+        job (dict): The job.
+
+    Returns:
+        dict: The results of detect_drift_window and the execution time ('time').
+    """
+    stream = load_column(job['data_frame'], job['tag'], dtype=job.get('dtype'))
+    detector_module, detector_class = job['class'].rsplit('.', 1)
+    DetectorClass = getattr(importlib.import_module(detector_module), detector_class)
+    detector = DetectorClass(**job['params'])
+
+    st = time.time()
+    if 'min_fill' in job:
+        masked = MaskedStream(stream)
+        if isinstance(detector, WindowConceptDriftDetector):
+            batch_starts, batch_ends = masked.count_window_bounds(detector.batch_size, min_fill=job['min_fill'])
+            results = detector.detect_drift_time_window(masked.values, batch_starts, batch_ends)
+        else:
+            results = detector.detect_drift_window(masked.values)
+        results = dict(results, drift_ind=masked.raw_index(results['drift_ind']))
+    else:
+        results = detector.detect_drift_window(stream)
+    et = time.time()
+
+    return dict(results, time=et - st)
+
+
+def run_worker(db_path, lease_seconds=600, max_attempts=3):
+    """
+    Claims and runs jobs until the queue has no job left that can be claimed. The lease of the running job is renewed
+    by a background thread.
+
+    Args:
+        db_path (str): Path of the SQLite database.
+        lease_seconds (float, optional): Duration of a lease. Default is 600.
+        max_attempts (int, optional): Maximum number of claims of a job. Default is 3.
+
+    Returns:
+        int: Number of jobs completed by the worker.
+    """
+    queue = SweepQueue(db_path, lease_seconds, max_attempts)
+    worker = f'{socket.gethostname()}-{os.getpid()}'
+    completed = 0
+
+    while True:
+        claimed = queue.claim(worker)
+        if claimed is None:
+            return completed
+        job, spec = claimed
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=_renew_lease, args=(queue, job, worker, stop), daemon=True)
+        heartbeat.start()
+        try:
+            result = run_job(spec)
+        except Exception as e:
+            queue.fail(job, worker, repr(e))
+        else:
+            completed += queue.complete(job, worker, result)
+        finally:
+            stop.set()
+            heartbeat.join()
+
+
+def _renew_lease(queue, job, worker, stop):
+    while not stop.wait(queue.lease_seconds / 3):
+        if not queue.renew(job, worker):
+            return
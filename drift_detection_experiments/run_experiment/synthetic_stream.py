@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# File contains a generator of synthetic drift streams for tests at production scale without the confidential data.
+# The streams imitate the motor currents of a fiber production line: a constant level, a periodic production cycle,
+# autocorrelated noise and the resolution of the sensor, with abrupt, gradual and recurring drifts of the mean and the
+# standard deviation, sensor dropouts (NaN) and downtimes of the line (gaps of the timestamps). The streams are
+# generated lazily in chunks of rows, so streams of 1e9 rows and more never have to fit in memory, and every block
+# of BLOCK_SIZE rows is generated from its own seed, so the streams are reproducible from the seed independently of
+# the chunk size. The labels mark the rows after every change of the drift state, in the format of the label
+# dataframes of create_labels and evaluate_detector (one column per tag, 1 inside a drift interval).
+# Usage: python synthetic_stream.py (with the settings in synthetic_config.json)
+# -----------------------------------------------------------------------------------------------------------
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+# Number of rows generated from one seed
+BLOCK_SIZE = 2 ** 17
+# Default parameters of a tag
+TAG_DEFAULTS = {
+    'level': 10.0,
+    'noise': 1.0,
+    'noise_correlation': 0.0,
+    'cycle_amplitude': 0.0,
+    'cycle_period': 3600,
+    'resolution': None,
+    'dropout_rate': 0.0,
+    'dropout_length': 10,
+    'label_width': 10000,
+    'drifts': [],
+}
+DRIFT_TYPES = ('abrupt', 'gradual', 'recurring')
+
+
+def _drift_weight(drift, ind):
+    """
+    Computes how far a drift has progressed at the given rows, 0 before and 1 during the drift.
+
+    Args:
+        drift (dict): The drift, see SyntheticDriftStream.
+        ind (numpy.ndarray): The rows.
+
+    Returns:
+        numpy.ndarray: The weight of the drift for every row.
+    """
+    start = drift['start']
+    duration = drift.get('duration')
+    if drift['type'] == 'recurring':
+        rel = ind - start
+        active = (rel >= 0) & (rel % drift['period'] < duration)
+        if drift.get('count') is not None:
+            active &= rel // drift['period'] < drift['count']
+        return active.astype(np.float64)
+
+    end = start + duration if duration is not None else np.inf
+    if drift['type'] == 'gradual':
+        # The mean and standard deviation change linearly over width rows at the start and at the end of the drift
+        return (np.clip((ind - start) / drift['width'], 0.0, 1.0)
+                - np.clip((ind - end) / drift['width'], 0.0, 1.0))
+
+    return ((ind >= start) & (ind < end)).astype(np.float64)
+
+
+def _change_points(drift, length):
+    """
+    Returns the rows at which the state of a drift changes, with the number of rows in which it changes.
+
+    Args:
+        drift (dict): The drift, see SyntheticDriftStream.
+        length (int): Number of rows of the stream.
+
+    Returns:
+        list: Tuples (row, number of rows) of the changes within the stream.
+    """
+    start, duration = drift['start'], drift.get('duration')
+    if drift['type'] == 'recurring':
+        count = drift.get('count')
+        onsets = range(start, length, drift['period'])
+        if count is not None:
+            onsets = onsets[:count]
+        return [(row, 1) for onset in onsets for row in (onset, onset + duration) if row < length]
+
+    width = drift['width'] if drift['type'] == 'gradual' else 1
+    rows = [start] if duration is None else [start, start + duration]
+
+    return [(row, width) for row in rows if row < length]
+
+
+class SyntheticDriftStream:
+    """
+    Deterministic synthetic drift stream of one production line with one or more tags.
+
+    Every tag is the sum of its level, a sinusoidal production cycle and AR(1) noise, rounded to the resolution of the
+    sensor. A drift adds shift to the mean and multiplies the standard deviation of the noise by scale while it is
+    active:
+        - 'abrupt': active from start for duration rows (None: until the end of the stream).
+        - 'gradual': as abrupt, with a linear transition over width rows at the start and at the end.
+        - 'recurring': active for duration rows at the start of every period rows from start, count times (None:
+          until the end of the stream).
+    Every change of a drift state starts a label interval of label_width rows (at least the width of a gradual
+    transition). Overlapping intervals are merged, and the intervals end before the last row of the stream, as
+    evaluate_detector reads the label after every labeled row.
+
+    Attributes:
+        length (int): Number of rows of the stream.
+        tags (dict): Parameters of every tag, TAG_DEFAULTS updated with the given parameters.
+        freq (pandas.Timedelta): Sampling interval.
+        start (pandas.Timestamp): Timestamp of the first row.
+        downtime_rate (float): Expected number of downtimes of the line per row.
+        downtime_mean (pandas.Timedelta): Mean duration of a downtime.
+        seed (int): Seed of the stream.
+        dtype (numpy.dtype): Float type of the tags.
+
+    Methods:
+        __init__: Initializes the SyntheticDriftStream with specified parameters.
+        intervals: Returns the label intervals of a tag.
+        chunks: Yields the stream and its labels in chunks of rows.
+        to_frames: Returns the whole stream and its labels as dataframes.
+        save_npy: Writes the stream and its labels chunk by chunk to .npy files.
+    """
+
+    def __init__(self, length, tags, freq='1s', start='2021-01-01', downtime_rate=0.0, downtime_mean='1h', seed=0,
+                 dtype='float64'):
+        """
+        Initializes the SyntheticDriftStream with specified parameters.
+
+        Args:
+            length (int): Number of rows of the stream.
+            tags (dict): Parameters of every tag by tag name, missing parameters are taken from TAG_DEFAULTS:
+                - 'level' (float): Mean of the tag.
+                - 'noise' (float): Standard deviation of the noise.
+                - 'noise_correlation' (float): Autocorrelation of the noise between consecutive rows.
+                - 'cycle_amplitude' (float): Amplitude of the production cycle.
+                - 'cycle_period' (int): Number of rows of the production cycle.
+                - 'resolution' (float): Resolution of the sensor, None for no rounding.
+                - 'dropout_rate' (float): Expected number of sensor dropouts per row.
+                - 'dropout_length' (float): Mean number of rows of a dropout.
+                - 'label_width' (int): Number of labeled rows after a change of a drift state.
+                - 'drifts' (list): The drifts, dictionaries with 'type' (one of DRIFT_TYPES), 'start', 'duration',
+                  'shift', 'scale', 'width' (gradual) and 'period' and 'count' (recurring).
+            freq (str or timedelta, optional): Sampling interval. Default is '1s'.
+            start (str or datetime, optional): Timestamp of the first row, in UTC. Default is '2021-01-01'.
+            downtime_rate (float, optional): Expected number of downtimes per row. Default is 0.
+            downtime_mean (str or timedelta, optional): Mean duration of a downtime. Default is '1h'.
+            seed (int, optional): Seed of the stream. Default is 0.
+            dtype (str, optional): Float type of the tags. Default is 'float64'.
+
+        Returns:
+            None
+        """
+        self.length = int(length)
+        self.tags = {}
+        for tag, params in tags.items():
+            params = dict(TAG_DEFAULTS, **params)
+            for drift in params['drifts']:
+                if drift['type'] not in DRIFT_TYPES:
+                    raise ValueError(f"Drift type \'{drift['type']}\' is unknown. Your options are {list(DRIFT_TYPES)}")
+            self.tags[tag] = params
+        self.freq = pd.Timedelta(freq)
+        self.start = pd.Timestamp(start, tz='UTC') if pd.Timestamp(start).tz is None else pd.Timestamp(start)
+        self.downtime_rate = downtime_rate
+        self.downtime_mean = pd.Timedelta(downtime_mean)
+        self.seed = seed
+        self.dtype = np.dtype(dtype)
+
+    def _rng(self, component, block):
+        return np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(component, block)))
+
+    def intervals(self, tag):
+        """
+        Returns the label intervals of a tag.
+
+        Args:
+            tag (str): The tag.
+
+        Returns:
+            list: The intervals (first row, row after the last row), sorted and without overlaps.
+        """
+        params = self.tags[tag]
+        changes = sorted(change for drift in params['drifts'] for change in _change_points(drift, self.length))
+
+        intervals = []
+        for row, width in changes:
+            end = min(row + max(width, params['label_width']), self.length - 1)
+            if intervals and row <= intervals[-1][1]:
+                intervals[-1] = (intervals[-1][0], max(intervals[-1][1], end))
+            elif row < end:
+                intervals.append((row, end))
+
+        return intervals
+
+    def _timestamps(self, block, ind, downtime):
+        """
+        Computes the timestamps of a block in ns, with the downtimes that start in the block.
+
+        Args:
+            block (int): Number of the block.
+            ind (numpy.ndarray): The rows of the block.
+            downtime (int): Total duration of the downtimes before the block in ns.
+
+        Returns:
+            tuple: The timestamps and the total duration of the downtimes after the block.
+        """
+        freq_ns = self.freq.value
+        shift = np.zeros(len(ind), dtype=np.int64)
+        if self.downtime_rate > 0:
+            rng = self._rng(0, block)
+            num = rng.poisson(self.downtime_rate * len(ind))
+            durations = np.round(rng.exponential(self.downtime_mean.value / freq_ns, num)).astype(np.int64) * freq_ns
+            shift = np.cumsum(np.bincount(rng.integers(0, len(ind), num), weights=durations,
+                                          minlength=len(ind))).astype(np.int64)
+
+        timestamps = self.start.value + ind * freq_ns + downtime + shift
+
+        return timestamps, downtime + int(shift[-1])
+
+    def _values(self, tag_num, params, block, ind, state):
+        """
+        Computes the values of a tag in a block.
+
+        Args:
+            tag_num (int): Number of the tag.
+            params (dict): Parameters of the tag.
+            block (int): Number of the block.
+            ind (numpy.ndarray): The rows of the block.
+            state (tuple): The noise of the last row and the number of rows of a dropout continuing into the block.
+
+        Returns:
+            tuple: The values and the state after the block.
+        """
+        rng = self._rng(1 + tag_num, block)
+        last_noise, dropout_left = state
+
+        # AR(1) noise with unit variance, continued from the last row of the previous block
+        phi = params['noise_correlation']
+        noise, _ = lfilter([np.sqrt(1.0 - phi ** 2)], [1.0, -phi], rng.standard_normal(len(ind)), zi=[phi * last_noise])
+
+        mean = params['level'] + params['cycle_amplitude'] * np.sin(2 * np.pi * ind / params['cycle_period'])
+        std = np.full(len(ind), float(params['noise']))
+        for drift in params['drifts']:
+            weight = _drift_weight(drift, ind)
+            mean += weight * drift.get('shift', 0.0)
+            std *= 1.0 + weight * (drift.get('scale', 1.0) - 1.0)
+        values = mean + std * noise
+        if params['resolution']:
+            values = np.round(values / params['resolution']) * params['resolution']
+
+        # Dropouts are runs of NaN values with geometric lengths, they may continue into the next block
+        num = rng.poisson(params['dropout_rate'] * len(ind))
+        starts = np.concatenate([[0], rng.integers(0, len(ind), num)])
+        ends = starts + np.concatenate([[dropout_left], rng.geometric(1.0 / params['dropout_length'], num)])
+        delta = np.zeros(len(ind) + 1, dtype=np.int64)
+        np.add.at(delta, starts, 1)
+        np.add.at(delta, np.minimum(ends, len(ind)), -1)
+        values[np.cumsum(delta[:-1]) > 0] = np.nan
+
+        return values.astype(self.dtype, copy=False), (noise[-1], max(int(ends.max()) - len(ind), 0))
+
+    def _blocks(self):
+        """
+        Yields the blocks of the stream.
+
+        Returns:
+            generator: Tuples of the first row, the timestamps in ns and the values of every tag of a block.
+        """
+        downtime = 0
+        states = [(0.0, 0)] * len(self.tags)
+        for block, first in enumerate(range(0, self.length, BLOCK_SIZE)):
+            ind = np.arange(first, min(first + BLOCK_SIZE, self.length))
+            timestamps, downtime = self._timestamps(block, ind, downtime)
+            values = []
+            for tag_num, params in enumerate(self.tags.values()):
+                tag_values, states[tag_num] = self._values(tag_num, params, block, ind, states[tag_num])
+                values.append(tag_values)
+            yield first, timestamps, values
+
+    def _frames(self, first, timestamps, values, intervals):
+        """
+        Builds the dataframes of a chunk.
+
+        Args:
+            first (int): First row of the chunk.
+            timestamps (numpy.ndarray): The timestamps of the chunk in ns.
+            values (list): The values of every tag.
+            intervals (dict): The label intervals of every tag.
+
+        Returns:
+            tuple: The dataframe with the timestamps and the values, and the dataframe with the labels.
+        """
+        rows = pd.RangeIndex(first, first + len(timestamps))
+        data = {'Timestamp': pd.DatetimeIndex(timestamps, tz='UTC')}
+        labels = {}
+        for tag, tag_values in zip(self.tags, values):
+            data[tag] = tag_values
+            labels[tag] = np.zeros(len(rows), dtype=np.uint8)
+            for start, end in intervals[tag]:
+                if start < rows.stop and end > first:
+                    labels[tag][max(start - first, 0):end - first] = 1
+
+        return pd.DataFrame(data, index=rows), pd.DataFrame(labels, index=rows)
+
+    def chunks(self, chunk_size=2 ** 20):
+        """
+        Yields the stream and its labels in chunks of rows. The values do not depend on the chunk size.
+
+        Args:
+            chunk_size (int, optional): Number of rows of a chunk. Default is 2 ** 20.
+
+        Returns:
+            generator: Tuples of a dataframe with the 'Timestamp' column and one column per tag, and a dataframe
+                with the labels of every tag, both indexed by the rows of the stream.
+        """
+        intervals = {tag: self.intervals(tag) for tag in self.tags}
+        pending = []
+        size = 0
+        for block in self._blocks():
+            pending.append(block)
+            size += len(block[1])
+            last = block[0] + len(block[1]) == self.length
+            if size < chunk_size and not last:
+                continue
+
+            first = pending[0][0]
+            timestamps = np.concatenate([b[1] for b in pending])
+            values = [np.concatenate([b[2][k] for b in pending]) for k in range(len(self.tags))]
+            complete = size if last else size - size % chunk_size
+            for offset in range(0, complete, chunk_size):
+                end = min(offset + chunk_size, complete)
+                yield self._frames(first + offset, timestamps[offset:end], [v[offset:end] for v in values], intervals)
+            # The rows after the last complete chunk are kept for the next chunk
+            pending = [(first + complete, timestamps[complete:], [v[complete:] for v in values])]
+            size -= complete
+
+    def to_frames(self):
+        """
+        Returns the whole stream and its labels as dataframes, in the format of the pickled dataframes and label
+        dataframes of the experiments. Only for streams that fit in memory.
+
+        Returns:
+            tuple: The dataframe with the 'Timestamp' column and one column per tag, and the label dataframe.
+        """
+        frames = list(self.chunks())
+        data = pd.concat([frame[0] for frame in frames])
+        labels = pd.concat([frame[1] for frame in frames])
+
+        return data, labels
+
+    def save_npy(self, directory, chunk_size=2 ** 20):
+        """
+        Writes the stream and its labels chunk by chunk to .npy files, one per column: 'Timestamp.npy' (UTC in ns),
+        '<tag>.npy' and '<tag>_labels.npy'. The files can be loaded as memory maps with numpy.load(path, mmap_mode='r'),
+        so streams larger than the memory can be passed to the detectors.
+
+        Args:
+            directory (str): The output directory.
+            chunk_size (int, optional): Number of rows written at once. Default is 2 ** 20.
+
+        Returns:
+            None
+        """
+        os.makedirs(directory, exist_ok=True)
+        columns = [('Timestamp', 'Timestamp', np.int64)]
+        columns += [(tag, tag, self.dtype) for tag in self.tags]
+        columns += [(tag + '_labels', tag, np.uint8) for tag in self.tags]
+        files = {name: np.lib.format.open_memmap(os.path.join(directory, name + '.npy'), mode='w+', dtype=dtype,
+                                                 shape=(self.length,))
+                 for name, _, dtype in columns}
+
+        for data, labels in self.chunks(chunk_size):
+            rows = slice(data.index.start, data.index.stop)
+            files['Timestamp'][rows] = data['Timestamp'].dt.tz_localize(None).to_numpy().view(np.int64)
+            for tag in self.tags:
+                files[tag][rows] = data[tag].to_numpy()
+                files[tag + '_labels'][rows] = labels[tag].to_numpy()
+
+        for array in files.values():
+            array.flush()
+
+
+if __name__ == '__main__':
+    with open(sys.argv[1] if len(sys.argv) > 1 else 'synthetic_config.json') as f:
+        config = json.load(f)
+
+    synthetic = config['synthetic']
+    stream = SyntheticDriftStream(synthetic['length'], config['tags'], freq=synthetic['freq'],
+                                  start=synthetic['start'], downtime_rate=synthetic['downtime_rate'],
+                                  downtime_mean=synthetic['downtime_mean'], seed=synthetic['seed'],
+                                  dtype=synthetic['dtype'])
+    for tag in stream.tags:
+        print(f'Label intervals of {tag}: {stream.intervals(tag)}')
+
+    if synthetic['npy_path']:
+        stream.save_npy(synthetic['npy_path'], synthetic['chunk_size'])
+        print(f"Saved {stream.length} rows to {synthetic['npy_path']}")
+    else:
+        drift_df, label_df = stream.to_frames()
+        drift_df.to_pickle(synthetic['data_frame'])
+        label_df.to_pickle(synthetic['labels'])
+        print(f"Saved {stream.length} rows to {synthetic['data_frame']} and the labels to {synthetic['labels']}")
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------------------------
+# Description:
+# This file contains the descriptive analysis of the explorative data analysis as one chunked pass over all tags of
+# a dataframe. For every tag it computes the descriptive statistics (count, mean, std, min, quantiles, max), a
+# histogram, a binned kernel density estimate computed with FFT and rolling statistics for line plots, and caches
+# the results next to the experiment results, so the analysis of a dataframe only runs once.
+# Usage as batch job: python eda_summary.py /path/to/your/data/dataframe_EI8.pkl /path/to/your/eda_results/
+# library: numpy / scipy
+# reference: https://docs.scipy.org/doc/scipy/reference/generated/scipy.stats.gaussian_kde.html
+# -----------------------------------------------------------------------------------------------------------
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import fftconvolve
+
+# Number of bins of the fine histogram from which the quantiles, histograms and densities are computed
+FINE_BINS = 2 ** 16
+# Version of the cached results, changed whenever their content changes
+CACHE_VERSION = 2
+
+
+class StreamingSummary:
+    """
+    Descriptive statistics of a data stream that is processed in chunks.
+
+    The mean and variance are merged chunk by chunk with the formulas of Chan et al., the quantiles and densities are
+    computed from a fine histogram with FINE_BINS bins. The range of the fine histogram starts at the range of the
+    first chunk and is doubled (merging pairs of bins) whenever a chunk exceeds it, so the quantiles are accurate to
+    one bin width, i.e. at most 2 / FINE_BINS of the range of the data.
+
+    Attributes:
+        count (int): Number of finite values.
+        cnt_nan (int): Number of NaN and infinite values (sensor dropouts).
+        mean (float): Mean of the values.
+        min (float): Smallest value.
+        max (float): Largest value.
+        counts (numpy.ndarray): Counts of the fine histogram.
+        lower (float): Lower edge of the fine histogram.
+        width (float): Bin width of the fine histogram.
+
+    Methods:
+        __init__: Initializes the StreamingSummary.
+        update: Adds a chunk of values.
+        describe: Returns the descriptive statistics like pandas.Series.describe.
+        quantiles: Returns quantiles of the values.
+        histogram: Returns a histogram of the values with a given number of bins.
+        density: Returns a Gaussian kernel density estimate of the values.
+    """
+
+    def __init__(self):
+        """
+        Initializes the StreamingSummary.
+
+        Returns:
+            None
+        """
+        self.count = 0
+        self.cnt_nan = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.counts = np.zeros(FINE_BINS, dtype=np.int64)
+        self.lower = None
+        self.width = None
+
+    def update(self, values):
+        """
+        Adds a chunk of values.
+
+        Args:
+            values (array-like): The chunk of values.
+
+        Returns:
+            None
+        """
+        values = np.asarray(values, dtype=np.float64)
+        finite = values[np.isfinite(values)]
+        self.cnt_nan += len(values) - len(finite)
+        if len(finite) == 0:
+            return
+
+        n = len(finite)
+        mean = finite.mean()
+        m2 = np.sum((finite - mean) ** 2)
+        delta = mean - self.mean
+        total = self.count + n
+        self.mean += delta * n / total
+        self._m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+        lo, hi = finite.min(), finite.max()
+        self.min = min(self.min, lo)
+        self.max = max(self.max, hi)
+
+        if self.lower is None:
+            self.lower = lo
+            # The width is rounded up slightly, so the largest value of the first chunk is inside the range
+            self.width = (hi - lo) / FINE_BINS * (1 + 1e-9) if hi > lo else max(abs(lo), 1.0) * 1e-9
+        while lo < self.lower or hi > self.lower + FINE_BINS * self.width:
+            self._double(extend_left=lo < self.lower)
+
+        ind = np.minimum(((finite - self.lower) / self.width).astype(np.int64), FINE_BINS - 1)
+        self.counts += np.bincount(ind, minlength=FINE_BINS)
+
+    def _double(self, extend_left):
+        """
+        Doubles the range of the fine histogram by merging pairs of bins.
+
+        Args:
+            extend_left (bool): If True, the range is extended below the lower edge, otherwise above the upper edge.
+
+        Returns:
+            None
+        """
+        merged = self.counts.reshape(FINE_BINS // 2, 2).sum(axis=1)
+        empty = np.zeros(FINE_BINS // 2, dtype=np.int64)
+        if extend_left:
+            self.lower -= FINE_BINS * self.width
+            self.counts = np.concatenate([empty, merged])
+        else:
+            self.counts = np.concatenate([merged, empty])
+        self.width *= 2
+
+    @property
+    def std(self):
+        return np.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def _cdf_at(self, x):
+        """
+        Returns the number of values smaller than x, interpolated linearly within the bins of the fine histogram.
+
+        Args:
+            x (numpy.ndarray): The points.
+
+        Returns:
+            numpy.ndarray: The interpolated counts.
+        """
+        edges = self.lower + self.width * np.arange(FINE_BINS + 1)
+        cum = np.concatenate([[0], np.cumsum(self.counts)])
+        return np.interp(x, edges, cum)
+
+    def quantiles(self, q):
+        """
+        Returns quantiles of the values.
+
+        Args:
+            q (array-like): The probabilities of the quantiles.
+
+        Returns:
+            numpy.ndarray: The quantiles, clipped to the range of the values, or NaN if there are no values.
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan)
+        target = np.asarray(q, dtype=np.float64) * self.count
+        cum = np.cumsum(self.counts)
+        # Bin that contains the quantile, the position within the bin is interpolated linearly
+        ind = np.minimum(np.searchsorted(cum, target, side='left'), FINE_BINS - 1)
+        below = cum[ind] - self.counts[ind]
+        frac = (target - below) / np.maximum(self.counts[ind], 1)
+        return np.clip(self.lower + self.width * (ind + frac), self.min, self.max)
+
+    def describe(self):
+        """
+        Returns the descriptive statistics like pandas.Series.describe.
+
+        Returns:
+            dict: count, mean, std, min, 25%, 50%, 75%, max and the number of NaN and infinite values (nan).
+        """
+        q25, q50, q75 = self.quantiles([0.25, 0.5, 0.75])
+        return {'count': self.count, 'mean': self.mean, 'std': self.std, 'min': self.min, '25%': q25, '50%': q50,
+                '75%': q75, 'max': self.max, 'nan': self.cnt_nan}
+
+    def histogram(self, num_bins=100):
+        """
+        Returns a histogram of the values over their range.
+
+        Args:
+            num_bins (int, optional): Number of bins. Default is 100.
+
+        Returns:
+            tuple: The counts and the edges of the histogram.
+        """
+        edges = np.linspace(self.min, self.max, num_bins + 1)
+        cum = self._cdf_at(edges)
+        cum[-1] = self.count
+        return np.diff(cum), edges
+
+    def density(self, points, bandwidth=None):
+        """
+        Returns a Gaussian kernel density estimate of the values. The fine histogram is convolved with the Gaussian
+        kernel by FFT (binned kernel density estimation) and interpolated at the points.
+
+        Args:
+            points (array-like): The points where the density is evaluated.
+            bandwidth (float, optional): Standard deviation of the kernel. Default is Scott's rule as in
+                scipy.stats.gaussian_kde, std * count ** (-1 / 5).
+
+        Returns:
+            numpy.ndarray: The density at the points.
+        """
+        bandwidth = bandwidth if bandwidth is not None else self.std * self.count ** (-1 / 5)
+        centers = self.lower + self.width * (np.arange(FINE_BINS) + 0.5)
+        half = min(int(np.ceil(5 * bandwidth / self.width)), 4 * FINE_BINS)
+        offsets = np.arange(-half, half + 1) * self.width
+        kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+        # Extend the grid by the support of the kernel, so the density of the outermost values is not cut off
+        counts = np.concatenate([np.zeros(half), self.counts, np.zeros(half)])
+        grid = np.concatenate([centers[0] - self.width * np.arange(half, 0, -1), centers,
+                               centers[-1] + self.width * np.arange(1, half + 1)])
+        dens = np.maximum(fftconvolve(counts, kernel, mode='same'), 0) / self.count
+
+        return np.interp(points, grid, dens, left=0.0, right=0.0)
+
+
+def rolling_stats(values, window, step, history=None):
+    """
+    Computes the rolling mean, standard deviation, minimum and maximum of a data stream over windows of window rows,
+    evaluated every step rows, which are plotted instead of the full resolution stream. NaN and infinite values are
+    skipped as in pandas.Series.rolling(window, min_periods=1). The stream can be processed in chunks whose lengths
+    are multiples of step, passing the returned history of a chunk to the next one.
+
+    Args:
+        values (numpy.ndarray): The data stream or a chunk of it.
+        window (int): Number of rows per window.
+        step (int): Number of rows between the windows, the windows end at the rows step - 1, 2 * step - 1, ...
+        history (numpy.ndarray, optional): The last window - 1 values before the chunk. Default is None (start of
+            the stream).
+
+    Returns:
+        tuple: A dictionary with arrays 'mean', 'std', 'min' and 'max' with one value per window, and the history for
+            the next chunk.
+    """
+    if history is None:
+        history = np.full(window - 1, np.nan)
+    values = np.concatenate([history, np.asarray(values, dtype=np.float64)])
+    finite = np.isfinite(values)
+    values = np.where(finite, values, np.nan)
+    # The sums are shifted by the mean of the chunk, so the variance does not suffer from cancellation
+    shift = np.nanmean(values) if finite.any() else 0.0
+    centered = np.where(finite, values - shift, 0.0)
+    cum_count = np.concatenate([[0], np.cumsum(finite)])
+    cum_sum = np.concatenate([[0.0], np.cumsum(centered)])
+    cum_sum2 = np.concatenate([[0.0], np.cumsum(centered ** 2)])
+
+    # Exclusive ends of the windows within the chunk, the windows are values[end - window:end]
+    ends = np.arange(window - 1 + step, len(values) + 1, step)
+    count = cum_count[ends] - cum_count[ends - window]
+    total = cum_sum[ends] - cum_sum[ends - window]
+    total2 = cum_sum2[ends] - cum_sum2[ends - window]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        var = np.where(count > 1, np.maximum(total2 - count * mean ** 2, 0) / (count - 1), np.nan)
+    windows = sliding_window_view(values, window)[step - 1::step][:len(ends)]
+
+    return ({'mean': shift + mean, 'std': np.sqrt(var),
+             'min': np.fmin.reduce(windows, axis=1), 'max': np.fmax.reduce(windows, axis=1)},
+            values[len(values) - (window - 1):])
+
+
+def summarize_frame(df, tags=None, chunk_size=1_000_000, window=1440, step=60, num_bins=100, num_points=100):
+    """
+    Computes the descriptive analysis of the tags of a dataframe in one chunked pass.
+
+    Args:
+        df (pandas.DataFrame): Dataframe with a 'Timestamp' column and the tags.
+        tags (list, optional): The tags. Default is all numeric columns.
+        chunk_size (int, optional): Number of rows per chunk, rounded down to a multiple of step. Default is 1e6.
+        window (int, optional): Number of rows per window of the rolling statistics. Default is 1440 (one day of
+            minute values).
+        step (int, optional): Number of rows between the windows of the rolling statistics. Default is 60 (one
+            hour of minute values).
+        num_bins (int, optional): Number of bins of the histograms. Default is 100.
+        num_points (int, optional): Number of points where the densities are evaluated. Default is 100.
+
+    Returns:
+        tuple: A dictionary with the descriptive statistics by tag and a dictionary of arrays with the histograms,
+            densities and rolling statistics (keys '<tag>/hist_counts', '<tag>/hist_edges', '<tag>/density_x',
+            '<tag>/density', '<tag>/rolling_<stat>' and 'rolling_end', the timestamps of the last rows of the
+            windows).
+    """
+    if tags is None:
+        tags = [column for column in df.columns if column != 'Timestamp' and pd.api.types.is_numeric_dtype(df[column])]
+    chunk_size = max(chunk_size // step, 1) * step
+
+    summaries = {tag: StreamingSummary() for tag in tags}
+    rolling = {tag: [] for tag in tags}
+    history = dict.fromkeys(tags)
+    for start in range(0, len(df), chunk_size):
+        for tag in tags:
+            values = np.asarray(df[tag].iloc[start:start + chunk_size], dtype=np.float64)
+            summaries[tag].update(values)
+            chunk_stats, history[tag] = rolling_stats(values, window, step, history[tag])
+            rolling[tag].append(chunk_stats)
+
+    stats = {}
+    arrays = {'rolling_end': np.asarray(df['Timestamp'].iloc[step - 1::step].astype(str))} if 'Timestamp' in df else {}
+    for tag in tags:
+        summary = summaries[tag]
+        stats[tag] = {key: float(value) for key, value in summary.describe().items()}
+        if summary.count == 0:
+            continue
+        arrays[f'{tag}/hist_counts'], arrays[f'{tag}/hist_edges'] = summary.histogram(num_bins)
+        arrays[f'{tag}/density_x'] = np.linspace(summary.min, summary.max, num_points)
+        arrays[f'{tag}/density'] = summary.density(arrays[f'{tag}/density_x'])
+        for key in ('mean', 'std', 'min', 'max'):
+            arrays[f'{tag}/rolling_{key}'] = np.concatenate([chunk_stats[key] for chunk_stats in rolling[tag]])
+
+    return stats, arrays
+
+
+def run_eda(df_name, result_path, **kwargs):
+    """
+    Computes the descriptive analysis of a pickled dataframe, or loads it from the cached results if the pickle and
+    the parameters are unchanged. The statistics are written to '<name>_eda.json' and the arrays to '<name>_eda.npz'
+    in result_path.
+
+    Args:
+        df_name (str): Path of the pickled dataframe.
+        result_path (str): Directory of the cached results.
+        **kwargs: Parameters of summarize_frame.
+
+    Returns:
+        tuple: The descriptive statistics and the arrays, as returned by summarize_frame.
+    """
+    name = os.path.join(result_path, os.path.splitext(os.path.basename(df_name))[0] + '_eda')
+    stat = os.stat(df_name)
+    source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'params': kwargs, 'version': CACHE_VERSION}
+
+    try:
+        with open(name + '.json') as f:
+            cached = json.load(f)
+        if cached['source'] == source:
+            with np.load(name + '.npz', allow_pickle=False) as npz:
+                return cached['stats'], dict(npz)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    stats, arrays = summarize_frame(pd.read_pickle(df_name), **kwargs)
+    os.makedirs(result_path, exist_ok=True)
+    np.savez(name + '.npz', **arrays)
+    with open(name + '.json', 'w') as f:
+        json.dump({'source': source, 'stats': stats}, f, indent=2)
+
+    return stats, arrays
+
+
+if __name__ == '__main__':
+    stats, _ = run_eda(sys.argv[1], sys.argv[2])
+    print(pd.DataFrame(stats))